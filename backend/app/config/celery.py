@@ -1,5 +1,83 @@
+import os
+from time import time
+
 from celery import Celery
+from celery.signals import (
+    before_task_publish,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_shutdown,
+)
+from dateutil.parser import isoparse
+
+from app.config.cache import redis_url
+from app.config.config import (
+    WORKER_DB_MAX_OVERFLOW,
+    WORKER_DB_POOL_SIZE,
+    WORKER_METRICS_PORT,
+    WORKER_REDIS_MAX_CONNECTIONS,
+)
+from app.models.base import DB_URL, get_engine_options
+import app.utilities.metrics as metrics
+from app.utilities.worker_runtime import WorkerRuntime
+
 
+# message header holding the time a task was published at, as epoch seconds
+PUBLISHED_AT_HEADER = "published_at"
 
 app = Celery("data_processor")
 app.config_from_object("app.config.celeryconfig")
+
+# async runtime of the current worker process, which tasks run their async code on
+worker_runtime = WorkerRuntime(
+    DB_URL, redis_url, get_engine_options(WORKER_DB_POOL_SIZE, WORKER_DB_MAX_OVERFLOW), WORKER_REDIS_MAX_CONNECTIONS
+)
+
+
+@worker_init.connect
+def start_worker_metrics_server(**kwargs) -> None:
+    """Exports the metrics of the worker, and of its pool processes in multiprocess mode, over HTTP."""
+
+    if WORKER_METRICS_PORT:
+        metrics.start_metrics_server(WORKER_METRICS_PORT)
+        print(f"exporting worker metrics on port {WORKER_METRICS_PORT}")
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs) -> None:
+    """Starts the async runtime of a forked worker process. Other pools start it when running their first task."""
+
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_runtime(**kwargs) -> None:
+    """Stops the async runtime of a worker process, closing its connection pools."""
+
+    worker_runtime.stop()
+    metrics.mark_process_dead(os.getpid())
+
+
+@before_task_publish.connect
+def set_task_published_at(headers: dict, **kwargs) -> None:
+    """Stamps every published task with its publishing time, including tasks published by other tasks and retries."""
+
+    headers[PUBLISHED_AT_HEADER] = time()
+
+
+@task_prerun.connect
+def record_task_queue_wait(task, **kwargs) -> None:
+    """Records how long a task waited in the queue, since it was published or, for delayed tasks, since it was due."""
+
+    published_at = task.request.get(PUBLISHED_AT_HEADER)
+    if published_at is None:
+        return
+
+    queued_since = float(published_at)
+    if task.request.eta:
+        queued_since = max(queued_since, isoparse(task.request.eta).timestamp())
+
+    metrics.TASK_QUEUE_WAIT_SECONDS.labels(task.name).observe(max(time() - queued_since, 0))
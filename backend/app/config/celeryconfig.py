@@ -1,7 +1,30 @@
 from app.config.cache import redis_url
+from app.config.config import (
+    HOURLY_DATA_MAINTENANCE_INTERVAL,
+    INGEST_BACKLOG_RECONCILE_INTERVAL,
+    WORKER_CONCURRENCY,
+    WORKER_POOL,
+)
 
 
 broker_url = result_backend = redis_url
 
 # list of all modules that contain celery tasks
-include = ["app.services.sensor"]
+include = ["app.tasks.sensor"]
+
+# tasks of a worker run in threads, which share the worker's async runtime and its connection pools.
+# tasks mostly wait on the DB and cache, so several of them make progress at once on the runtime's event loop.
+worker_pool = WORKER_POOL
+worker_concurrency = WORKER_CONCURRENCY
+
+# periodic tasks, scheduled by a single `celery beat` process
+beat_schedule = {
+    "maintain-hourly-data-partitions": {
+        "task": "app.tasks.sensor.maintain_hourly_data_partitions",
+        "schedule": HOURLY_DATA_MAINTENANCE_INTERVAL,
+    },
+    "reconcile-ingest-backlog": {
+        "task": "app.tasks.sensor.reconcile_ingest_backlog",
+        "schedule": INGEST_BACKLOG_RECONCILE_INTERVAL,
+    },
+}
@@ -6,11 +6,121 @@ import dotenv
 dotenv.load_dotenv()
 
 
-# 10 MB
-MAX_SENSOR_FILE_SIZE = 1024 * 1024 * 10
+# 256 MB by default; uploads are parsed incrementally, so memory use does not grow with the raw file size
+MAX_SENSOR_FILE_SIZE = int(os.getenv("MAX_SENSOR_FILE_SIZE", 1024 * 1024 * 256))
+# 64 KB
+SENSOR_FILE_CHUNK_SIZE = 1024 * 64
+# batch uploads carry many JSON documents, as files, NDJSON lines or archive members, each limited as a single upload
+MAX_SENSOR_BATCH_SIZE = int(os.getenv("MAX_SENSOR_BATCH_SIZE", 1024 * 1024 * 1024))
+MAX_SENSOR_BATCH_DOCUMENTS = int(os.getenv("MAX_SENSOR_BATCH_DOCUMENTS", 1000))
 
 ANOMALOUS_DATA_EXPIRY_TIME = 60 * 60 * 12
-ANOMALOUS_DATA_KEY = "anomalies"
+# anomalies are appended to a stream, so clients can replay them from any entry ID until they expire
+ANOMALOUS_DATA_KEY = "anomaly_events"
+# anomalies are published in pipelined batches; the stream is trimmed to its newest entries beyond max length
+ANOMALOUS_DATA_BATCH_SIZE = int(os.getenv("ANOMALOUS_DATA_BATCH_SIZE", 500))
+ANOMALOUS_DATA_MAX_LENGTH = int(os.getenv("ANOMALOUS_DATA_MAX_LENGTH", 100_000))
+# anomaly updates queued per websocket client; the oldest are dropped for clients that fall further behind
+ANOMALY_SUBSCRIBER_QUEUE_SIZE = int(os.getenv("ANOMALY_SUBSCRIBER_QUEUE_SIZE", 1000))
+# stream entries fetched per round-trip, both when tailing the stream and when replaying it for a reconnecting client
+ANOMALY_STREAM_READ_COUNT = int(os.getenv("ANOMALY_STREAM_READ_COUNT", 500))
+
+# uploaded sensor data waits in the staging area until a worker processes it; only its key goes through the broker
+STAGED_SENSOR_DATA_EXPIRY_TIME = 60 * 60 * 24
+STAGED_SENSOR_DATA_KEY = "staged_sensor_data"
+# staged hourly data is saved in time range chunks of this many hours, processed in parallel across workers.
+# failed chunk and completion tasks are retried with backoff; chunks saved by an earlier attempt are not saved again.
+INGEST_CHUNK_HOURS = int(os.getenv("INGEST_CHUNK_HOURS", 24 * 365))
+INGEST_TASK_MAX_RETRIES = int(os.getenv("INGEST_TASK_MAX_RETRIES", 5))
+
+# ingest jobs track the processing progress of an upload, or of a batch of uploads, until they expire
+INGEST_JOB_KEY = "ingest_job"
+INGEST_JOB_EXPIRY_TIME = 60 * 60 * 24 * 7
+
+# uploads are rejected while the broker queue, or the hourly rows of uploads waiting to be saved, exceed these limits.
+# clients are asked to retry once the backlog would be saved at the estimated rate of hourly rows saved per second.
+INGEST_BACKLOG_ROWS_KEY = "ingest_backlog_rows"
+INGEST_MAX_QUEUE_DEPTH = int(os.getenv("INGEST_MAX_QUEUE_DEPTH", 1000))
+INGEST_MAX_BACKLOG_ROWS = int(os.getenv("INGEST_MAX_BACKLOG_ROWS", 5_000_000))
+INGEST_ROWS_PER_SECOND = int(os.getenv("INGEST_ROWS_PER_SECOND", 2000))
+INGEST_MAX_RETRY_AFTER = int(os.getenv("INGEST_MAX_RETRY_AFTER", 600))
+# the backlog row count expires after `INGEST_BACKLOG_MAX_AGE` seconds without new uploads, and is recomputed every
+# `INGEST_BACKLOG_RECONCILE_INTERVAL` seconds from the jobs neither failed nor done, started within that age
+INGEST_BACKLOG_MAX_AGE = int(os.getenv("INGEST_BACKLOG_MAX_AGE", 60 * 60 * 6))
+INGEST_BACKLOG_RECONCILE_INTERVAL = int(os.getenv("INGEST_BACKLOG_RECONCILE_INTERVAL", 60 * 5))
+
+# streams hourly data rows into the DB through COPY instead of creating ORM objects for each row
+HOURLY_DATA_BULK_LOAD = os.getenv("HOURLY_DATA_BULK_LOAD", "true").lower() == "true"
+
+# storage layouts for hourly data: "narrow" keeps a table per weather variable, "wide" keeps a single row per hour.
+# reads are served from `HOURLY_DATA_LAYOUT`; writing to both layouts allows cutting over once old data is backfilled.
+HOURLY_DATA_LAYOUTS = ("narrow", "wide")
+HOURLY_DATA_LAYOUT = os.getenv("HOURLY_DATA_LAYOUT", "narrow")
+HOURLY_DATA_WRITE_LAYOUTS = os.getenv("HOURLY_DATA_WRITE_LAYOUTS", HOURLY_DATA_LAYOUT).split(",")
+
+if HOURLY_DATA_LAYOUT not in HOURLY_DATA_LAYOUTS or not set(HOURLY_DATA_WRITE_LAYOUTS) <= set(HOURLY_DATA_LAYOUTS):
+    raise ValueError(f"Invalid hourly data layout. Expected one of {HOURLY_DATA_LAYOUTS}.")
+
+# hourly data tables are partitioned by ranges of this many sensor data IDs, created on ingest and ahead of it by the
+# maintenance task run every `HOURLY_DATA_MAINTENANCE_INTERVAL` seconds. it drops partitions whose uploads are all older
+# than `HOURLY_DATA_RETENTION_DAYS`, or none when 0, along with their uploads.
+HOURLY_DATA_PARTITION_SIZE = int(os.getenv("HOURLY_DATA_PARTITION_SIZE", 1000))
+HOURLY_DATA_RETENTION_DAYS = int(os.getenv("HOURLY_DATA_RETENTION_DAYS", 0))
+HOURLY_DATA_MAINTENANCE_INTERVAL = int(os.getenv("HOURLY_DATA_MAINTENANCE_INTERVAL", 60 * 60))
+# partitions are created and dropped under a lock on their table, given up on after this many milliseconds of waiting
+HOURLY_DATA_PARTITION_LOCK_TIMEOUT = int(os.getenv("HOURLY_DATA_PARTITION_LOCK_TIMEOUT", 5000))
+
+# file metadata listings are served in keyset-paginated pages of this many records by default
+FILE_METADATA_PAGE_SIZE = int(os.getenv("FILE_METADATA_PAGE_SIZE", 100))
+FILE_METADATA_MAX_PAGE_SIZE = int(os.getenv("FILE_METADATA_MAX_PAGE_SIZE", 1000))
+
+# serialized sensor data responses of completely processed uploads are cached, as uploads never change afterwards.
+# workers fill the cache for the full response when they finish processing an upload, unless prefilling is disabled.
+# the key is versioned, so responses cached in an earlier shape are never served; they expire on their own.
+SENSOR_DATA_RESPONSE_KEY = "sensor_data_response_v2"
+SENSOR_DATA_RESPONSE_EXPIRY_TIME = int(os.getenv("SENSOR_DATA_RESPONSE_EXPIRY_TIME", 60 * 60 * 24))
+SENSOR_DATA_RESPONSE_PREFILL = os.getenv("SENSOR_DATA_RESPONSE_PREFILL", "true").lower() == "true"
+# responses larger than this many bytes are not cached, as the cache shares its Redis instance with the broker; 16 MB
+SENSOR_DATA_RESPONSE_MAX_SIZE = int(os.getenv("SENSOR_DATA_RESPONSE_MAX_SIZE", 1024 * 1024 * 16))
+
+# sensor data is located in grid cells this many degrees wide, for bounding box queries across uploads. cell IDs are
+# stored along with sensor data, so changing the cell size requires recreating the `sensor_data.grid_cell` column.
+SENSOR_GRID_CELL_DEGREES = 1
+# bounding boxes overlapping more grid cells than this are matched on coordinates alone
+SENSOR_QUERY_MAX_GRID_CELLS = int(os.getenv("SENSOR_QUERY_MAX_GRID_CELLS", 1000))
+# hourly data points matching a query are fetched from the DB and streamed to the client in batches of this many rows
+SENSOR_QUERY_BATCH_SIZE = int(os.getenv("SENSOR_QUERY_BATCH_SIZE", 5000))
+
+# upper bound of the points per metric that hourly data can be downsampled to
+HOURLY_DATA_MAX_POINTS = int(os.getenv("HOURLY_DATA_MAX_POINTS", 10_000))
+
+# each worker process runs its tasks on one long-lived event loop, with its own DB and cache connection pools shared by
+# its concurrently running tasks. the "threads" pool runs this many tasks in a single process, "prefork" one per process
+WORKER_POOL = os.getenv("WORKER_POOL", "threads")
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", 4))
+WORKER_DB_POOL_SIZE = int(os.getenv("WORKER_DB_POOL_SIZE", WORKER_CONCURRENCY))
+WORKER_DB_MAX_OVERFLOW = int(os.getenv("WORKER_DB_MAX_OVERFLOW", 2))
+WORKER_REDIS_MAX_CONNECTIONS = int(os.getenv("WORKER_REDIS_MAX_CONNECTIONS", WORKER_CONCURRENCY * 4))
+# workers export metrics over HTTP on this port, 0 to disable. prefork pools need `PROMETHEUS_MULTIPROC_DIR` set to an
+# empty directory, in which every process keeps its metrics for the exporter to collect
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", 9540))
+
+# DB connection pool of each API process; API and worker pools of every container together must stay within the DB's
+# connection limit. connections are recycled after `DB_POOL_RECYCLE` seconds, and checked before use with pre-ping.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 60 * 30))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+# behind a transaction pooler such as PgBouncer, connections are opened per checkout instead of pooled, and prepared
+# statements are neither cached nor reused by name, since consecutive transactions may run on different DB connections
+DB_TRANSACTION_POOLER = os.getenv("DB_TRANSACTION_POOLER", "false").lower() == "true"
+
+# API processes create and migrate DB tables on startup unless disabled, when `python -m app.migrate` is run once per
+# deploy instead. they open this many DB and cache connections in parallel on startup, ahead of the first requests.
+DB_MIGRATE_ON_STARTUP = os.getenv("DB_MIGRATE_ON_STARTUP", "true").lower() == "true"
+APP_WARMUP_CONNECTIONS = int(os.getenv("APP_WARMUP_CONNECTIONS", 2))
 
 DB_NAME = os.environ["DB_NAME"]
 DB_HOST = os.environ["DB_HOST"]
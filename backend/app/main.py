@@ -1,20 +1,77 @@
+from time import perf_counter
+
+# * taken before the app's imports, to report how long importing them took
+import_start_time = perf_counter()
+
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
 
-from app.config.config import CORS_ALLOWED_ORIGINS
+from app.config.config import (
+    APP_WARMUP_CONNECTIONS,
+    CORS_ALLOWED_ORIGINS,
+    DB_MAX_OVERFLOW,
+    DB_MIGRATE_ON_STARTUP,
+    DB_POOL_SIZE,
+    DB_TRANSACTION_POOLER,
+)
 from app.config.cache import redis_client
-from app.models.base import create_tables
+from app.models.base import create_tables, engine
 from app.routers import sensor
+from app.services.sensor import anomaly_updates_hub
+from app.utilities.basic_auth import authenticate_user
+from app.utilities.db_pool import get_pool_stats
+import app.utilities.metrics as metrics
+
+
+import_time = perf_counter() - import_start_time
+
+
+async def warm_up_db_connection() -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_up_connections() -> None:
+    """Opens DB and cache connections in parallel, so the first requests don't wait on connecting. Connections are
+    returned to their pools; without a DB pool of its own, a single DB connection checks that the DB is reachable."""
+
+    db_connections = 1 if DB_TRANSACTION_POOLER else min(APP_WARMUP_CONNECTIONS, DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    await asyncio.gather(
+        *(warm_up_db_connection() for _ in range(db_connections)),
+        *(redis_client.ping() for _ in range(APP_WARMUP_CONNECTIONS)),
+    )
 
 
 @asynccontextmanager
 async def lifespan(_):
-    await create_tables()
-    await redis_client.ping()
+    start_time = perf_counter()
+    phase_times = {"import": import_time}
+
+    if DB_MIGRATE_ON_STARTUP:
+        await create_tables()
+        phase_times["migrate"] = perf_counter() - start_time
+
+    warmup_start_time = perf_counter()
+    await warm_up_connections()
+    phase_times["warmup"] = perf_counter() - warmup_start_time
+
+    await anomaly_updates_hub.start()
+    phase_times["lifespan"] = perf_counter() - start_time
+
+    for phase, phase_time in phase_times.items():
+        metrics.APP_STARTUP_SECONDS.labels(phase).set(phase_time)
+    phase_summary = ", ".join(f"{phase} {phase_time * 1000:.0f} ms" for phase, phase_time in phase_times.items())
+    print(f"app started in {phase_summary}")
+
     yield
+    await anomaly_updates_hub.stop()
 
 
 app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
@@ -36,3 +93,40 @@ def healthcheck():
     """Check application's health."""
 
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def readiness_check():
+    """Check whether the DB and cache are reachable, along with the DB connection pool's statistics."""
+
+    db_ready = cache_ready = True
+
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except (SQLAlchemyError, OSError) as exc:
+        print(f"readiness check failed to reach the DB: {exc}")
+        db_ready = False
+
+    try:
+        await redis_client.ping()
+    except (RedisError, OSError) as exc:
+        print(f"readiness check failed to reach the cache: {exc}")
+        cache_ready = False
+
+    content = {
+        "status": "ok" if db_ready and cache_ready else "unavailable",
+        "db": {"ready": db_ready, **get_pool_stats(engine)},
+        "cache": {"ready": cache_ready},
+    }
+    status_code = status.HTTP_200_OK if db_ready and cache_ready else status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return ORJSONResponse(content, status_code=status_code)
+
+
+@app.get("/metrics", dependencies=[Depends(authenticate_user)])
+def export_metrics():
+    """Export the application's metrics in the Prometheus text format."""
+
+    body, content_type = metrics.export_metrics()
+    return Response(body, media_type=content_type)
@@ -0,0 +1,23 @@
+"""Creates and migrates the DB tables, as API processes do on startup unless `DB_MIGRATE_ON_STARTUP` is disabled.
+
+Run once per deploy from the `backend` directory, with the app's env vars set, before starting the API processes:
+`python -m app.migrate`.
+"""
+
+import asyncio
+
+from app.models.base import create_tables, engine
+
+# * imported for its models, registering their tables on the metadata created here
+import app.models.sensor
+
+
+async def main() -> None:
+    try:
+        await create_tables()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,17 +1,69 @@
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import Connection, func, inspect, select, text
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
-from app.config.config import DB_HOST, DB_NAME, DB_PASSWORD, DB_USER, DB_PORT
+from app.config.config import (
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASSWORD,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_TRANSACTION_POOLER,
+    DB_USER,
+    HOURLY_DATA_PARTITION_SIZE,
+)
+from app.utilities.db_pool import InstrumentedNullPool, InstrumentedQueuePool
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# key of the advisory lock that serializes hourly data partition changes across processes, table migrations included
+HOURLY_DATA_PARTITION_LOCK_KEY = 4_242_023
+
 DB_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_async_engine(DB_URL, echo=False)
+
+def get_engine_options(pool_size: int, max_overflow: int) -> dict[str, Any]:
+    """Gets the options of a DB engine with a connection pool of the given size, or without a pool of its own when
+    connecting through a transaction pooler."""
+
+    if DB_TRANSACTION_POOLER:
+        return {
+            "poolclass": InstrumentedNullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "connect_args": {
+            "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+engine = create_async_engine(DB_URL, echo=False, **get_engine_options(DB_POOL_SIZE, DB_MAX_OVERFLOW))
 AsyncSessionLocal = async_sessionmaker(
     engine,
     expire_on_commit=False,
@@ -30,5 +82,132 @@ async def get_session():
 
 async def create_tables():
     async with engine.begin() as conn:
+        # * processes starting together migrate one at a time, each seeing the tables as the previous one left them
+        await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": HOURLY_DATA_PARTITION_LOCK_KEY})
+
         print("creating DB tables if they don't exist...")
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+        await conn.run_sync(_partition_existing_tables)
+
+
+def _create_missing_columns(connection: Connection) -> None:
+    """Creates nullable columns added to tables that already existed, which `create_all` skips along with the tables."""
+
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable:
+                continue
+
+            column_definition = CreateColumn(column).compile(dialect=connection.dialect)
+            connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_definition}"))
+
+
+def _create_missing_indexes(connection: Connection) -> None:
+    """Creates indexes added to tables that already existed, which `create_all` skips along with the tables."""
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
+def _partition_existing_tables(connection: Connection) -> None:
+    """Converts tables that existed before being partitioned: each is renamed aside along with its indexes and
+    sequences, recreated as a partitioned table, and attached to it as the partition of all sensor data IDs saved so
+    far, up to the end of the current partition range. Partitions for later IDs are created past it."""
+
+    preparer = connection.dialect.identifier_preparer
+    range_end: int | None = None
+
+    for table in Base.metadata.sorted_tables:
+        if not table.dialect_options["postgresql"]["partition_by"]:
+            continue
+
+        relkind = connection.scalar(
+            text("SELECT relkind::text FROM pg_class WHERE oid = to_regclass(:name)"), {"name": table.name}
+        )
+        if relkind != "r":
+            continue
+
+        # * every table gets the same bounds, so the partitions of a range are dropped together
+        if range_end is None:
+            sensor_data_table = Base.metadata.tables["sensor_data"]
+            max_sensor_data_id = connection.scalar(select(func.max(sensor_data_table.c.id))) or 0
+            range_end = (max_sensor_data_id // HOURLY_DATA_PARTITION_SIZE + 1) * HOURLY_DATA_PARTITION_SIZE
+
+        legacy_name = f"{table.name}_legacy"
+        print(f"partitioning existing DB table {table.name}, keeping its rows as partition {legacy_name}...")
+
+        index_names = connection.scalars(
+            text(
+                "SELECT index_class.relname FROM pg_index "
+                "JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid "
+                "WHERE pg_index.indrelid = to_regclass(:name)"
+            ),
+            {"name": table.name},
+        ).all()
+        sequence_names = connection.scalars(
+            text(
+                "SELECT sequence_class.relname FROM pg_depend "
+                "JOIN pg_class sequence_class ON sequence_class.oid = pg_depend.objid "
+                "WHERE pg_depend.refobjid = to_regclass(:name) AND sequence_class.relkind = 'S' "
+                "AND pg_depend.deptype = 'a'"
+            ),
+            {"name": table.name},
+        ).all()
+
+        # * index and sequence names are unique across the schema, so they are renamed to free them for the new table
+        connection.execute(text(f"ALTER TABLE {preparer.quote(table.name)} RENAME TO {preparer.quote(legacy_name)}"))
+        for index_name in index_names:
+            connection.execute(
+                text(f"ALTER INDEX {preparer.quote(index_name)} RENAME TO {preparer.quote(f'{index_name}_legacy')}")
+            )
+        for sequence_name in sequence_names:
+            connection.execute(
+                text(
+                    f"ALTER SEQUENCE {preparer.quote(sequence_name)} "
+                    f"RENAME TO {preparer.quote(f'{sequence_name}_legacy')}"
+                )
+            )
+
+        # a primary key without the partition key is replaced by the partitioned table's own, built when attaching
+        primary_key = inspect(connection).get_pk_constraint(legacy_name)
+        if set(primary_key["constrained_columns"]) != set(table.primary_key.columns.keys()):
+            connection.execute(
+                text(
+                    f"ALTER TABLE {preparer.quote(legacy_name)} "
+                    f"DROP CONSTRAINT {preparer.quote(primary_key['name'])}"
+                )
+            )
+
+        table.create(connection)
+
+        # new rows continue the IDs of the existing ones
+        for column in table.columns:
+            sequence_name = connection.scalar(
+                text("SELECT pg_get_serial_sequence(:name, :column)"), {"name": table.name, "column": column.name}
+            )
+            if sequence_name is None:
+                continue
+
+            column_name = preparer.quote(column.name)
+            connection.execute(
+                text(
+                    f"SELECT setval(:sequence, max({column_name})) FROM {preparer.quote(legacy_name)} "
+                    f"HAVING max({column_name}) IS NOT NULL"
+                ),
+                {"sequence": sequence_name},
+            )
+
+        connection.execute(
+            text(
+                f"ALTER TABLE {preparer.quote(table.name)} ATTACH PARTITION {preparer.quote(legacy_name)} "
+                f"FOR VALUES FROM (MINVALUE) TO ({range_end})"
+            )
+        )
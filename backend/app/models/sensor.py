@@ -1,10 +1,17 @@
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import DateTime, DECIMAL, ForeignKey, Integer, String
+from sqlalchemy import Computed, DateTime, DECIMAL, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app.config.config import SENSOR_GRID_CELL_DEGREES
 from app.models.base import Base
+from app.utilities.spatial_grid import get_grid_cell_expression
+
+
+# hourly data tables are partitioned by ranges of sensor data IDs, which grow with upload time, so whole ranges of old
+# uploads are dropped at once instead of deleting their rows. each table keeps the partition key in its primary key.
+PARTITIONED_BY_SENSOR_DATA_ID = {"postgresql_partition_by": "RANGE (sensor_data_id)"}
 
 
 class SensorFileMetadata(Base):
@@ -14,6 +21,8 @@ class SensorFileMetadata(Base):
     name: Mapped[str] = mapped_column(String(255))
     size: Mapped[int] = mapped_column(Integer)
     content_type: Mapped[str] = mapped_column(String(255))
+    # SHA-256 of the uploaded file content, unset for uploads forced through despite duplicating an earlier one
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=True, default=None)
 
     # Relationship to SensorData (one-to-one)
     sensor_data = relationship(
@@ -23,6 +32,22 @@ class SensorFileMetadata(Base):
     upload_start_date: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
     upload_end_date: Mapped[datetime] = mapped_column(DateTime, nullable=True, default=None)
 
+    __table_args__ = (
+        # keyset pagination order of file metadata listings
+        Index("ix_sensor_file_metadata_upload_start_date_id", "upload_start_date", "id"),
+        # pending uploads are listed on their own often, and are few compared to completed ones
+        Index(
+            "ix_sensor_file_metadata_pending_upload_start_date_id",
+            "upload_start_date",
+            "id",
+            postgresql_where=text("upload_end_date IS NULL"),
+        ),
+        # name prefix filters; pattern ops allow `LIKE 'prefix%'` to use the index regardless of collation
+        Index("ix_sensor_file_metadata_name", "name", postgresql_ops={"name": "varchar_pattern_ops"}),
+        # duplicate uploads are found by content; NULL hashes of forced uploads never conflict
+        Index("ix_sensor_file_metadata_content_hash", "content_hash", unique=True),
+    )
+
 
 class SensorData(Base):
     __tablename__ = "sensor_data"
@@ -36,6 +61,25 @@ class SensorData(Base):
     timezone: Mapped[str] = mapped_column(String, default="GMT", nullable=False)
     timezone_abbreviation: Mapped[str] = mapped_column(String, default="GMT", nullable=False)
     elevation: Mapped[Decimal] = mapped_column(DECIMAL, nullable=False)
+    # ID of the grid cell holding the sensor's coordinates, computed by the DB
+    grid_cell: Mapped[int] = mapped_column(
+        Integer,
+        Computed(get_grid_cell_expression("latitude", "longitude", SENSOR_GRID_CELL_DEGREES), persisted=True),
+        nullable=True,
+    )
+
+    __table_args__ = (
+        # sensor data is looked up by its upload on every read
+        Index("ix_sensor_data_file_metadata_id", "file_metadata_id"),
+        # bounding box queries across uploads match grid cells, then coordinates, without visiting the table
+        Index(
+            "ix_sensor_data_grid_cell_latitude_longitude",
+            "grid_cell",
+            "latitude",
+            "longitude",
+            postgresql_include=["id", "file_metadata_id"],
+        ),
+    )
 
     # Relationships to sensor data tables
     hourly_units = relationship(
@@ -107,9 +151,15 @@ class SensorHourlyUnits(Base):
 class HourlyTemperature(Base):
     __tablename__ = "hourly_temperature"
 
+    # serves time range reads of a single sensor data record; every per-variable hourly table has the same index
+    __table_args__ = (
+        Index("ix_hourly_temperature_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -118,9 +168,14 @@ class HourlyTemperature(Base):
 class HourlyHumidity(Base):
     __tablename__ = "hourly_humidity"
 
+    __table_args__ = (
+        Index("ix_hourly_humidity_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -129,9 +184,14 @@ class HourlyHumidity(Base):
 class HourlyDewPoint(Base):
     __tablename__ = "hourly_dew_point"
 
+    __table_args__ = (
+        Index("ix_hourly_dew_point_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -140,9 +200,14 @@ class HourlyDewPoint(Base):
 class HourlyApparentTemperature(Base):
     __tablename__ = "hourly_apparent_temperature"
 
+    __table_args__ = (
+        Index("ix_hourly_apparent_temperature_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -151,9 +216,14 @@ class HourlyApparentTemperature(Base):
 class HourlyPrecipitation(Base):
     __tablename__ = "hourly_precipitation"
 
+    __table_args__ = (
+        Index("ix_hourly_precipitation_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -162,9 +232,14 @@ class HourlyPrecipitation(Base):
 class HourlyRain(Base):
     __tablename__ = "hourly_rain"
 
+    __table_args__ = (
+        Index("ix_hourly_rain_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -173,9 +248,14 @@ class HourlyRain(Base):
 class HourlySnowfall(Base):
     __tablename__ = "hourly_snowfall"
 
+    __table_args__ = (
+        Index("ix_hourly_snowfall_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -184,9 +264,14 @@ class HourlySnowfall(Base):
 class HourlySnowDepth(Base):
     __tablename__ = "hourly_snow_depth"
 
+    __table_args__ = (
+        Index("ix_hourly_snow_depth_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -195,9 +280,14 @@ class HourlySnowDepth(Base):
 class HourlyPressureMSL(Base):
     __tablename__ = "hourly_pressure_msl"
 
+    __table_args__ = (
+        Index("ix_hourly_pressure_msl_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -206,9 +296,14 @@ class HourlyPressureMSL(Base):
 class HourlySurfacePressure(Base):
     __tablename__ = "hourly_surface_pressure"
 
+    __table_args__ = (
+        Index("ix_hourly_surface_pressure_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -217,9 +312,14 @@ class HourlySurfacePressure(Base):
 class HourlyCloudCover(Base):
     __tablename__ = "hourly_cloud_cover"
 
+    __table_args__ = (
+        Index("ix_hourly_cloud_cover_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -228,9 +328,14 @@ class HourlyCloudCover(Base):
 class HourlyWindSpeed100m(Base):
     __tablename__ = "hourly_wind_speed_100m"
 
+    __table_args__ = (
+        Index("ix_hourly_wind_speed_100m_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
@@ -239,9 +344,106 @@ class HourlyWindSpeed100m(Base):
 class HourlyWindDirection100m(Base):
     __tablename__ = "hourly_wind_direction_100m"
 
+    __table_args__ = (
+        Index("ix_hourly_wind_direction_100m_sensor_data_id_time", "sensor_data_id", "time"),
+        PARTITIONED_BY_SENSOR_DATA_ID,
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     sensor_data_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), nullable=False
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     value: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+
+
+# wide layout: a single row per sensor data ID and hour, holding the values for every weather variable
+class HourlyReading(Base):
+    __tablename__ = "hourly_reading"
+    __table_args__ = (PARTITIONED_BY_SENSOR_DATA_ID,)
+
+    sensor_data_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
+    )
+    time: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    temperature_2m: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    relative_humidity_2m: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    dew_point_2m: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    apparent_temperature: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    precipitation: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    rain: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    snowfall: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    snow_depth: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    pressure_msl: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    surface_pressure: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    cloud_cover: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    wind_speed_100m: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    wind_direction_100m: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+
+
+# daily and weekly aggregates of every weather variable, computed when an upload is processed
+class HourlyDataRollup(Base):
+    __tablename__ = "hourly_data_rollup"
+    __table_args__ = (PARTITIONED_BY_SENSOR_DATA_ID,)
+
+    sensor_data_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
+    )
+    resolution: Mapped[str] = mapped_column(String(16), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(64), primary_key=True)
+    period_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    min: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    max: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    mean: Mapped[Decimal] = mapped_column(DECIMAL, nullable=True)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    null_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class SensorDataIngestChunk(Base):
+    __tablename__ = "sensor_data_ingest_chunk"
+
+    # one record per time range chunk of hourly data that is saved, committed along with the chunk's hourly data
+    sensor_data_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("sensor_data.id", ondelete="CASCADE"), primary_key=True
+    )
+    chunk_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hour_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+# maps every `SensorHourlyData` value field to the model storing its hourly values
+HOURLY_DATA_MODELS: dict[str, type[Base]] = {
+    "temperature_2m": HourlyTemperature,
+    "relative_humidity_2m": HourlyHumidity,
+    "dew_point_2m": HourlyDewPoint,
+    "apparent_temperature": HourlyApparentTemperature,
+    "precipitation": HourlyPrecipitation,
+    "rain": HourlyRain,
+    "snowfall": HourlySnowfall,
+    "snow_depth": HourlySnowDepth,
+    "pressure_msl": HourlyPressureMSL,
+    "surface_pressure": HourlySurfacePressure,
+    "cloud_cover": HourlyCloudCover,
+    "wind_speed_100m": HourlyWindSpeed100m,
+    "wind_direction_100m": HourlyWindDirection100m,
+}
+
+# maps every `SensorHourlyData` value field to its `SensorData` relationship, i.e. its key in API responses
+HOURLY_DATA_RELATIONSHIPS: dict[str, str] = {
+    "temperature_2m": "hourly_temperatures",
+    "relative_humidity_2m": "hourly_humidities",
+    "dew_point_2m": "hourly_dew_points",
+    "apparent_temperature": "hourly_apparent_temperatures",
+    "precipitation": "hourly_precipitations",
+    "rain": "hourly_rains",
+    "snowfall": "hourly_snowfalls",
+    "snow_depth": "hourly_snow_depths",
+    "pressure_msl": "hourly_pressures_msl",
+    "surface_pressure": "hourly_surface_pressures",
+    "cloud_cover": "hourly_cloud_covers",
+    "wind_speed_100m": "hourly_wind_speeds_100m",
+    "wind_direction_100m": "hourly_wind_directions_100m",
+}
+
+# hourly data tables partitioned by sensor data ID ranges, whose partitions are created and dropped together
+PARTITIONED_MODELS: list[type[Base]] = [*HOURLY_DATA_MODELS.values(), HourlyReading, HourlyDataRollup]
@@ -1,13 +1,28 @@
 from datetime import datetime
-from typing import Sequence
+import re
+from typing import Any, AsyncIterator, Iterable, Sequence
 
-from sqlalchemy import select, update
+from asyncpg import PostgresError
+from sqlalchemy import Integer, Row, any_, delete, func, literal, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
 
-from app.models.base import Base
-from app.models.sensor import SensorData, SensorFileMetadata
+from app.models.base import HOURLY_DATA_PARTITION_LOCK_KEY, Base
+from app.models.sensor import (
+    HOURLY_DATA_MODELS,
+    PARTITIONED_MODELS,
+    HourlyDataRollup,
+    HourlyReading,
+    SensorData,
+    SensorDataIngestChunk,
+    SensorFileMetadata,
+)
+
+
+# range partition bounds as Postgres renders them, e.g. "FOR VALUES FROM (MINVALUE) TO (1000)"
+PARTITION_BOUND_PATTERN = re.compile(r"FROM \((\w+)\) TO \((\w+)\)")
 
 
 # TODO: maybe create a generic function for this process
@@ -24,6 +39,53 @@ async def save_file_metadata(file_metadata_record: SensorFileMetadata, session:
     return file_metadata_record.id
 
 
+async def save_file_metadata_batch(file_metadata_values: list[dict[str, Any]], session: AsyncSession) -> list[int]:
+    """Saves file metadata records to the database in a single multi-row insert and returns their IDs, in order."""
+
+    try:
+        file_metadata_ids = await session.scalars(
+            insert(SensorFileMetadata).returning(SensorFileMetadata.id, sort_by_parameter_order=True),
+            file_metadata_values,
+        )
+    except DBAPIError as exc:
+        print(f"error saving sensor file metadata records to DB: {exc}")
+        raise
+
+    return list(file_metadata_ids)
+
+
+async def get_file_metadata_ids_by_content_hashes(
+    content_hashes: Iterable[str], session: AsyncSession
+) -> dict[str, int]:
+    """Gets the IDs of the file metadata records of uploads with any of the given content hashes, by content hash."""
+
+    try:
+        records = await session.execute(
+            select(SensorFileMetadata.content_hash, SensorFileMetadata.id).where(
+                SensorFileMetadata.content_hash.in_(list(content_hashes))
+            )
+        )
+    except DBAPIError as exc:
+        print(f"error getting sensor file metadata by content hashes from DB: {exc}")
+        raise
+
+    return {content_hash: file_metadata_id for content_hash, file_metadata_id in records}
+
+
+async def get_file_metadata_id_by_content_hash(content_hash: str, session: AsyncSession) -> int | None:
+    """Gets the ID of the file metadata record of the upload with the given content hash, if any."""
+
+    try:
+        file_metadata_id = await session.scalar(
+            select(SensorFileMetadata.id).where(SensorFileMetadata.content_hash == content_hash)
+        )
+    except DBAPIError as exc:
+        print(f"error getting sensor file metadata by content hash from DB: {exc}")
+        raise
+
+    return file_metadata_id
+
+
 async def save_base_sensor_data(sensor_data_record: SensorData, session: AsyncSession) -> int:
     """Marks sensor data record to be saved to the database and returns its ID."""
 
@@ -37,6 +99,20 @@ async def save_base_sensor_data(sensor_data_record: SensorData, session: AsyncSe
     return sensor_data_record.id
 
 
+async def save_base_sensor_data_batch(sensor_data_values: list[dict[str, Any]], session: AsyncSession) -> list[int]:
+    """Saves sensor data records to the database in a single multi-row insert and returns their IDs, in order."""
+
+    try:
+        sensor_data_ids = await session.scalars(
+            insert(SensorData).returning(SensorData.id, sort_by_parameter_order=True), sensor_data_values
+        )
+    except DBAPIError as exc:
+        print(f"error saving sensor data records to DB: {exc}")
+        raise
+
+    return list(sensor_data_ids)
+
+
 async def save_hourly_data(hourly_data_records: list[Base], session: AsyncSession) -> None:
     """Marks hourly data records to be saved to the database."""
 
@@ -47,6 +123,24 @@ async def save_hourly_data(hourly_data_records: list[Base], session: AsyncSessio
         raise
 
 
+async def copy_hourly_data(
+    table_name: str, columns: list[str], hourly_data_records: Iterable[tuple], session: AsyncSession
+) -> None:
+    """Streams hourly data records into the given table through asyncpg's binary COPY protocol, using the session's
+    connection so the rows are committed along with the rest of the session's transaction."""
+
+    try:
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await raw_connection.driver_connection.copy_records_to_table(
+            table_name, records=hourly_data_records, columns=columns
+        )
+    except (DBAPIError, PostgresError) as exc:
+        print(f"error copying hourly sensor data records to DB table '{table_name}': {exc}")
+        raise
+
+
 async def mark_upload_completion(file_metadata_id: int, session: AsyncSession) -> None:
     """Marks upload completion time for the file metadata record."""
 
@@ -61,43 +155,107 @@ async def mark_upload_completion(file_metadata_id: int, session: AsyncSession) -
         raise
 
 
-async def get_all_file_metadata(session: AsyncSession) -> Sequence[SensorFileMetadata]:
-    """Gets all file metadata records from the database."""
+async def get_upload_end_date(
+    file_metadata_id: int, session: AsyncSession, for_update: bool = False
+) -> datetime | None:
+    """Gets the upload completion time of the file metadata record, which is unset until its upload is processed.
+    Optionally locks the record until the end of the session's transaction."""
+
+    query = select(SensorFileMetadata.upload_end_date).where(SensorFileMetadata.id == file_metadata_id)
+    if for_update:
+        query = query.with_for_update()
+
+    try:
+        upload_end_date = await session.scalar(query)
+    except DBAPIError as exc:
+        print(f"error getting sensor file upload completion time from DB: {exc}")
+        raise
+
+    return upload_end_date
+
+
+async def save_ingest_chunk(sensor_data_id: int, chunk_index: int, hour_count: int, session: AsyncSession) -> bool:
+    """Records the ingest chunk of the sensor data record as completed, unless it already is. Returns whether it was
+    recorded. A concurrent transaction recording the same chunk blocks this one until it commits or rolls back."""
+
+    try:
+        recorded_chunk_index = await session.scalar(
+            insert(SensorDataIngestChunk)
+            .values(sensor_data_id=sensor_data_id, chunk_index=chunk_index, hour_count=hour_count)
+            .on_conflict_do_nothing()
+            .returning(SensorDataIngestChunk.chunk_index)
+        )
+    except DBAPIError as exc:
+        print(f"error saving sensor data ingest chunk to DB: {exc}")
+        raise
+
+    return recorded_chunk_index is not None
+
+
+async def get_ingest_chunk_count(sensor_data_id: int, session: AsyncSession) -> int:
+    """Gets the number of completed ingest chunks of the sensor data record."""
+
+    try:
+        chunk_count = await session.scalar(
+            select(func.count())
+            .select_from(SensorDataIngestChunk)
+            .where(SensorDataIngestChunk.sensor_data_id == sensor_data_id)
+        )
+    except DBAPIError as exc:
+        print(f"error getting sensor data ingest chunk count from DB: {exc}")
+        raise
+
+    return chunk_count or 0
+
+
+async def get_file_metadata_page(
+    limit: int,
+    session: AsyncSession,
+    after: tuple[datetime, int] | None = None,
+    name_prefix: str | None = None,
+    uploaded_after: datetime | None = None,
+    uploaded_before: datetime | None = None,
+    completed: bool | None = None,
+) -> Sequence[SensorFileMetadata]:
+    """Gets up to `limit` file metadata records matching the given filters, newest first, starting after the given
+    `(upload_start_date, id)` sort key."""
+
+    query = select(SensorFileMetadata)
+
+    if after is not None:
+        # * keyset condition: seeks straight to the page through the index, instead of skipping over earlier rows
+        query = query.where(tuple_(SensorFileMetadata.upload_start_date, SensorFileMetadata.id) < after)
+    if name_prefix:
+        query = query.where(SensorFileMetadata.name.startswith(name_prefix, autoescape=True))
+    if uploaded_after is not None:
+        query = query.where(SensorFileMetadata.upload_start_date >= uploaded_after)
+    if uploaded_before is not None:
+        query = query.where(SensorFileMetadata.upload_start_date < uploaded_before)
+    if completed is not None:
+        upload_end_date = SensorFileMetadata.upload_end_date
+        query = query.where(upload_end_date.is_not(None) if completed else upload_end_date.is_(None))
+
+    query = query.order_by(SensorFileMetadata.upload_start_date.desc(), SensorFileMetadata.id.desc()).limit(limit)
 
     try:
-        result = await session.scalars(select(SensorFileMetadata))
+        result = await session.scalars(query)
         file_metadata_records = result.all()
     except DBAPIError as exc:
-        print(f"error getting all file metadata from DB: {exc}")
+        print(f"error getting page of file metadata from DB: {exc}")
         raise
 
     return file_metadata_records
 
 
-async def get_associated_sensor_data(file_metadata_id: int, session: AsyncSession) -> SensorData | None:
-    """Gets all sensor data associated with the given file metadata ID."""
+async def get_sensor_data_with_units(file_metadata_id: int, session: AsyncSession) -> SensorData | None:
+    """Gets sensor data associated with the given file metadata ID, along with its hourly units only."""
 
     try:
-        # `selectinload` avoids bottlenecking the app here, post-fetch, unlike `join`.
         query = (
             select(SensorData)
             .filter(SensorData.file_metadata_id == file_metadata_id)
-            .options(selectinload(SensorData.hourly_units))
-            .options(selectinload(SensorData.hourly_apparent_temperatures))
-            .options(selectinload(SensorData.hourly_cloud_covers))
-            .options(selectinload(SensorData.hourly_dew_points))
-            .options(selectinload(SensorData.hourly_humidities))
-            .options(selectinload(SensorData.hourly_precipitations))
-            .options(selectinload(SensorData.hourly_pressures_msl))
-            .options(selectinload(SensorData.hourly_rains))
-            .options(selectinload(SensorData.hourly_snow_depths))
-            .options(selectinload(SensorData.hourly_snowfalls))
-            .options(selectinload(SensorData.hourly_surface_pressures))
-            .options(selectinload(SensorData.hourly_temperatures))
-            .options(selectinload(SensorData.hourly_wind_directions_100m))
-            .options(selectinload(SensorData.hourly_wind_speeds_100m))
+            .options(joinedload(SensorData.hourly_units))
         )
-
         result = await session.execute(query)
         sensor_data = result.scalar_one_or_none()
     except DBAPIError as exc:
@@ -105,3 +263,414 @@ async def get_associated_sensor_data(file_metadata_id: int, session: AsyncSessio
         raise
 
     return sensor_data
+
+
+async def get_hourly_data_series(
+    sensor_data_id: int,
+    fields: Iterable[str],
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> dict[str, Sequence[Row]]:
+    """Gets the `(time, value)` rows of the given sensor data ID's hourly data fields, from the per-variable tables,
+    ordered by time and limited to the `[start, end)` time range."""
+
+    hourly_data_series: dict[str, Sequence[Row]] = {}
+
+    try:
+        for field in fields:
+            model = HOURLY_DATA_MODELS[field]
+            query = select(model.time, model.value).filter(model.sensor_data_id == sensor_data_id)  # type: ignore
+
+            if start is not None:
+                query = query.filter(model.time >= start)  # type: ignore
+            if end is not None:
+                query = query.filter(model.time < end)  # type: ignore
+
+            result = await session.execute(query.order_by(model.time))  # type: ignore
+            hourly_data_series[field] = result.all()
+    except DBAPIError as exc:
+        print(f"error getting hourly data series for sensor_data_id {sensor_data_id} from DB: {exc}")
+        raise
+
+    return hourly_data_series
+
+
+async def get_sensor_data_with_hourly_readings(
+    file_metadata_id: int,
+    session: AsyncSession,
+    fields: Iterable[str] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> tuple[SensorData | None, Sequence[Row]]:
+    """Gets sensor data associated with the given file metadata ID, along with its hourly readings from the wide
+    layout, ordered by time. Readings hold only the given fields, all by default, within the `[start, end)` time
+    range."""
+
+    sensor_data = await get_sensor_data_with_units(file_metadata_id, session)
+    if sensor_data is None:
+        return (None, [])
+
+    fields = HOURLY_DATA_MODELS if fields is None else fields
+
+    try:
+        readings_query = select(HourlyReading.time, *[getattr(HourlyReading, field) for field in fields]).filter(
+            HourlyReading.sensor_data_id == sensor_data.id
+        )
+
+        if start is not None:
+            readings_query = readings_query.filter(HourlyReading.time >= start)
+        if end is not None:
+            readings_query = readings_query.filter(HourlyReading.time < end)
+
+        readings_result = await session.execute(readings_query.order_by(HourlyReading.time))
+        hourly_readings = readings_result.all()
+    except DBAPIError as exc:
+        print(f"error getting hourly readings for file_metadata_id {file_metadata_id} from DB: {exc}")
+        raise
+
+    return (sensor_data, hourly_readings)
+
+
+async def get_hourly_data_rollups(
+    sensor_data_id: int,
+    resolution: str,
+    fields: Iterable[str],
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Sequence[Row]:
+    """Gets the given sensor data ID's hourly data rollups of the given resolution and fields, ordered by field and
+    period, for periods starting within the `[start, end)` time range."""
+
+    query = select(
+        HourlyDataRollup.metric,
+        HourlyDataRollup.period_start,
+        HourlyDataRollup.min,
+        HourlyDataRollup.max,
+        HourlyDataRollup.mean,
+        HourlyDataRollup.count,
+        HourlyDataRollup.null_count,
+    ).filter(
+        HourlyDataRollup.sensor_data_id == sensor_data_id,
+        HourlyDataRollup.resolution == resolution,
+        HourlyDataRollup.metric.in_(list(fields)),
+    )
+
+    if start is not None:
+        query = query.filter(HourlyDataRollup.period_start >= start)
+    if end is not None:
+        query = query.filter(HourlyDataRollup.period_start < end)
+
+    try:
+        result = await session.execute(query.order_by(HourlyDataRollup.metric, HourlyDataRollup.period_start))
+        rollup_records = result.all()
+    except DBAPIError as exc:
+        print(f"error getting hourly data rollups for sensor_data_id {sensor_data_id} from DB: {exc}")
+        raise
+
+    return rollup_records
+
+
+async def get_sensor_data_locations(
+    min_latitude: float,
+    max_latitude: float,
+    min_longitude: float,
+    max_longitude: float,
+    session: AsyncSession,
+    grid_cells: list[int] | None = None,
+) -> Sequence[Row]:
+    """Gets the `(id, file_metadata_id, latitude, longitude)` rows of completely uploaded sensor data within the given
+    bounding box, ordered by ID. Matching the grid cells overlapping the box, if given, lets the grid cell index narrow
+    down the coordinates to check."""
+
+    query = (
+        select(SensorData.id, SensorData.file_metadata_id, SensorData.latitude, SensorData.longitude)
+        .join(SensorFileMetadata, SensorFileMetadata.id == SensorData.file_metadata_id)
+        .filter(SensorFileMetadata.upload_end_date.is_not(None))
+        .filter(SensorData.latitude.between(min_latitude, max_latitude))
+        .filter(SensorData.longitude.between(min_longitude, max_longitude))
+    )
+    if grid_cells is not None:
+        query = query.filter(SensorData.grid_cell.in_(grid_cells))
+
+    try:
+        result = await session.execute(query.order_by(SensorData.id))
+        locations = result.all()
+    except DBAPIError as exc:
+        print(f"error getting sensor data locations within bounding box from DB: {exc}")
+        raise
+
+    return locations
+
+
+async def stream_hourly_data_series(
+    sensor_data_ids: list[int],
+    field: str,
+    session: AsyncSession,
+    batch_size: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> AsyncIterator[Sequence[Row]]:
+    """Streams the `(sensor_data_id, time, value)` rows of an hourly data field of the given sensor data IDs, from its
+    per-variable table, in batches of rows fetched through a server-side cursor. Rows are ordered by sensor data ID and
+    time, and limited to the `[start, end)` time range."""
+
+    model = HOURLY_DATA_MODELS[field]
+    # * a single array parameter, as IDs of many uploads would exceed the parameter limit of a statement
+    query = select(model.sensor_data_id, model.time, model.value).filter(  # type: ignore
+        model.sensor_data_id == any_(literal(sensor_data_ids, ARRAY(Integer)))  # type: ignore
+    )
+
+    if start is not None:
+        query = query.filter(model.time >= start)  # type: ignore
+    if end is not None:
+        query = query.filter(model.time < end)  # type: ignore
+
+    query = query.order_by(model.sensor_data_id, model.time)  # type: ignore
+
+    try:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+
+        async for rows in result.partitions():
+            yield rows
+    except DBAPIError as exc:
+        print(f"error streaming hourly data series of {field} from DB: {exc}")
+        raise
+
+
+async def stream_hourly_readings(
+    sensor_data_ids: list[int],
+    fields: Iterable[str],
+    session: AsyncSession,
+    batch_size: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> AsyncIterator[Sequence[Row]]:
+    """Streams the `(sensor_data_id, time, *values)` rows of the given hourly data fields of the given sensor data IDs,
+    from the wide layout, in batches of rows fetched through a server-side cursor. Rows are ordered by sensor data ID
+    and time, and limited to the `[start, end)` time range."""
+
+    query = select(
+        HourlyReading.sensor_data_id, HourlyReading.time, *[getattr(HourlyReading, field) for field in fields]
+    ).filter(HourlyReading.sensor_data_id == any_(literal(sensor_data_ids, ARRAY(Integer))))
+
+    if start is not None:
+        query = query.filter(HourlyReading.time >= start)
+    if end is not None:
+        query = query.filter(HourlyReading.time < end)
+
+    query = query.order_by(HourlyReading.sensor_data_id, HourlyReading.time)
+
+    try:
+        result = await session.stream(query.execution_options(yield_per=batch_size))
+
+        async for rows in result.partitions():
+            yield rows
+    except DBAPIError as exc:
+        print(f"error streaming hourly readings from DB: {exc}")
+        raise
+
+
+async def get_sensor_data_ids_without_hourly_readings(session: AsyncSession) -> Sequence[int]:
+    """Gets IDs of completely uploaded sensor data that have no hourly readings in the wide layout yet."""
+
+    try:
+        query = (
+            select(SensorData.id)
+            .join(SensorFileMetadata, SensorFileMetadata.id == SensorData.file_metadata_id)
+            .filter(SensorFileMetadata.upload_end_date.is_not(None))
+            .filter(~select(HourlyReading).filter(HourlyReading.sensor_data_id == SensorData.id).exists())
+            .order_by(SensorData.id)
+        )
+        result = await session.scalars(query)
+        sensor_data_ids = result.all()
+    except DBAPIError as exc:
+        print(f"error getting sensor data IDs pending hourly readings backfill from DB: {exc}")
+        raise
+
+    return sensor_data_ids
+
+
+async def backfill_hourly_readings(sensor_data_id: int, session: AsyncSession) -> None:
+    """Copies hourly values for the given sensor data ID from the per-variable tables into the wide layout, merging
+    every variable into the row for its hour."""
+
+    try:
+        for field, model in HOURLY_DATA_MODELS.items():
+            values_query = (
+                select(model.sensor_data_id, model.time, model.value)
+                .filter(model.sensor_data_id == sensor_data_id)
+                .distinct(model.sensor_data_id, model.time)
+            )
+            query = insert(HourlyReading).from_select(["sensor_data_id", "time", field], values_query)
+            query = query.on_conflict_do_update(
+                index_elements=[HourlyReading.sensor_data_id, HourlyReading.time],
+                set_={field: getattr(query.excluded, field)},
+            )
+
+            await session.execute(query)
+    except DBAPIError as exc:
+        print(f"error backfilling hourly readings for sensor_data_id {sensor_data_id} in DB: {exc}")
+        raise
+
+
+async def lock_hourly_data_partitions(lock_timeout: int, session: AsyncSession) -> None:
+    """Keeps other transactions from changing hourly data partitions until the end of the session's transaction, and
+    limits how long its statements wait for table locks to the given milliseconds."""
+
+    try:
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": HOURLY_DATA_PARTITION_LOCK_KEY})
+        await session.execute(text(f"SET LOCAL lock_timeout = {int(lock_timeout)}"))
+    except DBAPIError as exc:
+        print(f"error locking hourly data partitions in DB: {exc}")
+        raise
+
+
+async def get_hourly_data_partitions(session: AsyncSession) -> list[tuple[str, str, int | None, int | None]]:
+    """Gets the partitions of every hourly data table, as their table name, partition name, and the sensor data ID
+    range they hold. Unbounded range ends are None."""
+
+    try:
+        records = await session.execute(
+            text(
+                "SELECT parent.relname, partition.relname, pg_get_expr(partition.relpartbound, partition.oid) "
+                "FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class partition ON partition.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = ANY(:table_names)"
+            ),
+            {"table_names": [model.__tablename__ for model in PARTITIONED_MODELS]},
+        )
+    except DBAPIError as exc:
+        print(f"error getting hourly data partitions from DB: {exc}")
+        raise
+
+    partitions: list[tuple[str, str, int | None, int | None]] = []
+
+    for table_name, partition_name, bound in records:
+        range_start, range_end = PARTITION_BOUND_PATTERN.search(bound).groups()
+        partitions.append(
+            (table_name, partition_name, _parse_partition_bound(range_start), _parse_partition_bound(range_end))
+        )
+
+    return partitions
+
+
+def _parse_partition_bound(bound: str) -> int | None:
+    return None if bound in ("MINVALUE", "MAXVALUE") else int(bound)
+
+
+async def create_hourly_data_partitions(
+    range_starts: list[int], range_size: int, session: AsyncSession
+) -> list[str]:
+    """Creates a partition of every hourly data table for each sensor data ID range starting at the given IDs, unless
+    an existing partition overlaps it. Returns the names of the created partitions."""
+
+    existing_ranges: dict[str, list[tuple[int | None, int | None]]] = {
+        model.__tablename__: [] for model in PARTITIONED_MODELS
+    }
+    for table_name, _, existing_start, existing_end in await get_hourly_data_partitions(session):
+        existing_ranges[table_name].append((existing_start, existing_end))
+
+    partition_names: list[str] = []
+
+    try:
+        for table_name, table_ranges in existing_ranges.items():
+            for range_start in range_starts:
+                range_end = range_start + range_size
+
+                if any(
+                    (existing_start is None or existing_start < range_end)
+                    and (existing_end is None or range_start < existing_end)
+                    for existing_start, existing_end in table_ranges
+                ):
+                    continue
+
+                partition_name = f"{table_name}_p{range_start}"
+                await session.execute(
+                    text(
+                        f'CREATE TABLE "{partition_name}" PARTITION OF "{table_name}" '
+                        f"FOR VALUES FROM ({int(range_start)}) TO ({int(range_end)})"
+                    )
+                )
+                partition_names.append(partition_name)
+    except DBAPIError as exc:
+        print(f"error creating hourly data partitions in DB: {exc}")
+        raise
+
+    return partition_names
+
+
+async def drop_hourly_data_partitions(partition_names: Iterable[str], session: AsyncSession) -> None:
+    """Drops the given hourly data partitions along with all of their rows."""
+
+    try:
+        for partition_name in partition_names:
+            await session.execute(text(f'DROP TABLE "{partition_name}"'))
+    except DBAPIError as exc:
+        print(f"error dropping hourly data partitions in DB: {exc}")
+        raise
+
+
+async def get_last_sensor_data_id(session: AsyncSession) -> int:
+    """Gets the last sensor data ID handed out, including to records not committed yet or rolled back, or 0 when none
+    was. IDs are never handed out again, so sensor data ranges below it are closed to new records."""
+
+    id_sequence = func.pg_get_serial_sequence(SensorData.__tablename__, SensorData.id.name)
+
+    try:
+        last_sensor_data_id = await session.scalar(select(func.pg_sequence_last_value(id_sequence)))
+    except DBAPIError as exc:
+        print(f"error getting last sensor data ID from DB: {exc}")
+        raise
+
+    return last_sensor_data_id or 0
+
+
+def _filter_sensor_data_id_range(query, range_start: int | None, range_end: int | None):
+    if range_start is not None:
+        query = query.where(SensorData.id >= range_start)
+    if range_end is not None:
+        query = query.where(SensorData.id < range_end)
+
+    return query
+
+
+async def get_latest_upload_start_date(
+    range_start: int | None, range_end: int | None, session: AsyncSession
+) -> datetime | None:
+    """Gets the latest upload start time of sensor data with IDs in the given range, or None when there is none."""
+
+    query = select(func.max(SensorFileMetadata.upload_start_date)).join(
+        SensorData, SensorData.file_metadata_id == SensorFileMetadata.id
+    )
+
+    try:
+        latest_upload_start_date = await session.scalar(_filter_sensor_data_id_range(query, range_start, range_end))
+    except DBAPIError as exc:
+        print(f"error getting latest upload start time of sensor data ID range from DB: {exc}")
+        raise
+
+    return latest_upload_start_date
+
+
+async def delete_sensor_data_range(
+    range_start: int | None, range_end: int | None, session: AsyncSession
+) -> list[int]:
+    """Deletes the uploads of sensor data with IDs in the given range, cascading to all of their data. Returns the file
+    metadata IDs of the deleted uploads."""
+
+    file_metadata_ids = _filter_sensor_data_id_range(select(SensorData.file_metadata_id), range_start, range_end)
+
+    try:
+        result = await session.scalars(
+            delete(SensorFileMetadata)
+            .where(SensorFileMetadata.id.in_(file_metadata_ids))
+            .returning(SensorFileMetadata.id)
+        )
+    except DBAPIError as exc:
+        print(f"error deleting sensor data ID range from DB: {exc}")
+        raise
+
+    return list(result)
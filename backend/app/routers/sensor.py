@@ -1,12 +1,32 @@
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, WebSocket
+from time import time
+from typing import Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketState
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import config
 from app.models.base import get_session
+from app.schemas.sensor import NaiveUTCDatetime
 from app.services import sensor as service
-from app.services.sensor import process_sensor_data
 from app.utilities.basic_auth import authenticate_user
+from app.utilities.cache import parse_stream_id
+from app.utilities.content_negotiation import negotiate_media_type
+import app.utilities.metrics as metrics
+import app.utilities.response_formats as response_formats
 
 
 # ws_router does not use basic auth as that requires HTTP requests
@@ -15,57 +35,309 @@ router = APIRouter(prefix="/sensor", dependencies=[Depends(authenticate_user)])
 
 
 @router.get("/metadata")
-async def get_all_file_metadata(session: AsyncSession = Depends(get_session)):
-    """Gets all file metadata records from the database."""
+async def get_file_metadata(
+    cursor: str | None = None,
+    limit: int = Query(config.FILE_METADATA_PAGE_SIZE, ge=1, le=config.FILE_METADATA_MAX_PAGE_SIZE),
+    name_prefix: str | None = None,
+    uploaded_after: NaiveUTCDatetime | None = None,
+    uploaded_before: NaiveUTCDatetime | None = None,
+    completed: bool | None = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """Gets a page of file metadata records from the database, newest first. Pass the returned `next_cursor` to get the
+    following page."""
 
-    file_metadata_records = await service.get_all_file_metadata(session)
+    file_metadata_records, next_cursor = await service.get_file_metadata_page(
+        limit, session, cursor, name_prefix, uploaded_after, uploaded_before, completed
+    )
 
-    return {"data": {"file_metadata_records": file_metadata_records}}
+    return {"data": {"file_metadata_records": file_metadata_records, "next_cursor": next_cursor}}
 
 
 @router.get("/data/{file_metadata_id}")
-async def get_associated_sensor_data(file_metadata_id: int, session: AsyncSession = Depends(get_session)):
-    """Gets all sensor data, including hourly data, associated with the given file metadata ID."""
+async def get_associated_sensor_data(
+    file_metadata_id: int,
+    start: NaiveUTCDatetime | None = None,
+    end: NaiveUTCDatetime | None = None,
+    metric_names: list[str] | None = Query(None, alias="metrics"),
+    points: int | None = Query(None, ge=3, le=config.HOURLY_DATA_MAX_POINTS),
+    accept: str | None = Header(None),
+    if_none_match: str | None = Header(None),
+):
+    """Gets all sensor data, including hourly data, associated with the given file metadata ID. Hourly data can be
+    limited to the `[start, end)` time range and the given metrics, and downsampled to `points` points per metric.
+    Responds with 304 Not Modified when the `If-None-Match` header holds the response's ETag.
+
+    The `Accept` header selects the response format: `application/json` lists time and value pairs per metric, while
+    `application/vnd.sensor-data.columnar+json` and `application/msgpack` hold a single `hourly.time` array shared by
+    every metric's values, like uploaded files do. MessagePack responses hold hourly data in binary arrays: times as
+    little-endian int64 epoch seconds, and values as little-endian float64, NaN where missing."""
+
+    media_types = list(response_formats.MEDIA_TYPES.values())
+    media_type = negotiate_media_type(accept, media_types)
+    if media_type is None:
+        raise HTTPException(406, f"Not acceptable. Expected any of {media_types}.")
+
+    response_format = next(
+        response_format
+        for response_format, format_media_type in response_formats.MEDIA_TYPES.items()
+        if format_media_type == media_type
+    )
+
+    body, etag = await service.get_sensor_data_response(
+        file_metadata_id, start, end, metric_names, points, response_format, if_none_match
+    )
+    # * responses differ by format, so caches must key them by the Accept header too
+    headers = {"ETag": etag, "Vary": "Accept"}
+
+    if body is None:
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type=media_type, headers=headers)
 
-    sensor_data = await service.get_associated_sensor_data(file_metadata_id, session)
-    return {"data": {"sensor_data": sensor_data}}
+
+@router.get("/data/{file_metadata_id}/rollups")
+async def get_hourly_data_rollups(
+    file_metadata_id: int,
+    resolution: Literal["day", "week"] = "day",
+    start: NaiveUTCDatetime | None = None,
+    end: NaiveUTCDatetime | None = None,
+    metric_names: list[str] | None = Query(None, alias="metrics"),
+    session: AsyncSession = Depends(get_session),
+):
+    """Gets daily or weekly min, max, mean, count and null count of each hourly data metric, associated with the given
+    file metadata ID. Rollups can be limited to periods starting within the `[start, end)` time range and the given
+    metrics."""
+
+    rollups = await service.get_hourly_data_rollups(file_metadata_id, resolution, session, start, end, metric_names)
+    return {"data": rollups}
+
+
+@router.get("/query")
+async def query_sensor_data(
+    min_latitude: float = Query(ge=-90, le=90),
+    max_latitude: float = Query(ge=-90, le=90),
+    min_longitude: float = Query(ge=-180, le=180),
+    max_longitude: float = Query(ge=-180, le=180),
+    start: NaiveUTCDatetime | None = None,
+    end: NaiveUTCDatetime | None = None,
+    metric_names: list[str] | None = Query(None, alias="metrics"),
+):
+    """Gets the hourly data points of every completely processed upload whose sensor lies within the bounding box, in a
+    single streamed NDJSON response. Points can be limited to the `[start, end)` time range and the given metrics. Each
+    line holds a point's `file_metadata_id`, `latitude`, `longitude`, `metric`, `time` and `value`."""
+
+    fields = service.get_sensor_data_query_fields(
+        min_latitude, max_latitude, min_longitude, max_longitude, start, end, metric_names
+    )
+    points = service.stream_sensor_data_points(
+        min_latitude, max_latitude, min_longitude, max_longitude, fields, start, end
+    )
+
+    return StreamingResponse(points, media_type="application/x-ndjson")
 
 
 @router.post("/data")
-async def save_sensor_data(sensor_data_file: UploadFile, session: AsyncSession = Depends(get_session)):
-    """Upload sensor data metrics to the application."""
+async def save_sensor_data(
+    sensor_data_file: UploadFile, force: bool = False, session: AsyncSession = Depends(get_session)
+):
+    """Upload sensor data metrics to the application. Files with the same content as an earlier upload are not
+    processed again, and refer to the earlier upload instead, unless `force` is set."""
 
     if not sensor_data_file.size or sensor_data_file.content_type != "application/json":
         raise HTTPException(422, "Invalid input. Please upload a valid sensor_data JSON file.")
 
     if sensor_data_file.size > config.MAX_SENSOR_FILE_SIZE:
-        raise HTTPException(422, "Invalid input. sensor_data file size exceeds 10MB.")
+        max_file_size_mb = config.MAX_SENSOR_FILE_SIZE // (1024 * 1024)
+        raise HTTPException(422, f"Invalid input. sensor_data file size exceeds {max_file_size_mb}MB.")
+
+    content_hash = await service.hash_sensor_data_file(sensor_data_file)
+
+    # * duplicates are found before parsing, so re-uploads skip all processing
+    if not force:
+        async with session.begin():
+            duplicate_upload_id = await service.get_duplicate_upload_id(content_hash, session)
+
+        if duplicate_upload_id is not None:
+            return _get_duplicate_upload_response(duplicate_upload_id)
+
+    await service.check_ingest_admission()
+
+    try:
+        async with session.begin():
+            sensor_data = await service.parse_sensor_data(sensor_data_file)
+            file_metadata_id, sensor_data_id = await service.save_initial_data(
+                sensor_data_file, sensor_data, session, None if force else content_hash
+            )
+    except IntegrityError:
+        # a concurrent upload of the same content was saved first
+        async with session.begin():
+            duplicate_upload_id = await service.get_duplicate_upload_id(content_hash, session)
+
+        if duplicate_upload_id is None:
+            raise
+
+        return _get_duplicate_upload_response(duplicate_upload_id)
+
+    # * pass only a reference to the staged sensor data through the broker, keeping task messages small
+    staging_key = await service.stage_sensor_data(sensor_data, file_metadata_id)
+    hour_count = len(sensor_data.hourly)
+
+    # * tasks, and celery along with them, are imported on the first upload instead of at startup
+    from app.tasks.sensor import process_sensor_data
+
+    # * the job ID doubles as the task ID, tying the job to the task message
+    job_id = await service.create_ingest_job([file_metadata_id], [hour_count])
+    try:
+        process_sensor_data.apply_async(
+            (staging_key, file_metadata_id, sensor_data_id, hour_count), {"job_id": job_id}, task_id=job_id
+        )
+    except Exception as exc:
+        await service.fail_ingest_job(job_id, hour_count, exc)
+        raise
+
+    return {
+        "data": {
+            "message": "File successfully saved to DB.",
+            "file_metadata_id": file_metadata_id,
+            "duplicate": False,
+            "job_id": job_id,
+        }
+    }
 
-    async with session.begin():
-        sensor_data = await service.parse_sensor_data(sensor_data_file)
-        file_metadata_id, sensor_data_id = await service.save_initial_data(sensor_data_file, sensor_data, session)
 
-    # * serialize pydantic object into json for celery task
-    serialized_sensor_data = sensor_data.model_dump_json()
-    process_sensor_data.delay(serialized_sensor_data, file_metadata_id, sensor_data_id)
+@router.post("/data/batch")
+async def save_sensor_data_batch(
+    sensor_data_files: list[UploadFile], force: bool = False, session: AsyncSession = Depends(get_session)
+):
+    """Upload many sensor data files at once: JSON files, NDJSON files holding a JSON document per line, or zip/tar
+    archives of JSON files. Returns the outcome of every JSON document, in order. Documents with the same content as an
+    earlier upload are not processed again, unless `force` is set."""
 
-    return {"data": {"message": "File successfully saved to DB."}}
+    batch_size = sum(sensor_data_file.size or 0 for sensor_data_file in sensor_data_files)
+    if batch_size > config.MAX_SENSOR_BATCH_SIZE:
+        max_batch_size_mb = config.MAX_SENSOR_BATCH_SIZE // (1024 * 1024)
+        raise HTTPException(422, f"Invalid input. sensor_data files exceed {max_batch_size_mb}MB in total.")
+
+    await service.check_ingest_admission()
+
+    documents = await service.parse_sensor_data_batch(sensor_data_files)
+
+    try:
+        async with session.begin():
+            await service.save_initial_data_batch(documents, session, force)
+    except IntegrityError:
+        # a concurrent upload of the same content was saved first; duplicates are found again on retrying
+        async with session.begin():
+            await service.save_initial_data_batch(documents, session, force)
+
+    # * every new upload of the batch is processed through a single task message
+    staged_uploads = await service.stage_sensor_data_batch(documents)
+    job_id = None
+
+    if staged_uploads:
+        file_metadata_ids = [file_metadata_id for _, file_metadata_id, _, _ in staged_uploads]
+        hour_counts = [hour_count for _, _, _, hour_count in staged_uploads]
+
+        from app.tasks.sensor import process_sensor_data_batch
+
+        job_id = await service.create_ingest_job(file_metadata_ids, hour_counts)
+        try:
+            process_sensor_data_batch.apply_async((staged_uploads,), {"job_id": job_id}, task_id=job_id)
+        except Exception as exc:
+            await service.fail_ingest_job(job_id, sum(hour_counts), exc)
+            raise
+
+    return {"data": {"results": service.get_batch_upload_results(documents), "job_id": job_id}}
+
+
+@router.get("/jobs/{job_id}")
+async def get_ingest_job(job_id: str):
+    """Gets the status and progress of the ingest job processing an upload, or a batch of uploads: hourly rows and
+    chunks saved, and anomalies found so far."""
+
+    job = await service.get_ingest_job(job_id)
+    return {"data": job}
+
+
+def _get_duplicate_upload_response(file_metadata_id: int) -> dict:
+    """Builds the upload response for a file with the same content as the earlier upload of the given ID."""
+
+    return {
+        "data": {
+            "message": "File was already uploaded, skipped processing it again.",
+            "file_metadata_id": file_metadata_id,
+            "duplicate": True,
+        }
+    }
 
 
 @ws_router.websocket("/anomalies")
-async def stream_anomaly_updates(websocket: WebSocket):
-    """Streams all anomaly updates as they arrive."""
+async def stream_anomaly_updates(
+    websocket: WebSocket, last_event_id: str | None = Query(None, pattern=r"^\d+(-\d+)?$")
+):
+    """Streams all anomaly updates as they arrive. Given the ID of the last event a client received, first replays
+    every update published after it."""
 
     await websocket.accept()
+    metrics.WEBSOCKET_CLIENTS.inc()
+
     try:
-        while True:
-            async for data in service.consume_anomaly_updates():
-                if data is not None:
+        # * updates are read from the cache once per process and broadcast to every connected client
+        async with service.anomaly_updates_hub.subscribe() as anomaly_updates:
+            # subscribing before replaying ensures no update published in between is missed
+            if last_event_id is not None:
+                async for data in service.replay_anomaly_updates(last_event_id):
                     await websocket.send_json(data)
+                    last_event_id = data["event_id"]
 
-                await asyncio.sleep(0.05)
+            send_task = asyncio.create_task(_send_queued_updates(websocket, anomaly_updates, last_event_id))
+            disconnect_task = asyncio.create_task(_wait_for_disconnect(websocket))
+
+            # * stop as soon as the client disconnects, instead of when the next update fails to send
+            done, pending = await asyncio.wait({send_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            for task in done:
+                task.result()
+    except WebSocketDisconnect:
+        pass
     except Exception as exc:
         print(f"error streaming anomaly updates through websocket: {exc}")
         raise
     finally:
-        await websocket.close()
+        metrics.WEBSOCKET_CLIENTS.dec()
+
+        # * a client that already disconnected must not be sent a close frame
+        if (
+            websocket.client_state == WebSocketState.CONNECTED
+            and websocket.application_state == WebSocketState.CONNECTED
+        ):
+            await websocket.close()
+
+
+async def _send_queued_updates(websocket: WebSocket, updates: asyncio.Queue, last_event_id: str | None) -> None:
+    """Sends updates to the websocket client as they are queued, skipping those already sent during a replay."""
+
+    last_sent_id = parse_stream_id(last_event_id) if last_event_id is not None else None
+
+    while True:
+        data = await updates.get()
+
+        event_id = parse_stream_id(data["event_id"])
+        if last_sent_id is not None and event_id <= last_sent_id:
+            continue
+
+        await websocket.send_json(data)
+
+        # * event IDs start with the time the update was published at, in milliseconds
+        metrics.WEBSOCKET_SEND_LAG_SECONDS.observe(max(time() - event_id[0] / 1000, 0))
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Waits until the websocket client disconnects, discarding any messages it sends."""
+
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
@@ -1,9 +1,14 @@
-from dataclasses import dataclass
-from datetime import datetime
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import Self
+import json
+from math import isnan, nan
+import struct
+from typing import Annotated, Any, Iterable, Iterator, Self
+import zlib
 
-from pydantic import BaseModel, ConfigDict, model_validator
+from pydantic import AfterValidator, BaseModel, ConfigDict, field_serializer, field_validator, model_validator
 
 
 class SensorHourlyUnits(BaseModel):
@@ -62,6 +67,161 @@ class SensorHourlyData(BaseModel):
         return self
 
 
+# all hourly data fields holding weather variable values, i.e. every field apart from `time`
+HOURLY_VALUE_FIELDS = tuple(data_field for data_field in SensorHourlyData.model_fields if data_field != "time")
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_naive_utc(value: datetime) -> datetime:
+    """Converts timezone aware datetimes to naive UTC ones, the form that times are stored and compared in."""
+
+    if value.tzinfo is None:
+        return value
+
+    try:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    except OverflowError:
+        raise ValueError(f"Invalid datetime. {value.isoformat()} is out of range in UTC.")
+
+
+# * query parameters of this type can be compared with timestamp columns and with each other, whatever their offset
+NaiveUTCDatetime = Annotated[datetime, AfterValidator(to_naive_utc)]
+
+
+@dataclass
+class SensorHourlyColumns:
+    """SensorHourlyColumns holds the same values as SensorHourlyData in a compact, columnar form that takes 8 bytes per
+    datapoint instead of a `Decimal` object. Times are stored as seconds since the epoch and missing values as NaN."""
+
+    time: array = field(default_factory=lambda: array("q"))
+    values: dict[str, array] = field(
+        default_factory=lambda: {data_field: array("d") for data_field in HOURLY_VALUE_FIELDS}
+    )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def append_time(self, value: Any) -> None:
+        """Validates and appends a single time datapoint, given as an ISO 8601 string or unix timestamp."""
+
+        if isinstance(value, str):
+            time = datetime.fromisoformat(value)
+            if time.tzinfo is not None:
+                time = time.astimezone(timezone.utc).replace(tzinfo=None)
+
+            self.time.append((time - EPOCH) // timedelta(seconds=1))
+        elif isinstance(value, int) and not isinstance(value, bool):
+            self.time.append(value)
+        else:
+            raise ValueError(f"Invalid input. Expected a datetime value for time but found {value!r}.")
+
+    def append_value(self, data_field: str, value: Any) -> None:
+        """Validates and appends a single datapoint for the given weather variable."""
+
+        value_type = type(value)
+
+        # checking exact types first keeps the common case fast, and excludes booleans
+        if value_type is float or value_type is int:
+            self.values[data_field].append(value)
+        elif value is None:
+            self.values[data_field].append(nan)
+        elif value_type is Decimal or value_type is str:
+            self.values[data_field].append(float(value))
+        else:
+            raise ValueError(f"Invalid input. Expected a decimal value for {data_field} but found {value!r}.")
+
+    def validate(self, data_fields: Iterable[str]) -> Self:
+        """Performs basic validation by checking whether all hourly data fields were present and all of them contain the
+        same number of datapoints."""
+
+        missing_fields = set(SensorHourlyData.model_fields) - set(data_fields)
+        if missing_fields:
+            raise ValueError(f"Invalid input. Missing hourly data fields: {', '.join(sorted(missing_fields))}.")
+
+        data_points = len(self.time)
+        for data_field, data_values in self.values.items():
+            if len(data_values) != data_points:
+                raise ValueError(
+                    f"Invalid input. Expected {data_points} datapoints for {data_field} but found {len(data_values)}."
+                )
+
+        return self
+
+    def get_time(self, index: int) -> datetime:
+        """Gets the time datapoint at the given index as a datetime value."""
+
+        return EPOCH + timedelta(seconds=self.time[index])
+
+    def get_range(self, start: int, end: int) -> Self:
+        """Gets the hourly data columns of the datapoints within the [start, end) index range."""
+
+        return type(self)(
+            time=self.time[start:end],
+            values={data_field: data_values[start:end] for data_field, data_values in self.values.items()},
+        )
+
+    def iter_times(self) -> Iterator[datetime]:
+        """Iterates over time datapoints as datetime values."""
+
+        return (EPOCH + timedelta(seconds=seconds) for seconds in self.time)
+
+    def iter_values(self, data_field: str) -> Iterator[Decimal | None]:
+        """Iterates over datapoints for the given weather variable as decimal values, or None for missing values."""
+
+        return (None if isnan(value) else Decimal(repr(value)) for value in self.values[data_field])
+
+    @classmethod
+    def from_dict(cls, hourly_data: dict[str, Any]) -> Self:
+        """Builds and validates hourly data columns from hourly data values, in the uploaded file's format."""
+
+        hourly_columns = cls()
+
+        for value in hourly_data.get("time", []):
+            hourly_columns.append_time(value)
+
+        for data_field in HOURLY_VALUE_FIELDS:
+            for value in hourly_data.get(data_field, []):
+                hourly_columns.append_value(data_field, value)
+
+        return hourly_columns.validate(hourly_data.keys())
+
+    def to_bytes(self) -> bytes:
+        """Packs hourly data columns into raw bytes: the datapoint count followed by the time and value arrays."""
+
+        return b"".join(
+            [struct.pack("<Q", len(self)), self.time.tobytes(), *(values.tobytes() for values in self.values.values())]
+        )
+
+    @classmethod
+    def from_bytes(cls, packed_data: bytes | memoryview) -> Self:
+        """Unpacks hourly data columns from raw bytes created by `to_bytes`."""
+
+        packed_data = memoryview(packed_data)
+        (data_points,) = struct.unpack_from("<Q", packed_data)
+        column_size = data_points * 8
+        offset = 8
+
+        hourly_columns = cls()
+        hourly_columns.time.frombytes(packed_data[offset : offset + column_size])
+
+        for data_values in hourly_columns.values.values():
+            offset += column_size
+            data_values.frombytes(packed_data[offset : offset + column_size])
+
+        return hourly_columns
+
+    def to_dict(self) -> dict[str, list]:
+        """Converts hourly data columns back into hourly data values, in the uploaded file's format."""
+
+        hourly_data: dict[str, list] = {"time": [time.isoformat() for time in self.iter_times()]}
+
+        for data_field, data_values in self.values.items():
+            hourly_data[data_field] = [None if isnan(value) else value for value in data_values]
+
+        return hourly_data
+
+
 class SensorData(BaseModel):
     """SensorData defines the schema for an uploaded sensor data file."""
 
@@ -73,9 +233,47 @@ class SensorData(BaseModel):
     timezone_abbreviation: str = "GMT"
     elevation: Decimal
     hourly_units: SensorHourlyUnits
-    hourly: SensorHourlyData
+    hourly: SensorHourlyColumns
 
-    model_config = ConfigDict(hide_input_in_errors=True)
+    model_config = ConfigDict(hide_input_in_errors=True, arbitrary_types_allowed=True)
+
+    @field_validator("hourly", mode="before")
+    @classmethod
+    def validate_hourly_data(cls, hourly_data: Any) -> Any:
+        """Builds compact hourly data columns when given hourly data values in the uploaded file's format."""
+
+        if isinstance(hourly_data, dict):
+            return SensorHourlyColumns.from_dict(hourly_data)
+
+        return hourly_data
+
+    @field_serializer("hourly")
+    def serialize_hourly_data(self, hourly_data: SensorHourlyColumns) -> dict[str, list]:
+        """Serializes compact hourly data columns back into the uploaded file's format."""
+
+        return hourly_data.to_dict()
+
+    def to_bytes(self) -> bytes:
+        """Serializes sensor data into a compressed binary form, keeping hourly data columns as raw arrays instead of
+        JSON, which is much smaller and faster to load back."""
+
+        header = self.model_dump_json(exclude={"hourly"}).encode()
+        packed_data = b"".join([struct.pack("<I", len(header)), header, self.hourly.to_bytes()])
+
+        return zlib.compress(packed_data, level=1)
+
+    @classmethod
+    def from_bytes(cls, serialized_data: bytes) -> Self:
+        """Deserializes sensor data from the compressed binary form created by `to_bytes`."""
+
+        packed_data = memoryview(zlib.decompress(serialized_data))
+        (header_size,) = struct.unpack_from("<I", packed_data)
+        header_end = 4 + header_size
+
+        header: dict[str, Any] = json.loads(packed_data[4:header_end].tobytes())
+        sensor_data = cls(**header, hourly=SensorHourlyColumns.from_bytes(packed_data[header_end:]))
+
+        return sensor_data
 
 
 @dataclass
@@ -1,75 +1,378 @@
-import asyncio
+from datetime import datetime, timedelta
 from decimal import Decimal
+from hashlib import blake2b, sha256
+from itertools import repeat
 import json
-from typing import Any, Sequence
+from math import ceil, isnan
+from time import perf_counter
+from typing import Any, AsyncIterator, BinaryIO, Callable, Sequence
+from uuid import uuid4
 
 from fastapi import UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+import orjson
 from pydantic import ValidationError
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from app.config.celery import app as celery_client
-from app.config.config import ANOMALOUS_DATA_KEY, SENSOR_ANOMALOUS_THRESHOLDS
+from redis.asyncio import Redis, RedisError
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.cache import redis_client
+from app.config.config import (
+    ANOMALOUS_DATA_BATCH_SIZE,
+    ANOMALOUS_DATA_EXPIRY_TIME,
+    ANOMALOUS_DATA_KEY,
+    ANOMALOUS_DATA_MAX_LENGTH,
+    ANOMALY_STREAM_READ_COUNT,
+    ANOMALY_SUBSCRIBER_QUEUE_SIZE,
+    HOURLY_DATA_BULK_LOAD,
+    HOURLY_DATA_LAYOUT,
+    HOURLY_DATA_PARTITION_LOCK_TIMEOUT,
+    HOURLY_DATA_PARTITION_SIZE,
+    HOURLY_DATA_RETENTION_DAYS,
+    HOURLY_DATA_WRITE_LAYOUTS,
+    INGEST_BACKLOG_MAX_AGE,
+    INGEST_BACKLOG_ROWS_KEY,
+    INGEST_CHUNK_HOURS,
+    INGEST_JOB_EXPIRY_TIME,
+    INGEST_JOB_KEY,
+    INGEST_MAX_BACKLOG_ROWS,
+    INGEST_MAX_QUEUE_DEPTH,
+    INGEST_MAX_RETRY_AFTER,
+    INGEST_ROWS_PER_SECOND,
+    SENSOR_ANOMALOUS_THRESHOLDS,
+    SENSOR_DATA_RESPONSE_EXPIRY_TIME,
+    SENSOR_DATA_RESPONSE_KEY,
+    SENSOR_DATA_RESPONSE_MAX_SIZE,
+    SENSOR_DATA_RESPONSE_PREFILL,
+    SENSOR_GRID_CELL_DEGREES,
+    SENSOR_QUERY_BATCH_SIZE,
+    SENSOR_QUERY_MAX_GRID_CELLS,
+    MAX_SENSOR_BATCH_DOCUMENTS,
+    MAX_SENSOR_FILE_SIZE,
+    SENSOR_FILE_CHUNK_SIZE,
+    STAGED_SENSOR_DATA_EXPIRY_TIME,
+    STAGED_SENSOR_DATA_KEY,
+)
 from app.models.base import Base, AsyncSessionLocal
 import app.models.sensor as models
 import app.repository.sensor as repository
-from app.schemas.sensor import SensorData, SensorHourlyData, SensorHourlyUnits
+from app.schemas.sensor import EPOCH, SensorData, SensorHourlyColumns, SensorHourlyData, SensorHourlyUnits
+import app.utilities.batch_uploads as batch_uploads
 import app.utilities.cache as cache_utils
+import app.utilities.metrics as metrics
+import app.utilities.pagination as pagination
+import app.utilities.spatial_grid as spatial_grid
+from app.utilities.fanout import FanoutHub
+from app.utilities.single_flight import SingleFlight
+
+# numpy, ijson and the utilities built on numpy are imported by the functions using them, keeping them out of API
+# startup; they are loaded along with the first upload or sensor data read instead
+
+
+# column order of the records streamed into hourly data tables through COPY
+HOURLY_DATA_COLUMNS = ["sensor_data_id", "time", "value"]
+HOURLY_READING_COLUMNS = ["sensor_data_id", "time", *models.HOURLY_DATA_MODELS]
+HOURLY_DATA_ROLLUP_COLUMNS = [
+    "sensor_data_id", "resolution", "metric", "period_start", "min", "max", "mean", "count", "null_count"
+]
+
+# starts of the sensor data ID ranges whose hourly data partitions this process created or found to exist
+_hourly_data_partition_ranges: set[int] = set()
+
+# maps parser event prefixes of hourly datapoints to their hourly data fields, e.g. "hourly.time.item" to "time"
+HOURLY_VALUE_PREFIXES = {f"hourly.{field}.item": field for field in SensorHourlyData.model_fields}
+JSON_SCALAR_EVENTS = {"null", "boolean", "number", "string"}
 
 
 async def parse_sensor_data(sensor_data_file: UploadFile) -> SensorData:
     """Parses sensor data file content to prepare it for further use, catching and handling any errors during the
-    process."""
+    process. Parsing happens in a worker thread to avoid blocking the event loop for large files."""
 
-    try:
-        sensor_data_bytes = await sensor_data_file.read()
-        sensor_data_json: dict = json.loads(sensor_data_bytes)
-    except Exception as exc:
-        print(f"error parsing uploaded sensor data as JSON: {exc}")
-        raise
+    import ijson
+
+    metrics.UPLOAD_SIZE_BYTES.labels("single").observe(sensor_data_file.size or 0)
 
     try:
-        sensor_data = SensorData(**sensor_data_json)
-    except ValidationError as exc:
+        await sensor_data_file.seek(0)
+
+        with metrics.UPLOAD_PARSE_SECONDS.labels("single").time():
+            sensor_data = await run_in_threadpool(_build_sensor_data, sensor_data_file.file)
+    except ijson.JSONError as exc:
+        print(f"error parsing uploaded sensor data as JSON: {exc}")
+        raise HTTPException(422, "Invalid input. Malformed sensor data JSON.")
+    except ValueError as exc:
         print(f"error validating sensor JSON data: {exc}")
         raise HTTPException(422, "Invalid input. Malformed sensor data values.")
 
     return sensor_data
 
 
+async def parse_sensor_data_batch(sensor_data_files: list[UploadFile]) -> list[dict[str, Any]]:
+    """Parses every JSON document of batch uploaded files, i.e. JSON files, NDJSON lines and zip/tar archive members,
+    hashing each document's content as it is parsed. Returns the documents in order, each with its name, size, content
+    hash and sensor data, or else the error it failed with. Parsing happens in a worker thread, one file at a time."""
+
+    documents: list[dict[str, Any]] = []
+    start_time = perf_counter()
+
+    for sensor_data_file in sensor_data_files:
+        filename = sensor_data_file.filename or ""
+        batch_format = batch_uploads.get_batch_format(filename, sensor_data_file.content_type)
+        metrics.UPLOAD_SIZE_BYTES.labels("batch").observe(sensor_data_file.size or 0)
+
+        if batch_format is None:
+            documents.append(_get_batch_document(filename, sensor_data_file.size or 0, "Unsupported file format."))
+            continue
+
+        await sensor_data_file.seek(0)
+
+        try:
+            documents += await run_in_threadpool(
+                _parse_sensor_data_batch_file,
+                sensor_data_file.file,
+                filename,
+                batch_format,
+                MAX_SENSOR_BATCH_DOCUMENTS - len(documents),
+            )
+        except ValueError as exc:
+            print(f"error reading batch uploaded sensor data file: {exc}")
+            raise HTTPException(422, str(exc))
+
+    metrics.UPLOAD_PARSE_SECONDS.labels("batch").observe(perf_counter() - start_time)
+
+    return documents
+
+
+def _parse_sensor_data_batch_file(
+    sensor_data_file: BinaryIO, filename: str, batch_format: str, max_documents: int
+) -> list[dict[str, Any]]:
+    """Parses every JSON document of a batch uploaded file in the given format. Raises ValueError for files that are not
+    valid archives, or that hold more than `max_documents` documents."""
+
+    import ijson
+
+    documents: list[dict[str, Any]] = []
+    max_file_size_mb = MAX_SENSOR_FILE_SIZE // (1024 * 1024)
+
+    for name, size, content in batch_uploads.iter_batch_documents(
+        sensor_data_file, filename, batch_format, MAX_SENSOR_FILE_SIZE
+    ):
+        if len(documents) == max_documents:
+            raise ValueError(
+                f"Invalid input. Batch uploads are limited to {MAX_SENSOR_BATCH_DOCUMENTS} JSON documents."
+            )
+
+        if content is None:
+            documents.append(_get_batch_document(name, size, f"File size exceeds {max_file_size_mb}MB."))
+            continue
+
+        document = _get_batch_document(name, size)
+        content_reader = batch_uploads.HashingReader(content)
+
+        try:
+            document["sensor_data"] = _build_sensor_data(content_reader)  # type: ignore
+            document["content_hash"] = content_reader.hexdigest()
+        except ijson.JSONError as exc:
+            print(f"error parsing batch uploaded sensor data {name} as JSON: {exc}")
+            document["error"] = "Malformed sensor data JSON."
+        except ValueError as exc:
+            print(f"error validating batch uploaded sensor data {name}: {exc}")
+            document["error"] = "Malformed sensor data values."
+
+        documents.append(document)
+
+    return documents
+
+
+def _get_batch_document(name: str, size: int, error: str | None = None) -> dict[str, Any]:
+    """Creates the entry of a batch uploaded JSON document, which is filled in as it is parsed and saved."""
+
+    return {
+        "name": name,
+        "size": size,
+        "content_hash": None,
+        "sensor_data": None,
+        "file_metadata_id": None,
+        "sensor_data_id": None,
+        "duplicate": False,
+        "error": error,
+    }
+
+
+def _build_sensor_data(sensor_data_file: BinaryIO) -> SensorData:
+    """Parses and validates sensor data file content into sensor data. Raises `ijson.JSONError` for malformed JSON and
+    ValueError for malformed sensor data values."""
+
+    sensor_data_json, hourly_data, hourly_data_fields = _parse_sensor_data_file(sensor_data_file)
+    return SensorData(**sensor_data_json, hourly=hourly_data.validate(hourly_data_fields))
+
+
+def _parse_sensor_data_file(
+    sensor_data_file: BinaryIO,
+) -> tuple[dict[str, Any], SensorHourlyColumns, set[str]]:
+    """Incrementally parses sensor data file content, reading it in chunks and validating hourly data values into
+    compact hourly data columns as they arrive, so the raw file content is never held in memory as a whole. Returns the
+    general sensor data, the hourly data columns and the names of all hourly data fields found."""
+
+    import ijson
+
+    sensor_data_json: dict[str, Any] = {"hourly_units": {}}
+    hourly_data = SensorHourlyColumns()
+    hourly_data_fields: set[str] = set()
+
+    events = ijson.parse(sensor_data_file, buf_size=SENSOR_FILE_CHUNK_SIZE, use_float=True)
+
+    for prefix, event, value in events:
+        data_field = HOURLY_VALUE_PREFIXES.get(prefix)
+
+        if data_field is not None:
+            if event not in JSON_SCALAR_EVENTS:
+                raise ValueError(f"Invalid input. Expected single datapoints for {data_field}.")
+
+            if data_field == "time":
+                hourly_data.append_time(value)
+            else:
+                hourly_data.append_value(data_field, value)
+        elif event not in JSON_SCALAR_EVENTS:
+            if event == "start_array" and prefix.startswith("hourly."):
+                hourly_data_fields.add(prefix.removeprefix("hourly."))
+        elif prefix.startswith("hourly_units."):
+            sensor_data_json["hourly_units"][prefix.removeprefix("hourly_units.")] = value
+        elif "." not in prefix:
+            sensor_data_json[prefix] = value
+
+    return (sensor_data_json, hourly_data, hourly_data_fields)
+
+
+async def hash_sensor_data_file(sensor_data_file: UploadFile) -> str:
+    """Computes the SHA-256 hash of sensor data file content, reading it in chunks in a worker thread."""
+
+    await sensor_data_file.seek(0)
+    return await run_in_threadpool(_hash_sensor_data_file, sensor_data_file.file)
+
+
+def _hash_sensor_data_file(sensor_data_file: BinaryIO) -> str:
+    """Computes the SHA-256 hash of sensor data file content, reading it in chunks."""
+
+    content_hash = sha256()
+    while chunk := sensor_data_file.read(SENSOR_FILE_CHUNK_SIZE):
+        content_hash.update(chunk)
+
+    return content_hash.hexdigest()
+
+
+async def get_duplicate_upload_id(content_hash: str, session: AsyncSession) -> int | None:
+    """Gets the file metadata ID of an earlier upload with the same content hash, if any."""
+
+    return await repository.get_file_metadata_id_by_content_hash(content_hash, session)
+
+
 async def save_initial_data(
-    sensor_data_file: UploadFile, sensor_data: SensorData, session: AsyncSession
+    sensor_data_file: UploadFile, sensor_data: SensorData, session: AsyncSession, content_hash: str | None = None
 ) -> tuple[int, int]:
     """Parses and saves file metadata and general sensor data to the database. Returns the file metadata and sensor IDs."""
 
+    start_time = perf_counter()
+
     file_metadata_record = models.SensorFileMetadata(
-        name=sensor_data_file.filename, size=sensor_data_file.size, content_type=sensor_data_file.content_type
+        name=sensor_data_file.filename,
+        size=sensor_data_file.size,
+        content_type=sensor_data_file.content_type,
+        content_hash=content_hash,
     )
     file_metadata_id = await repository.save_file_metadata(file_metadata_record, session)
 
-    sensor_data_record = models.SensorData(file_metadata_id=file_metadata_id)
-    for field in SensorData.model_fields:
-        if "hourly" in field:
-            continue
-
-        sensor_value: str | Decimal = getattr(sensor_data, field)
-        setattr(sensor_data_record, field, sensor_value)
-
+    sensor_data_values = _get_base_sensor_data_values(sensor_data)
+    sensor_data_record = models.SensorData(file_metadata_id=file_metadata_id, **sensor_data_values)
     sensor_data_id = await repository.save_base_sensor_data(sensor_data_record, session)
 
+    metrics.SAVE_INITIAL_DATA_SECONDS.labels("single").observe(perf_counter() - start_time)
+
     return (file_metadata_id, sensor_data_id)
 
 
-async def save_hourly_data(sensor_data: SensorData, sensor_data_id: int, session: AsyncSession) -> None:
-    """Prepares hourly data records from available sensor hourly data values and saves them to the database.
-    Creates db model instances based on the hourly data field type, during iteration over all fields for
-    `SensorHourlyData` class."""
+async def save_initial_data_batch(documents: list[dict[str, Any]], session: AsyncSession, force: bool = False) -> None:
+    """Saves file metadata and general sensor data of every parsed batch document to the database, in a single
+    multi-row insert per table, setting the file metadata and sensor data IDs of each document. Documents with the same
+    content as an earlier upload, or an earlier document of the batch, refer to that upload instead of being saved,
+    unless `force` is set."""
 
-    hourly_data_records: list[Base] = []
+    start_time = perf_counter()
 
-    hourly_units = sensor_data.hourly_units
-    hourly_data = sensor_data.hourly
-    time_data_points = hourly_data.time
+    parsed_documents = [document for document in documents if document["sensor_data"] is not None]
+    earlier_uploads: dict[str, int] = {}
+
+    if not force and parsed_documents:
+        content_hashes = {document["content_hash"] for document in parsed_documents}
+        earlier_uploads = await repository.get_file_metadata_ids_by_content_hashes(content_hashes, session)
+
+    new_documents: list[dict[str, Any]] = []
+    batch_duplicates: list[tuple[dict[str, Any], dict[str, Any]]] = []
+    batch_originals: dict[str, dict[str, Any]] = {}
+
+    for document in parsed_documents:
+        # * reset, as saving is retried when a concurrent upload of the same content is saved first
+        document.update(file_metadata_id=None, sensor_data_id=None, duplicate=False)
+        content_hash = document["content_hash"]
+
+        if not force and content_hash in earlier_uploads:
+            document.update(file_metadata_id=earlier_uploads[content_hash], duplicate=True)
+        elif not force and content_hash in batch_originals:
+            batch_duplicates.append((document, batch_originals[content_hash]))
+        else:
+            batch_originals[content_hash] = document
+            new_documents.append(document)
+
+    if new_documents:
+        file_metadata_ids = await repository.save_file_metadata_batch(
+            [
+                {
+                    "name": document["name"][:255],
+                    "size": document["size"],
+                    "content_type": "application/json",
+                    "content_hash": None if force else document["content_hash"],
+                }
+                for document in new_documents
+            ],
+            session,
+        )
+        sensor_data_ids = await repository.save_base_sensor_data_batch(
+            [
+                {"file_metadata_id": file_metadata_id, **_get_base_sensor_data_values(document["sensor_data"])}
+                for document, file_metadata_id in zip(new_documents, file_metadata_ids)
+            ],
+            session,
+        )
+
+        for document, file_metadata_id, sensor_data_id in zip(new_documents, file_metadata_ids, sensor_data_ids):
+            document.update(file_metadata_id=file_metadata_id, sensor_data_id=sensor_data_id)
+
+    for document, original_document in batch_duplicates:
+        document.update(file_metadata_id=original_document["file_metadata_id"], duplicate=True)
+
+    metrics.SAVE_INITIAL_DATA_SECONDS.labels("batch").observe(perf_counter() - start_time)
+
+
+def _get_base_sensor_data_values(sensor_data: SensorData) -> dict[str, str | Decimal]:
+    """Gets the general sensor data values, i.e. every sensor data field apart from hourly data and units."""
+
+    return {field: getattr(sensor_data, field) for field in SensorData.model_fields if "hourly" not in field}
+
+
+def get_batch_upload_results(documents: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Gets the outcome of every batch uploaded JSON document, in order: its file metadata ID, whether it duplicates an
+    earlier upload, or the error it failed with."""
 
+    return [
+        {field: document[field] for field in ("name", "file_metadata_id", "duplicate", "error")}
+        for document in documents
+    ]
+
+
+async def save_hourly_units(sensor_data: SensorData, sensor_data_id: int, session: AsyncSession) -> None:
+    """Prepares the hourly units record from sensor hourly units and saves it to the database."""
+
+    hourly_units = sensor_data.hourly_units
     hourly_units_record = models.SensorHourlyUnits()
 
     for field in SensorHourlyUnits.model_fields:
@@ -78,51 +381,264 @@ async def save_hourly_data(sensor_data: SensorData, sensor_data_id: int, session
 
     hourly_units_record.sensor_data_id = sensor_data_id
 
-    for field in SensorHourlyData.model_fields:
-        if field == "time":
+    await repository.save_hourly_data([hourly_units_record], session)
+
+
+async def save_hourly_data(sensor_data: SensorData, sensor_data_id: int, session: AsyncSession) -> None:
+    """Prepares hourly data records from available sensor hourly data values and saves them to the database.
+    Hourly values are either streamed into their tables through COPY, or created as db model instances based on the
+    hourly data field type, depending on `HOURLY_DATA_BULK_LOAD`. Reports the rows/sec achieved by either mode."""
+
+    start_time = perf_counter()
+
+    if HOURLY_DATA_BULK_LOAD:
+        row_count = await _copy_hourly_data(sensor_data, sensor_data_id, session)
+    else:
+        hourly_data_records = _create_hourly_data_records(sensor_data, sensor_data_id)
+        row_count = len(hourly_data_records)
+
+        await repository.save_hourly_data(hourly_data_records, session)
+
+    # * flush pending records here, instead of at commit, so both modes are timed for the same amount of work
+    await session.flush()
+
+    elapsed_time = perf_counter() - start_time
+    load_mode = "COPY" if HOURLY_DATA_BULK_LOAD else "ORM"
+
+    metrics.SAVE_HOURLY_DATA_SECONDS.labels(load_mode.lower()).observe(elapsed_time)
+    metrics.HOURLY_DATA_ROWS_SAVED.labels(load_mode.lower()).inc(row_count)
+    print(
+        f"saved {row_count} hourly data rows for sensor data ID: {sensor_data_id} through {load_mode} in "
+        f"{elapsed_time:.3f}s ({row_count / max(elapsed_time, 1e-9):.0f} rows/sec)"
+    )
+
+
+def _create_hourly_data_records(sensor_data: SensorData, sensor_data_id: int) -> list[Base]:
+    """Creates db model instances for every hourly data value, for every layout in `HOURLY_DATA_WRITE_LAYOUTS`, based
+    on the hourly data field type."""
+
+    hourly_data_records: list[Base] = []
+
+    hourly_data = sensor_data.hourly
+    time_data_points = list(hourly_data.iter_times())
+
+    if "narrow" in HOURLY_DATA_WRITE_LAYOUTS:
+        for field, model in models.HOURLY_DATA_MODELS.items():
+            values = hourly_data.iter_values(field)
+
+            for time, value in zip(time_data_points, values):
+                model_record = model()
+
+                model_record.sensor_data_id = sensor_data_id
+                model_record.time = time
+                model_record.value = value
+
+                hourly_data_records.append(model_record)
+
+    if "wide" in HOURLY_DATA_WRITE_LAYOUTS:
+        field_values = [hourly_data.iter_values(field) for field in models.HOURLY_DATA_MODELS]
+
+        for time, *values in zip(time_data_points, *field_values):
+            reading_record = models.HourlyReading(sensor_data_id=sensor_data_id, time=time)
+
+            for field, value in zip(models.HOURLY_DATA_MODELS, values):
+                setattr(reading_record, field, value)
+
+            hourly_data_records.append(reading_record)
+
+    return hourly_data_records
+
+
+async def _copy_hourly_data(sensor_data: SensorData, sensor_data_id: int, session: AsyncSession) -> int:
+    """Streams hourly data values straight into their tables, for every layout in `HOURLY_DATA_WRITE_LAYOUTS`, without
+    creating db model instances. Returns the number of rows copied."""
+
+    hourly_data = sensor_data.hourly
+    row_count = 0
+
+    if "narrow" in HOURLY_DATA_WRITE_LAYOUTS:
+        for field, model in models.HOURLY_DATA_MODELS.items():
+            records = zip(repeat(sensor_data_id), hourly_data.iter_times(), hourly_data.iter_values(field))
+
+            await repository.copy_hourly_data(model.__tablename__, HOURLY_DATA_COLUMNS, records, session)
+            row_count += len(hourly_data)
+
+    if "wide" in HOURLY_DATA_WRITE_LAYOUTS:
+        field_values = [hourly_data.iter_values(field) for field in models.HOURLY_DATA_MODELS]
+        records = zip(repeat(sensor_data_id), hourly_data.iter_times(), *field_values)
+
+        await repository.copy_hourly_data(
+            models.HourlyReading.__tablename__, HOURLY_READING_COLUMNS, records, session
+        )
+        row_count += len(hourly_data)
+
+    return row_count
+
+
+async def save_hourly_data_rollups(sensor_data: SensorData, sensor_data_id: int, session: AsyncSession) -> None:
+    """Computes daily and weekly rollups of every hourly data field from the in-memory hourly data, and saves them to
+    the database, through COPY or as db model instances depending on `HOURLY_DATA_BULK_LOAD`."""
+
+    start_time = perf_counter()
+    records = await run_in_threadpool(_create_hourly_data_rollup_records, sensor_data.hourly, sensor_data_id)
+
+    if HOURLY_DATA_BULK_LOAD:
+        await repository.copy_hourly_data(
+            models.HourlyDataRollup.__tablename__, HOURLY_DATA_ROLLUP_COLUMNS, records, session
+        )
+    else:
+        rollup_records: list[Base] = [
+            models.HourlyDataRollup(**dict(zip(HOURLY_DATA_ROLLUP_COLUMNS, record))) for record in records
+        ]
+        await repository.save_hourly_data(rollup_records, session)
+
+    await session.flush()
+
+    elapsed_time = perf_counter() - start_time
+    print(f"saved {len(records)} hourly data rollups for sensor data ID: {sensor_data_id} in {elapsed_time:.3f}s")
+
+
+def _create_hourly_data_rollup_records(hourly_data: SensorHourlyColumns, sensor_data_id: int) -> list[tuple]:
+    """Creates hourly data rollup records, in `HOURLY_DATA_ROLLUP_COLUMNS` order, for every rollup resolution and
+    hourly data field."""
+
+    import app.utilities.rollups as rollups
+
+    records: list[tuple] = []
+
+    for resolution in rollups.ROLLUP_PERIODS:
+        for field, *aggregates in rollups.compute_rollups(hourly_data, resolution, models.HOURLY_DATA_MODELS):
+            period_starts, minimums, maximums, means, counts, null_counts = aggregates
+
+            period_rollups = zip(
+                period_starts.tolist(),
+                minimums.tolist(),
+                maximums.tolist(),
+                means.tolist(),
+                counts.tolist(),
+                null_counts.tolist(),
+            )
+
+            for period_start, minimum, maximum, mean, count, null_count in period_rollups:
+                time = EPOCH + timedelta(seconds=period_start)
+                record = (sensor_data_id, resolution, field, time, *map(_to_decimal, (minimum, maximum, mean)))
+                records.append((*record, count, null_count))
+
+    return records
+
+
+def _to_decimal(value: float) -> Decimal | None:
+    """Converts a float to its shortest exact decimal form, or None for NaN."""
+
+    return None if isnan(value) else Decimal(repr(value))
+
+
+async def ensure_hourly_data_partitions(
+    sensor_data_id: int, session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal
+) -> None:
+    """Creates the hourly data partitions of the sensor data ID range holding the given ID, and of the range after it,
+    unless they exist. Runs in a transaction of its own, as creating partitions locks their tables, so it has to happen
+    before hourly data is saved. Ranges this process already created or found are skipped without querying the DB."""
+
+    range_start = sensor_data_id // HOURLY_DATA_PARTITION_SIZE * HOURLY_DATA_PARTITION_SIZE
+    range_starts = [range_start, range_start + HOURLY_DATA_PARTITION_SIZE]
+
+    if _hourly_data_partition_ranges.issuperset(range_starts):
+        return
+
+    async with session_factory() as session:
+        async with session.begin():
+            await repository.lock_hourly_data_partitions(HOURLY_DATA_PARTITION_LOCK_TIMEOUT, session)
+            partition_names = await repository.create_hourly_data_partitions(
+                range_starts, HOURLY_DATA_PARTITION_SIZE, session
+            )
+
+    _hourly_data_partition_ranges.update(range_starts)
+
+    if partition_names:
+        print(f"created {len(partition_names)} hourly data partitions for sensor data IDs from {range_start}")
+
+
+async def ensure_upcoming_hourly_data_partitions(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> int:
+    """Creates the hourly data partitions of the sensor data IDs handed out next, unless they exist. Returns the last
+    sensor data ID handed out."""
+
+    async with session_factory() as session:
+        last_sensor_data_id = await repository.get_last_sensor_data_id(session)
+
+    await ensure_hourly_data_partitions(last_sensor_data_id + 1, session_factory)
+
+    return last_sensor_data_id
+
+
+async def drop_expired_hourly_data_partitions(
+    last_sensor_data_id: int,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+) -> None:
+    """Drops the hourly data partitions of sensor data ID ranges whose uploads all started more than
+    `HOURLY_DATA_RETENTION_DAYS` ago, and deletes those uploads along with their cached responses. Ranges that may
+    still get new sensor data IDs are kept. Each range is dropped in a transaction of its own, so the tables are locked
+    briefly at a time."""
+
+    cutoff = datetime.utcnow() - timedelta(days=HOURLY_DATA_RETENTION_DAYS)
+
+    async with session_factory() as session:
+        partitions = await repository.get_hourly_data_partitions(session)
+
+    # * every table has the same ranges, whose partitions are dropped together
+    partition_ranges: dict[tuple[int | None, int | None], list[str]] = {}
+    for _, partition_name, range_start, range_end in partitions:
+        partition_ranges.setdefault((range_start, range_end), []).append(partition_name)
+
+    for (range_start, range_end), partition_names in partition_ranges.items():
+        if range_end is None or range_end - 1 > last_sensor_data_id:
             continue
-        elif field == "temperature_2m":
-            model = models.HourlyTemperature
-        elif field == "relative_humidity_2m":
-            model = models.HourlyHumidity
-        elif field == "dew_point_2m":
-            model = models.HourlyDewPoint
-        elif field == "apparent_temperature":
-            model = models.HourlyApparentTemperature
-        elif field == "precipitation":
-            model = models.HourlyPrecipitation
-        elif field == "rain":
-            model = models.HourlyRain
-        elif field == "snowfall":
-            model = models.HourlySnowfall
-        elif field == "snow_depth":
-            model = models.HourlySnowDepth
-        elif field == "pressure_msl":
-            model = models.HourlyPressureMSL
-        elif field == "surface_pressure":
-            model = models.HourlySurfacePressure
-        elif field == "cloud_cover":
-            model = models.HourlyCloudCover
-        elif field == "wind_speed_100m":
-            model = models.HourlyWindSpeed100m
-        else:
-            model = models.HourlyWindDirection100m
 
-        values: list = getattr(hourly_data, field)
+        async with session_factory() as session:
+            async with session.begin():
+                await repository.lock_hourly_data_partitions(HOURLY_DATA_PARTITION_LOCK_TIMEOUT, session)
+
+                latest_upload_start_date = await repository.get_latest_upload_start_date(
+                    range_start, range_end, session
+                )
+                if latest_upload_start_date is not None and latest_upload_start_date >= cutoff:
+                    continue
+
+                await repository.drop_hourly_data_partitions(partition_names, session)
+                file_metadata_ids = await repository.delete_sensor_data_range(range_start, range_end, session)
 
-        for index, value in enumerate(values):
-            time = time_data_points[index]
-            model_record = model()
+        print(
+            f"dropped {len(partition_names)} hourly data partitions of sensor data IDs up to {range_end}, "
+            f"deleting {len(file_metadata_ids)} expired uploads"
+        )
 
-            model_record.sensor_data_id = sensor_data_id
-            model_record.time = time
-            model_record.value = value
+        # * invalidated once the deletion is committed, so reads in between can't cache the deleted uploads again
+        await invalidate_sensor_data_responses(file_metadata_ids, cache_client)
 
-            hourly_data_records.append(model_record)
 
-    hourly_data_records.append(hourly_units_record)
+async def invalidate_sensor_data_responses(file_metadata_ids: list[int], cache_client: Redis = redis_client) -> None:
+    """Deletes the cached sensor data responses of the given uploads, in every format and for every filter."""
+
+    if not file_metadata_ids:
+        return
+
+    invalidated_ids = {str(file_metadata_id) for file_metadata_id in file_metadata_ids}
+
+    try:
+        keys = await cache_utils.get_keys(f"{SENSOR_DATA_RESPONSE_KEY}:*", cache_client)
+
+        # keys are formed as `<prefix>:<file metadata ID>[:<format>][:<filters digest>]`
+        invalidated_keys = [key for key in keys if key.decode("utf-8").split(":")[1] in invalidated_ids]
+        if invalidated_keys:
+            await cache_utils.delete_values(invalidated_keys, cache_client)
+    except RedisError:
+        # the uploads are already deleted; their cached responses expire after `SENSOR_DATA_RESPONSE_EXPIRY_TIME`
+        return
 
-    await repository.save_hourly_data(hourly_data_records, session)
+    print(f"invalidated {len(invalidated_keys)} cached sensor data responses of {len(file_metadata_ids)} uploads")
 
 
 async def mark_upload_completion(file_metadata_id: int, session: AsyncSession) -> None:
@@ -131,115 +647,905 @@ async def mark_upload_completion(file_metadata_id: int, session: AsyncSession) -
     await repository.mark_upload_completion(file_metadata_id, session)
 
 
-async def get_all_file_metadata(session: AsyncSession) -> Sequence[models.SensorFileMetadata]:
-    """Gets all file metadata records from the database."""
+async def get_file_metadata_page(
+    limit: int,
+    session: AsyncSession,
+    cursor: str | None = None,
+    name_prefix: str | None = None,
+    uploaded_after: datetime | None = None,
+    uploaded_before: datetime | None = None,
+    completed: bool | None = None,
+) -> tuple[Sequence[models.SensorFileMetadata], str | None]:
+    """Gets a page of file metadata records matching the given filters, newest first, along with the cursor of the next
+    page, if there is one."""
 
-    file_metadata_records = await repository.get_all_file_metadata(session)
+    try:
+        after = pagination.decode_cursor(cursor) if cursor is not None else None
+    except ValueError as exc:
+        print(f"error decoding file metadata cursor: {exc}")
+        raise HTTPException(422, "Invalid cursor.")
+
+    # * fetch one record past the page to find out whether a next page exists
+    file_metadata_records = await repository.get_file_metadata_page(
+        limit + 1, session, after, name_prefix, uploaded_after, uploaded_before, completed
+    )
+
+    if len(file_metadata_records) <= limit:
+        return file_metadata_records, None
 
-    return file_metadata_records
+    file_metadata_records = file_metadata_records[:limit]
+    last_record = file_metadata_records[-1]
 
+    return file_metadata_records, pagination.encode_cursor(last_record.upload_start_date, last_record.id)
 
-async def get_associated_sensor_data(file_metadata_id: int, session: AsyncSession) -> models.SensorData | None:
-    """Gets all sensor data associated with the given file metadata ID."""
 
-    sensor_data = await repository.get_associated_sensor_data(file_metadata_id, session)
+async def get_associated_sensor_data(
+    file_metadata_id: int,
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    metric_names: list[str] | None = None,
+    points: int | None = None,
+    columnar: bool = False,
+) -> dict[str, Any]:
+    """Gets all sensor data associated with the given file metadata ID, from the layout set by `HOURLY_DATA_LAYOUT`.
+    Hourly data can be limited to the `[start, end)` time range and the given metrics, and downsampled to about the
+    given number of points per metric. Columnar hourly data holds a single time array shared by all metrics' values,
+    like uploaded hourly data does."""
 
-    if sensor_data is None:
+    fields = _get_hourly_data_fields(start, end, metric_names)
+
+    sensor_data_record, hourly_data_series = await _get_hourly_data_series(
+        file_metadata_id, fields, session, start, end
+    )
+    if sensor_data_record is None:
         raise HTTPException(404, "Sensor data not found.")
 
+    if points is not None:
+        hourly_data_series = await run_in_threadpool(_downsample_hourly_data_series, hourly_data_series, points)
+
+    if columnar:
+        return await run_in_threadpool(_serialize_hourly_data_columns, sensor_data_record, hourly_data_series)
+
+    return _serialize_hourly_data_series(sensor_data_record, hourly_data_series)
+
+
+async def _get_hourly_data_series(
+    file_metadata_id: int,
+    fields: list[str],
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> tuple[models.SensorData | None, dict[str, Sequence[Any]]]:
+    """Gets sensor data associated with the given file metadata ID, along with the `(time, value)` series of the given
+    hourly data fields within the `[start, end)` time range, from the layout set by `HOURLY_DATA_LAYOUT`."""
+
+    # * range and field filters are applied in SQL, so only the requested hourly rows are loaded
+    if HOURLY_DATA_LAYOUT == "wide":
+        sensor_data_record, hourly_readings = await repository.get_sensor_data_with_hourly_readings(
+            file_metadata_id, session, fields, start, end
+        )
+        hourly_data_series = {
+            field: [(reading.time, getattr(reading, field)) for reading in hourly_readings] for field in fields
+        }
+    else:
+        sensor_data_record = await repository.get_sensor_data_with_units(file_metadata_id, session)
+        hourly_data_series = (
+            {}
+            if sensor_data_record is None
+            else await repository.get_hourly_data_series(sensor_data_record.id, fields, session, start, end)
+        )
+
+    return sensor_data_record, hourly_data_series
+
+
+async def get_hourly_data_rollups(
+    file_metadata_id: int,
+    resolution: str,
+    session: AsyncSession,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    metric_names: list[str] | None = None,
+) -> dict[str, Any]:
+    """Gets the daily or weekly hourly data rollups of the sensor data associated with the given file metadata ID,
+    grouped by metric. Rollups can be limited to periods starting within the `[start, end)` time range and the given
+    metrics."""
+
+    fields = _get_hourly_data_fields(start, end, metric_names)
+
+    sensor_data_record = await repository.get_sensor_data_with_units(file_metadata_id, session)
+    if sensor_data_record is None:
+        raise HTTPException(404, "Sensor data not found.")
+
+    rollup_records = await repository.get_hourly_data_rollups(
+        sensor_data_record.id, resolution, fields, session, start, end
+    )
+
+    metric_rollups: dict[str, list[dict[str, Any]]] = {field: [] for field in fields}
+    for metric, *aggregates in rollup_records:
+        metric_rollups[metric].append(dict(zip(HOURLY_DATA_ROLLUP_COLUMNS[3:], aggregates)))
+
+    return {"resolution": resolution, "hourly_units": sensor_data_record.hourly_units, "rollups": metric_rollups}
+
+
+def _get_hourly_data_fields(start: datetime | None, end: datetime | None, metric_names: list[str] | None) -> list[str]:
+    """Validates hourly data filters, returning the hourly data fields to get: the given metrics, or all of them."""
+
+    if metric_names is not None and not set(metric_names) <= models.HOURLY_DATA_MODELS.keys():
+        raise HTTPException(422, f"Invalid metrics. Expected any of {list(models.HOURLY_DATA_MODELS)}.")
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(422, "Invalid time range. start must be earlier than end.")
+
+    return list(dict.fromkeys(metric_names)) if metric_names else list(models.HOURLY_DATA_MODELS)
+
+
+def get_sensor_data_query_fields(
+    min_latitude: float,
+    max_latitude: float,
+    min_longitude: float,
+    max_longitude: float,
+    start: datetime | None,
+    end: datetime | None,
+    metric_names: list[str] | None,
+) -> list[str]:
+    """Validates sensor data query filters, returning the hourly data fields to get: the given metrics, or all."""
+
+    if min_latitude > max_latitude or min_longitude > max_longitude:
+        raise HTTPException(422, "Invalid bounding box. Minimum coordinates must not exceed maximum coordinates.")
+
+    return _get_hourly_data_fields(start, end, metric_names)
+
+
+async def stream_sensor_data_points(
+    min_latitude: float,
+    max_latitude: float,
+    min_longitude: float,
+    max_longitude: float,
+    fields: list[str],
+    start: datetime | None = None,
+    end: datetime | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+) -> AsyncIterator[bytes]:
+    """Streams the hourly data points of the given fields, within the `[start, end)` time range, of every completely
+    uploaded sensor data within the bounding box, as NDJSON lines written in batches as they are fetched from the DB.
+    Each line holds a point's file metadata ID, coordinates, metric, time and value, which is null where missing.
+    Points are ordered by upload and time, and by metric too in the narrow layout."""
+
+    grid_cells = spatial_grid.get_grid_cells(
+        min_latitude, max_latitude, min_longitude, max_longitude, SENSOR_GRID_CELL_DEGREES, SENSOR_QUERY_MAX_GRID_CELLS
+    )
+
+    # * the stream outlives the request handler, so it keeps a session of its own until the last point is written
+    async with session_factory() as session:
+        sensor_data_locations = await repository.get_sensor_data_locations(
+            min_latitude, max_latitude, min_longitude, max_longitude, session, grid_cells
+        )
+        locations = {
+            sensor_data_id: {"file_metadata_id": file_metadata_id, "latitude": latitude, "longitude": longitude}
+            for sensor_data_id, file_metadata_id, latitude, longitude in sensor_data_locations
+        }
+
+        if not locations:
+            return
+
+        if HOURLY_DATA_LAYOUT == "wide":
+            readings = repository.stream_hourly_readings(
+                list(locations), fields, session, SENSOR_QUERY_BATCH_SIZE, start, end
+            )
+
+            async for rows in readings:
+                yield b"".join(
+                    _serialize_sensor_data_point(locations[sensor_data_id], field, time, value)
+                    for sensor_data_id, time, *values in rows
+                    for field, value in zip(fields, values)
+                )
+        else:
+            for field in fields:
+                series = repository.stream_hourly_data_series(
+                    list(locations), field, session, SENSOR_QUERY_BATCH_SIZE, start, end
+                )
+
+                async for rows in series:
+                    yield b"".join(
+                        _serialize_sensor_data_point(locations[sensor_data_id], field, time, value)
+                        for sensor_data_id, time, value in rows
+                    )
+
+
+def _serialize_sensor_data_point(
+    location: dict[str, Any], field: str, time: datetime, value: Decimal | None
+) -> bytes:
+    """Serializes an hourly data point, along with the location of its sensor, into an NDJSON line."""
+
+    point = {**location, "metric": field, "time": time, "value": value}
+    return orjson.dumps(point, default=float, option=orjson.OPT_APPEND_NEWLINE)
+
+
+async def get_sensor_data_response(
+    file_metadata_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    metric_names: list[str] | None = None,
+    points: int | None = None,
+    response_format: str = "json",
+    if_none_match: str | None = None,
+) -> tuple[bytes | None, str]:
+    """Gets the sensor data response for the given file metadata ID and hourly data filters, serialized in the given
+    `response_formats.MEDIA_TYPES` format, along with its ETag. Responses are read through the cache; no response body is
+    returned when the ETag matches `if_none_match`."""
+
+    key = get_sensor_data_response_key(file_metadata_id, start, end, metric_names, points, response_format)
+
+    # * the body is fetched along with the ETag, so clients revalidating a stale ETag are still served from cache
+    try:
+        cached_etag, cached_body = await cache_utils.get_hash_values(key, ["etag", "body"])
+    except RedisError:
+        # * the cache only saves work, fall back to loading the response from the DB
+        cached_etag = cached_body = None
+
+    if cached_etag is not None:
+        etag = cached_etag.decode("utf-8")
+
+        if _etag_matches(if_none_match, etag):
+            return None, etag
+        if cached_body is not None:
+            return cached_body, etag
+
+    # * concurrent cache misses for the same response share a single DB load
+    body, etag = await sensor_data_response_loads.do(
+        key, lambda: load_sensor_data_response(file_metadata_id, start, end, metric_names, points, response_format)
+    )
+
+    if _etag_matches(if_none_match, etag):
+        return None, etag
+
+    return body, etag
+
+
+async def load_sensor_data_response(
+    file_metadata_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    metric_names: list[str] | None = None,
+    points: int | None = None,
+    response_format: str = "json",
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+) -> tuple[bytes, str]:
+    """Loads and serializes the sensor data response for the given file metadata ID and hourly data filters, in the
+    given `response_formats.MEDIA_TYPES` format, returning it along with its ETag. Caches the response once the upload is
+    completely processed, unless it is larger than `SENSOR_DATA_RESPONSE_MAX_SIZE` bytes."""
+
+    import app.utilities.response_formats as response_formats
+
+    async with session_factory() as session:
+        # completion is committed along with the hourly data, so a completed upload's data is always complete
+        upload_end_date = await repository.get_upload_end_date(file_metadata_id, session)
+        columnar = response_format != "json"
+        sensor_data = await get_associated_sensor_data(
+            file_metadata_id, session, start, end, metric_names, points, columnar
+        )
+
+        body = await run_in_threadpool(response_formats.SERIALIZERS[response_format], sensor_data)
+
+    etag = f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+    # * responses above the size limit are served from the DB every time, keeping them out of the broker's Redis
+    if upload_end_date is not None and len(body) <= SENSOR_DATA_RESPONSE_MAX_SIZE:
+        key = get_sensor_data_response_key(file_metadata_id, start, end, metric_names, points, response_format)
+
+        try:
+            await cache_utils.set_hash_values(
+                key, {"etag": etag, "body": body}, SENSOR_DATA_RESPONSE_EXPIRY_TIME, cache_client
+            )
+        except RedisError:
+            pass
+
+    return body, etag
+
+
+def get_sensor_data_response_key(
+    file_metadata_id: int,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    metric_names: list[str] | None = None,
+    points: int | None = None,
+    response_format: str = "json",
+) -> str:
+    """Gets the cache key of the sensor data response for the given file metadata ID, hourly data filters and response
+    format."""
+
+    key = f"{SENSOR_DATA_RESPONSE_KEY}:{file_metadata_id}"
+    if response_format != "json":
+        key = f"{key}:{response_format}"
+
+    if all(parameter is None for parameter in (start, end, metric_names, points)):
+        return key
+
+    # metrics keep their order, as responses list them in the requested order
+    filters = [
+        start.isoformat() if start is not None else "",
+        end.isoformat() if end is not None else "",
+        ",".join(metric_names or []),
+        str(points or ""),
+    ]
+    filters_digest = blake2b("|".join(filters).encode("utf-8"), digest_size=16).hexdigest()
+    return f"{key}:{filters_digest}"
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks whether the ETag is one of the ETags of an `If-None-Match` header, compared weakly."""
+
+    if if_none_match is None:
+        return False
+
+    etags = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in etags or etag in etags
+
+
+def _downsample_hourly_data_series(
+    hourly_data_series: dict[str, Sequence[Any]], points: int
+) -> dict[str, Sequence[Any]]:
+    """Downsamples every `(time, value)` series longer than the given number of points with LTTB, keeping the points
+    that best preserve its shape. Null values are left out of downsampled series, as they cannot be plotted."""
+
+    import numpy as np
+
+    import app.utilities.downsampling as downsampling
+
+    downsampled_series: dict[str, Sequence[Any]] = {}
+
+    for field, series in hourly_data_series.items():
+        if len(series) <= points:
+            downsampled_series[field] = series
+            continue
+
+        series = [row for row in series if row[1] is not None]
+        times = np.fromiter(((row[0] - EPOCH).total_seconds() for row in series), dtype=np.float64, count=len(series))
+        values = np.fromiter((row[1] for row in series), dtype=np.float64, count=len(series))
+
+        selected_indexes = downsampling.largest_triangle_three_buckets(times, values, points)
+        downsampled_series[field] = [series[index] for index in selected_indexes]
+
+    return downsampled_series
+
+
+def _serialize_record(record: Base) -> dict[str, Any]:
+    """Serializes a record into a dict of its table's columns, leaving out its relationships."""
+
+    return {column.key: getattr(record, column.key) for column in record.__table__.columns}
+
+
+def _serialize_hourly_data_columns(
+    sensor_data_record: models.SensorData, hourly_data_series: dict[str, Sequence[Any]]
+) -> dict[str, Any]:
+    """Serializes sensor data and its `(time, value)` hourly data series into columns: times, as epoch seconds, shared
+    by the values of every field, which are NaN where a field has no value at a time."""
+
+    import numpy as np
+
+    sensor_data = _serialize_record(sensor_data_record)
+    hourly_units_record = sensor_data_record.hourly_units
+    sensor_data["hourly_units"] = None if hourly_units_record is None else _serialize_record(hourly_units_record)
+
+    series_times: dict[str, np.ndarray] = {}
+    series_values: dict[str, np.ndarray] = {}
+
+    for field, series in hourly_data_series.items():
+        # numpy converts datetimes and decimals in C loops; None values become NaN
+        times = np.array([row[0] for row in series], dtype="datetime64[s]")
+        series_times[field] = (times - np.datetime64(EPOCH, "s")).astype(np.int64)
+        series_values[field] = np.array([row[1] for row in series], dtype=np.float64)
+
+    # * series of different fields may hold different times, e.g. once downsampled, so all are aligned to their union
+    shared_times = np.unique(np.concatenate(list(series_times.values()))) if series_times else np.empty(0, np.int64)
+    hourly_data: dict[str, np.ndarray] = {"time": shared_times}
+
+    for field, times in series_times.items():
+        if len(times) == len(shared_times):
+            hourly_data[field] = series_values[field]
+            continue
+
+        values = np.full(len(shared_times), np.nan)
+        values[np.searchsorted(shared_times, times)] = series_values[field]
+        hourly_data[field] = values
+
+    sensor_data["hourly"] = hourly_data
+    return sensor_data
+
+
+def _serialize_hourly_data_series(
+    sensor_data_record: models.SensorData, hourly_data_series: dict[str, Sequence[Any]]
+) -> dict[str, Any]:
+    """Serializes sensor data and its `(time, value)` hourly data series into lists of time and value pairs per metric.
+    Every layout and filter is served through it, keeping API responses identical across them."""
+
+    sensor_data = _serialize_record(sensor_data_record)
+    hourly_units_record = sensor_data_record.hourly_units
+    sensor_data["hourly_units"] = None if hourly_units_record is None else _serialize_record(hourly_units_record)
+
+    for field, series in hourly_data_series.items():
+        relationship = models.HOURLY_DATA_RELATIONSHIPS[field]
+        sensor_data[relationship] = [{"time": time, "value": value} for time, value in series]
+
     return sensor_data
 
 
-async def check_hourly_data(sensor_data: SensorData, file_metadata_id: int) -> None:
-    """Checks hourly data, caching any detected anomalous values, for further processing."""
+async def check_hourly_data(
+    sensor_data: SensorData, file_metadata_id: int, cache_client: Redis = redis_client
+) -> int:
+    """Checks hourly data, caching any detected anomalous values, for further processing. Returns the number of
+    anomalous values found."""
+
+    anomalous_data = find_anomalous_data(sensor_data, file_metadata_id)
+    await publish_anomalous_data(anomalous_data, file_metadata_id, cache_client)
+
+    return len(anomalous_data)
 
+
+def find_anomalous_data(sensor_data: SensorData, file_metadata_id: int) -> list[dict[str, Any]]:
+    """Finds the anomalous values of hourly data, as the anomaly updates to be published for them."""
+
+    import app.utilities.anomaly_detection as anomaly_detection
+
+    start_time = perf_counter()
     hourly_data = sensor_data.hourly
-    time_data_points = hourly_data.time
 
-    for field in SensorHourlyData.model_fields:
-        # precipitation-rain have similar values, skipping
-        if field == "time" or field == "rain":
+    # precipitation-rain have similar values, skipping
+    anomalies = anomaly_detection.find_anomalies(hourly_data, SENSOR_ANOMALOUS_THRESHOLDS, skipped_fields=["rain"])
+
+    anomalous_data = [
+        {
+            "id": file_metadata_id,
+            "type": field,
+            "time": str(hourly_data.get_time(index)),
+            "value": repr(hourly_data.values[field][index]),
+        }
+        for field, index in anomalies
+    ]
+
+    metrics.ANOMALY_CHECK_SECONDS.observe(perf_counter() - start_time)
+    metrics.ANOMALIES_FOUND.inc(len(anomalies))
+
+    return anomalous_data
+
+
+async def publish_anomalous_data(
+    anomalous_data: list[dict[str, Any]], file_metadata_id: int, cache_client: Redis = redis_client
+) -> None:
+    """Caches anomalous data updates in the anomaly stream, for notifications."""
+
+    publisher = cache_utils.BatchedStreamPublisher(
+        ANOMALOUS_DATA_KEY,
+        ANOMALOUS_DATA_BATCH_SIZE,
+        ANOMALOUS_DATA_EXPIRY_TIME,
+        ANOMALOUS_DATA_MAX_LENGTH,
+        client=cache_client,
+    )
+
+    async with publisher:
+        for anomalous_value in anomalous_data:
+            await publisher.append(anomalous_value)
+
+    print(f"published anomalies for file metadata ID: {file_metadata_id}: {publisher.get_stats()}")
+
+
+async def stage_sensor_data(sensor_data: SensorData, file_metadata_id: int) -> str:
+    """Stores sensor data in the staging area, in compressed binary form, until a worker processes it. Returns the
+    staging key referencing it."""
+
+    staging_key = f"{STAGED_SENSOR_DATA_KEY}:{file_metadata_id}"
+    serialized_sensor_data = await run_in_threadpool(sensor_data.to_bytes)
+
+    await cache_utils.set_value(staging_key, serialized_sensor_data, STAGED_SENSOR_DATA_EXPIRY_TIME)
+    print(f"staged {len(serialized_sensor_data)} bytes of sensor data for file metadata ID: {file_metadata_id}")
+
+    return staging_key
+
+
+async def stage_sensor_data_batch(documents: list[dict[str, Any]]) -> list[tuple[str, int, int, int]]:
+    """Stores the sensor data of every newly saved batch document in the staging area. Returns the staging key, file
+    metadata ID, sensor data ID and hour count of each, which is all a worker needs to process them."""
+
+    staged_uploads: list[tuple[str, int, int, int]] = []
+
+    for document in documents:
+        if document["sensor_data_id"] is None:
             continue
 
-        threshold_values = SENSOR_ANOMALOUS_THRESHOLDS.get(field)
-        if threshold_values is None:
+        sensor_data: SensorData = document["sensor_data"]
+        file_metadata_id, sensor_data_id = document["file_metadata_id"], document["sensor_data_id"]
+
+        staging_key = await stage_sensor_data(sensor_data, file_metadata_id)
+        staged_uploads.append((staging_key, file_metadata_id, sensor_data_id, len(sensor_data.hourly)))
+
+    return staged_uploads
+
+
+async def load_staged_sensor_data(staging_key: str, cache_client: Redis = redis_client) -> SensorData:
+    """Loads sensor data from the staging area given its staging key."""
+
+    serialized_sensor_data: bytes | None = await cache_utils.get_value(staging_key, cache_client)
+    if serialized_sensor_data is None:
+        raise LookupError(f"staged sensor data '{staging_key}' not found, it may have expired")
+
+    # * decompressing runs off the event loop, which other tasks of the worker share
+    return await run_in_threadpool(SensorData.from_bytes, serialized_sensor_data)
+
+
+async def check_ingest_admission() -> None:
+    """Rejects new uploads while the ingest backlog exceeds its limits, i.e. the number of messages waiting in the
+    broker queue or of hourly rows waiting to be saved. Clients are told to retry once the backlog would be saved at
+    `INGEST_ROWS_PER_SECOND`."""
+
+    # * celery is imported on first use, keeping it out of API startup
+    from app.config.celery import app as celery_client
+
+    try:
+        queue_depth = await cache_utils.get_list_length(celery_client.conf.task_default_queue)
+        backlog_row_count = max(int(await cache_utils.get_value(INGEST_BACKLOG_ROWS_KEY) or 0), 0)
+    except RedisError:
+        # * the backlog is unknown without the broker, whose unavailability enqueueing reports instead
+        return
+
+    if queue_depth <= INGEST_MAX_QUEUE_DEPTH and backlog_row_count <= INGEST_MAX_BACKLOG_ROWS:
+        return
+
+    retry_after = min(max(ceil(backlog_row_count / INGEST_ROWS_PER_SECOND), 1), INGEST_MAX_RETRY_AFTER)
+    print(f"rejected upload with {queue_depth} queued messages and {backlog_row_count} backlog rows")
+
+    raise HTTPException(
+        429, "Too many uploads are waiting to be processed. Please retry later.", {"Retry-After": str(retry_after)}
+    )
+
+
+async def create_ingest_job(file_metadata_ids: list[int], hour_counts: list[int]) -> str:
+    """Creates an ingest job tracking the processing of the given uploads, holding the given numbers of hourly rows,
+    and adds their hourly rows to the ingest backlog. Returns the job ID."""
+
+    job_id = uuid4().hex
+    row_count = sum(hour_counts)
+    chunk_count = sum(len(get_ingest_chunks(hour_count)) for hour_count in hour_counts)
+
+    job_values = {
+        "created_at": datetime.utcnow().isoformat(),
+        "file_metadata_ids": json.dumps(file_metadata_ids),
+        "upload_count": str(len(file_metadata_ids)),
+        "rows_total": str(row_count),
+        "chunks_total": str(chunk_count),
+    }
+
+    await cache_utils.set_hash_values(f"{INGEST_JOB_KEY}:{job_id}", job_values, INGEST_JOB_EXPIRY_TIME)
+    await cache_utils.increment_value(INGEST_BACKLOG_ROWS_KEY, row_count)
+    # * rows never removed from the backlog, e.g. of tasks lost along with their worker, expire along with it
+    await cache_utils.set_expiry(INGEST_BACKLOG_ROWS_KEY, INGEST_BACKLOG_MAX_AGE)
+
+    return job_id
+
+
+async def update_ingest_job(
+    job_id: str | None,
+    increments: dict[str, int],
+    values: dict[str, bytes | str] | None = None,
+    cache_client: Redis = redis_client,
+) -> None:
+    """Increments progress counters of an ingest job, and sets any other given fields. Progress is only informational,
+    so errors updating it are reported without failing processing."""
+
+    if job_id is None:
+        return
+
+    try:
+        await cache_utils.increment_hash_values(
+            f"{INGEST_JOB_KEY}:{job_id}", increments, values, INGEST_JOB_EXPIRY_TIME, cache_client
+        )
+    except RedisError as exc:
+        print(f"error updating ingest job {job_id}: {exc}")
+
+
+async def record_ingest_chunk(
+    job_id: str | None,
+    row_count: int,
+    anomaly_count: int = 0,
+    error: str | None = None,
+    cache_client: Redis = redis_client,
+) -> None:
+    """Records a time range chunk of an ingest job as saved, or as failed with the given error, removing its hourly
+    rows from the ingest backlog."""
+
+    if job_id is None:
+        return
+
+    if error is None:
+        await update_ingest_job(
+            job_id, {"chunks_done": 1, "rows_inserted": row_count, "anomalies_found": anomaly_count}, None, cache_client
+        )
+    else:
+        await update_ingest_job(job_id, {}, {"error": error}, cache_client)
+
+    try:
+        await cache_utils.increment_value(INGEST_BACKLOG_ROWS_KEY, -row_count, cache_client)
+    except RedisError as exc:
+        print(f"error updating ingest backlog: {exc}")
+
+
+async def fail_ingest_job(job_id: str, row_count: int, exc: Exception) -> None:
+    """Marks an ingest job whose task could not be enqueued as failed, removing its hourly rows from the backlog."""
+
+    print(f"error enqueueing ingest job {job_id}: {exc}")
+    await record_ingest_chunk(job_id, row_count, 0, f"{type(exc).__name__}: {exc}")
+
+
+async def reconcile_ingest_backlog(cache_client: Redis = redis_client) -> None:
+    """Recomputes the ingest backlog from the ingest jobs in the cache, correcting any drift of the backlog row count:
+    the hourly rows not yet saved of every job that neither failed nor is done, started in the last
+    `INGEST_BACKLOG_MAX_AGE` seconds."""
+
+    cutoff = datetime.utcnow() - timedelta(seconds=INGEST_BACKLOG_MAX_AGE)
+    backlog_row_count = 0
+
+    for key in await cache_utils.get_keys(f"{INGEST_JOB_KEY}:*", cache_client):
+        created_at, rows_total, rows_inserted, error = await cache_utils.get_hash_values(
+            key, ["created_at", "rows_total", "rows_inserted", "error"], cache_client
+        )
+
+        # progress updates arriving after a job expired leave behind fields of no job
+        if created_at is None or error is not None or datetime.fromisoformat(created_at.decode("utf-8")) < cutoff:
             continue
 
-        min_threshold, max_threshold = threshold_values
+        backlog_row_count += max(int(rows_total or 0) - int(rows_inserted or 0), 0)
+
+    await cache_utils.set_value(INGEST_BACKLOG_ROWS_KEY, str(backlog_row_count), INGEST_BACKLOG_MAX_AGE, cache_client)
+    print(f"reconciled ingest backlog to {backlog_row_count} hourly rows")
+
+
+async def get_ingest_job(job_id: str) -> dict[str, Any]:
+    """Gets the status and progress of an ingest job: "queued" until its first chunk starts being saved, "processing"
+    until all of its uploads are completed, then "done", or "failed" once any of its tasks fails for good."""
+
+    job_values = await cache_utils.get_all_hash_values(f"{INGEST_JOB_KEY}:{job_id}")
+
+    # progress updates arriving after a job expired leave behind fields of no job
+    if b"created_at" not in job_values:
+        raise HTTPException(404, "Ingest job not found. It may have expired.")
+
+    job = {field.decode("utf-8"): value.decode("utf-8") for field, value in job_values.items()}
+    completed_uploads = [field for field in job if field.startswith("completed:")]
+    counters = {
+        counter: int(job.get(counter, 0))
+        for counter in ("rows_total", "rows_inserted", "anomalies_found", "chunks_total", "chunks_done")
+    }
+
+    if "error" in job:
+        status = "failed"
+    elif len(completed_uploads) >= int(job["upload_count"]):
+        status = "done"
+    elif int(job.get("chunks_started", 0)) > 0:
+        status = "processing"
+    else:
+        status = "queued"
+
+    return {
+        "job_id": job_id,
+        "status": status,
+        "created_at": job["created_at"],
+        "file_metadata_ids": json.loads(job["file_metadata_ids"]),
+        "uploads_done": len(completed_uploads),
+        **counters,
+        "error": job.get("error"),
+    }
+
+
+def get_ingest_chunks(hour_count: int) -> list[tuple[int, int]]:
+    """Splits hourly data of the given length into consecutive time range chunks of up to `INGEST_CHUNK_HOURS`
+    datapoints, as [start, end) index ranges. Hourly data without datapoints still makes up a single, empty chunk."""
+
+    return [
+        (start, min(start + INGEST_CHUNK_HOURS, hour_count))
+        for start in range(0, max(hour_count, 1), INGEST_CHUNK_HOURS)
+    ]
+
+
+async def process_sensor_data_chunk(
+    staging_key: str,
+    file_metadata_id: int,
+    sensor_data_id: int,
+    chunk_index: int,
+    start: int,
+    end: int,
+    job_id: str | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+):
+    """Processes a time range chunk of staged sensor data by checking it for anomalies and saving it to the database
+    along with a record of the chunk's completion, then reporting the anomalies. Chunks completed by an earlier attempt
+    are skipped."""
+
+    await ensure_hourly_data_partitions(sensor_data_id, session_factory)
+
+    async with session_factory() as session:
+        async with session.begin():
+            # * the completion record is committed along with the chunk's hourly data, so retries never save it twice
+            if not await repository.save_ingest_chunk(sensor_data_id, chunk_index, end - start, session):
+                print(f"skipped completed chunk {chunk_index} of file metadata ID: {file_metadata_id}")
+                return
 
-        values: list[Decimal] = getattr(hourly_data, field)
-        min_threshold = Decimal(min_threshold)
-        max_threshold = Decimal(max_threshold)
+            await update_ingest_job(job_id, {"chunks_started": 1}, cache_client=cache_client)
 
-        for index, value in enumerate(values):
-            time = time_data_points[index]
+            sensor_data = await load_staged_sensor_data(staging_key, cache_client)
+            chunk_data = sensor_data.model_copy(update={"hourly": sensor_data.hourly.get_range(start, end)})
 
-            if value is None:
-                continue
+            anomalous_data = find_anomalous_data(chunk_data, file_metadata_id)
+            print(f"checked hourly data chunk {chunk_index} for anomalies for file metadata ID: {file_metadata_id}")
 
-            if value < min_threshold or value > max_threshold:
-                # * cache anomalous data for notifications
-                anomalous_data = {"id": file_metadata_id, "type": field, "time": str(time), "value": str(value)}
+            await save_hourly_data(chunk_data, sensor_data_id, session)
+            print(f"saved hourly data chunk {chunk_index} for file metadata ID: {file_metadata_id}")
 
-                await cache_utils.append_to_list(ANOMALOUS_DATA_KEY, anomalous_data)
+    # * anomalies are published once their hourly data is committed, and only by the attempt that saved the chunk, so
+    # clients are never notified of unsaved rows nor notified twice by retries. a retry would skip the saved chunk, so
+    # publishing errors are logged instead of failing the task, and the chunk is recorded regardless.
+    try:
+        await publish_anomalous_data(anomalous_data, file_metadata_id, cache_client)
+    except (RedisError, OSError) as exc:
+        print(f"error publishing anomalies of chunk {chunk_index} of file metadata ID: {file_metadata_id}: {exc}")
+
+    await record_ingest_chunk(job_id, end - start, len(anomalous_data), cache_client=cache_client)
 
 
-async def _process_sensor_data(sensor_data: SensorData, file_metadata_id: int, sensor_data_id: int):
-    """Processes sensor data by checking for and reporting anomalies, and saving it to the database."""
+async def complete_sensor_data_upload(
+    staging_key: str,
+    file_metadata_id: int,
+    sensor_data_id: int,
+    chunk_count: int,
+    job_id: str | None = None,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+):
+    """Completes processing of staged sensor data once every chunk of it is saved, by saving its hourly units and
+    rollups, and marking upload completion. Clears the staged sensor data once it is completed."""
 
-    await check_hourly_data(sensor_data, file_metadata_id)
-    print(f"checked hourly data for anomalies for file metadata ID:{file_metadata_id}")
+    await ensure_hourly_data_partitions(sensor_data_id, session_factory)
 
-    async with AsyncSessionLocal() as session:
+    async with session_factory() as session:
         async with session.begin():
-            await save_hourly_data(sensor_data, sensor_data_id, session)
-            print(f"saved hourly data for file metadata ID:{file_metadata_id}")
+            # * locking the file metadata record keeps concurrent attempts from completing the upload twice
+            upload_end_date = await repository.get_upload_end_date(file_metadata_id, session, for_update=True)
+            if upload_end_date is not None:
+                print(f"upload of file metadata ID: {file_metadata_id} is already completed")
+                await update_ingest_job(job_id, {}, {f"completed:{file_metadata_id}": "1"}, cache_client)
+                return
+
+            completed_chunk_count = await repository.get_ingest_chunk_count(sensor_data_id, session)
+            if completed_chunk_count < chunk_count:
+                raise RuntimeError(
+                    f"only {completed_chunk_count} of {chunk_count} chunks are saved for file metadata ID: "
+                    f"{file_metadata_id}"
+                )
+
+            sensor_data = await load_staged_sensor_data(staging_key, cache_client)
+
+            await save_hourly_units(sensor_data, sensor_data_id, session)
+            await save_hourly_data_rollups(sensor_data, sensor_data_id, session)
 
             await mark_upload_completion(file_metadata_id, session)
             print(f"marked upload completion for file metadata ID: {file_metadata_id}")
 
+    await update_ingest_job(job_id, {}, {f"completed:{file_metadata_id}": "1"}, cache_client)
+    await cache_utils.delete_value(staging_key, cache_client)
 
-@celery_client.task()
-def process_sensor_data(serialized_sensor_data: str, file_metadata_id: int, sensor_data_id: int):
-    """Synchronous wrapper task that calls the actual async function."""
+    if SENSOR_DATA_RESPONSE_PREFILL:
+        await prefill_sensor_data_response(file_metadata_id, session_factory, cache_client)
+
+
+async def prefill_sensor_data_response(
+    file_metadata_id: int,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+) -> None:
+    """Caches the full sensor data response of a completely processed upload, so its first read is served from cache."""
+
+    try:
+        body, _ = await load_sensor_data_response(
+            file_metadata_id, session_factory=session_factory, cache_client=cache_client
+        )
+    except Exception as exc:
+        # the upload is already saved; reads fill the cache instead
+        print(f"error prefilling sensor data response for file metadata ID: {file_metadata_id}: {exc}")
+        return
 
-    # parse json data back as pydantic model
-    sensor_data = SensorData.model_validate_json(serialized_sensor_data)
-    print("processing sensor data for file metadata ID:", file_metadata_id)
+    print(f"prefilled {len(body)} bytes of sensor data response for file metadata ID: {file_metadata_id}")
 
-    # * get the current running loop; avoid asyncio.run as that can create a new loop
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(_process_sensor_data(sensor_data, file_metadata_id, sensor_data_id))
 
-    print("processed sensor data for file metadata ID:", file_metadata_id)
+async def backfill_hourly_readings(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal, cache_client: Redis = redis_client
+) -> None:
+    """Backfills the wide hourly readings layout from the per-variable hourly tables, one sensor data record per
+    transaction, so an interrupted backfill resumes from the first record it had not committed."""
 
+    async with session_factory() as session:
+        sensor_data_ids = await repository.get_sensor_data_ids_without_hourly_readings(session)
 
-def parse_anomalous_data(message_data: Any) -> dict:
-    """Parses anomalous data from cache into a more structured format."""
+    print(f"backfilling hourly readings for {len(sensor_data_ids)} sensor data records")
+
+    for sensor_data_id in sensor_data_ids:
+        await ensure_hourly_data_partitions(sensor_data_id, session_factory)
+
+        async with session_factory() as session:
+            async with session.begin():
+                await repository.backfill_hourly_readings(sensor_data_id, session)
+
+        print(f"backfilled hourly readings for sensor data ID: {sensor_data_id}")
+
+
+async def maintain_hourly_data_partitions(
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+    cache_client: Redis = redis_client,
+) -> None:
+    """Creates hourly data partitions ahead of the uploads to come, and drops expired ones, unless retention is
+    disabled."""
+
+    last_sensor_data_id = await ensure_upcoming_hourly_data_partitions(session_factory)
+
+    if HOURLY_DATA_RETENTION_DAYS > 0:
+        await drop_expired_hourly_data_partitions(last_sensor_data_id, session_factory, cache_client)
+
+
+def parse_anomalous_data(entry_id: bytes, fields: dict[bytes, bytes]) -> dict:
+    """Parses an anomalous data stream entry from cache into a more structured format, tagged with its event ID."""
 
     try:
-        # message is a tuple containing (name, jsonified data)
-        message: dict = json.loads(message_data[1].decode("utf-8"))
+        message: dict = json.loads(fields[b"data"].decode("utf-8"))
     except Exception as exc:
         print(f"error decoding message data: {exc}")
         raise
 
+    # clients resume from the last event ID they received after reconnecting
+    message["event_id"] = entry_id.decode("utf-8")
     return message
 
 
-async def consume_anomaly_updates():
-    """Parses and consumes anomalous data updates at a quick interval.."""
+def create_anomaly_updates_source() -> Callable[[], AsyncIterator[dict[str, Any]]]:
+    """Creates the source of anomaly updates for the fan-out hub. It tails the stream from entries added after it first
+    starts, and resumes after the last entry it delivered when restarted, so no entry added in between is lost."""
+
+    # * earlier entries are only served as replays; `$` is resolved to the first entry delivered
+    last_id = "$"
+
+    async def consume_anomaly_updates():
+        """Parses and consumes anomalous data updates as soon as they arrive."""
+
+        nonlocal last_id
+        key = f"{ANOMALOUS_DATA_KEY}"
+        print(f"starting anomaly updates consumer after entry ID: {last_id}")
+
+        while True:
+            entries = await cache_utils.read_stream(key, last_id, ANOMALY_STREAM_READ_COUNT)
+
+            for entry_id, fields in entries:
+                last_id = entry_id.decode("utf-8")
+                yield parse_anomalous_data(entry_id, fields)
+
+    return consume_anomaly_updates
+
+
+async def replay_anomaly_updates(last_event_id: str):
+    """Parses and yields all cached anomalous data updates published after the given event ID, oldest first."""
 
     key = f"{ANOMALOUS_DATA_KEY}"
-    print("starting anomaly updates consumer")
 
     while True:
-        data = None
-        raw_data = await cache_utils.get_latest_list_value(key)
+        entries = await cache_utils.get_stream_entries(key, last_event_id, ANOMALY_STREAM_READ_COUNT)
+
+        for entry_id, fields in entries:
+            yield parse_anomalous_data(entry_id, fields)
+
+        if len(entries) < ANOMALY_STREAM_READ_COUNT:
+            return
+
+        last_event_id = entries[-1][0].decode("utf-8")
 
-        if raw_data is not None:
-            data = parse_anomalous_data(raw_data)
 
-        yield data if data else None
+# * a single consumer per process reads anomaly updates from the cache and broadcasts them to all websocket clients
+anomaly_updates_hub = FanoutHub(create_anomaly_updates_source(), ANOMALY_SUBSCRIBER_QUEUE_SIZE)
 
-        await asyncio.sleep(0.05)
+sensor_data_response_loads = SingleFlight()
@@ -0,0 +1,161 @@
+from celery import Task, chord
+from redis.asyncio import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config.celery import app as celery_client, worker_runtime
+from app.config.config import INGEST_TASK_MAX_RETRIES
+import app.services.sensor as service
+
+
+# transient DB and cache errors, on which ingest tasks are retried
+INGEST_RETRIED_ERRORS = (SQLAlchemyError, RedisError, OSError)
+
+
+class IngestDispatchError(Exception):
+    """IngestDispatchError is raised when the chunk tasks of staged uploads could not all be enqueued, carrying the
+    hourly row count of the uploads left without chunk tasks."""
+
+    def __init__(self, message: str, row_count: int) -> None:
+        super().__init__(message)
+        self.row_count = row_count
+
+
+class IngestTask(Task):
+    """IngestTask marks the ingest job of a task as failed once the task fails for good, after any retries."""
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo) -> None:
+        job_id = kwargs.get("job_id")
+        if job_id is None:
+            return
+
+        # the hourly rows of a failed chunk task, or of uploads a failed dispatch task never enqueued chunk tasks for,
+        # are never saved, so they leave the ingest backlog. rows of enqueued chunks leave it as their chunks finish.
+        if isinstance(exc, IngestDispatchError):
+            failed_row_count = exc.row_count
+        else:
+            failed_row_count = kwargs.get("end", 0) - kwargs.get("start", 0)
+
+        worker_runtime.run(service.record_ingest_chunk, job_id, failed_row_count, 0, f"{type(exc).__name__}: {exc}")
+
+
+@celery_client.task(base=IngestTask)
+def process_sensor_data(
+    staging_key: str, file_metadata_id: int, sensor_data_id: int, hour_count: int, job_id: str | None = None
+):
+    """Synchronous task that fans processing of staged sensor data out into time range chunk tasks, which run in
+    parallel across workers, followed by a completion task once all of them succeed. Only the staging key of the sensor
+    data is passed through the broker; the sensor data itself is loaded from the staging area by the workers."""
+
+    _dispatch_staged_uploads([(staging_key, file_metadata_id, sensor_data_id, hour_count)], job_id)
+
+
+@celery_client.task(base=IngestTask)
+def process_sensor_data_batch(staged_uploads: list[tuple[str, int, int, int]], job_id: str | None = None):
+    """Synchronous task that fans processing of every staged sensor data of a batch upload out into chunk tasks, as
+    `process_sensor_data` does for a single upload. Each upload is given as its staging key, file metadata ID, sensor
+    data ID and hour count."""
+
+    _dispatch_staged_uploads(staged_uploads, job_id)
+
+
+def _dispatch_staged_uploads(staged_uploads: list[tuple[str, int, int, int]], job_id: str | None) -> None:
+    """Enqueues the chunk tasks of every staged upload in turn. Raises `IngestDispatchError` with the hourly row count
+    of the uploads left undispatched once enqueueing any of them fails."""
+
+    for index, (staging_key, file_metadata_id, sensor_data_id, hour_count) in enumerate(staged_uploads):
+        try:
+            _dispatch_sensor_data_chunks(staging_key, file_metadata_id, sensor_data_id, hour_count, job_id)
+        except Exception as exc:
+            undispatched_row_count = sum(upload[3] for upload in staged_uploads[index:])
+            raise IngestDispatchError(f"{type(exc).__name__}: {exc}", undispatched_row_count) from exc
+
+
+def _dispatch_sensor_data_chunks(
+    staging_key: str, file_metadata_id: int, sensor_data_id: int, hour_count: int, job_id: str | None
+) -> None:
+    """Enqueues a chunk task per time range chunk of staged sensor data, followed by its completion task."""
+
+    upload = {"staging_key": staging_key, "file_metadata_id": file_metadata_id, "sensor_data_id": sensor_data_id}
+    chunks = service.get_ingest_chunks(hour_count)
+
+    # * keyword arguments let failure handling find the job and hourly rows of a task
+    chunk_tasks = [
+        process_sensor_data_chunk.si(**upload, chunk_index=chunk_index, start=start, end=end, job_id=job_id)
+        for chunk_index, (start, end) in enumerate(chunks)
+    ]
+
+    chord(chunk_tasks)(complete_sensor_data_upload.si(**upload, chunk_count=len(chunks), job_id=job_id))
+
+    print(f"processing sensor data for file metadata ID: {file_metadata_id} in {len(chunks)} chunks")
+
+
+@celery_client.task(
+    base=IngestTask,
+    autoretry_for=INGEST_RETRIED_ERRORS,
+    max_retries=INGEST_TASK_MAX_RETRIES,
+    retry_backoff=True,
+    retry_jitter=True,
+)
+def process_sensor_data_chunk(
+    staging_key: str,
+    file_metadata_id: int,
+    sensor_data_id: int,
+    chunk_index: int,
+    start: int,
+    end: int,
+    job_id: str | None = None,
+):
+    """Synchronous wrapper task that processes a time range chunk of staged sensor data."""
+
+    # * run on the worker's long-lived event loop, reusing its connection pools across tasks
+    worker_runtime.run(
+        service.process_sensor_data_chunk,
+        staging_key,
+        file_metadata_id,
+        sensor_data_id,
+        chunk_index,
+        start,
+        end,
+        job_id,
+    )
+
+
+@celery_client.task(
+    base=IngestTask,
+    autoretry_for=INGEST_RETRIED_ERRORS,
+    max_retries=INGEST_TASK_MAX_RETRIES,
+    retry_backoff=True,
+    retry_jitter=True,
+)
+def complete_sensor_data_upload(
+    staging_key: str, file_metadata_id: int, sensor_data_id: int, chunk_count: int, job_id: str | None = None
+):
+    """Synchronous wrapper task that completes processing of staged sensor data once all of its chunks are saved."""
+
+    worker_runtime.run(
+        service.complete_sensor_data_upload, staging_key, file_metadata_id, sensor_data_id, chunk_count, job_id
+    )
+
+    print("processed sensor data for file metadata ID:", file_metadata_id)
+
+
+@celery_client.task()
+def backfill_hourly_readings():
+    """Synchronous wrapper task that migrates existing hourly data into the wide layout."""
+
+    worker_runtime.run(service.backfill_hourly_readings)
+
+
+@celery_client.task()
+def maintain_hourly_data_partitions():
+    """Synchronous wrapper task that maintains hourly data partitions, run periodically by celery beat."""
+
+    worker_runtime.run(service.maintain_hourly_data_partitions)
+
+
+@celery_client.task()
+def reconcile_ingest_backlog():
+    """Synchronous wrapper task that recomputes the ingest backlog from live ingest jobs, run periodically by celery
+    beat."""
+
+    worker_runtime.run(service.reconcile_ingest_backlog)
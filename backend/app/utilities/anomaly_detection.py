@@ -0,0 +1,40 @@
+from typing import Iterable
+
+import numpy as np
+
+from app.schemas.sensor import SensorHourlyColumns
+
+
+def find_anomalies(
+    hourly_data: SensorHourlyColumns,
+    thresholds: dict[str, tuple[int, int | float]],
+    skipped_fields: Iterable[str] = (),
+) -> list[tuple[str, int]]:
+    """Finds all hourly datapoints lying outside their weather variable's (min, max) thresholds, returning their
+    (field, index) pairs ordered by field and then index. Checks every field in a single pass over a 2D array, where
+    missing values are masked out instead of being skipped one at a time."""
+
+    skipped_fields = set(skipped_fields)
+    data_fields = [
+        data_field
+        for data_field in hourly_data.values
+        if data_field in thresholds and data_field not in skipped_fields
+    ]
+
+    if not data_fields or not len(hourly_data):
+        return []
+
+    # * frombuffer shares memory with the compact columns; only stacking them copies values, once
+    values = np.stack([np.frombuffer(hourly_data.values[data_field], dtype=np.float64) for data_field in data_fields])
+    min_thresholds = np.array([thresholds[data_field][0] for data_field in data_fields], dtype=np.float64)[:, None]
+    max_thresholds = np.array([thresholds[data_field][1] for data_field in data_fields], dtype=np.float64)[:, None]
+
+    null_mask = np.isnan(values)
+    anomalous_mask = ~null_mask & ((values < min_thresholds) | (values > max_thresholds))
+
+    field_indices, time_indices = np.nonzero(anomalous_mask)
+
+    return [
+        (data_fields[field_index], time_index)
+        for field_index, time_index in zip(field_indices.tolist(), time_indices.tolist())
+    ]
@@ -0,0 +1,127 @@
+from hashlib import sha256
+from io import BytesIO
+import tarfile
+from typing import BinaryIO, Iterator
+import zipfile
+
+
+# batch upload formats, by file extension and by content type; files carry a single JSON document unless they are
+# NDJSON, with a JSON document per line, or a zip/tar archive, with a JSON document per `.json` member
+BATCH_FORMAT_EXTENSIONS = {
+    ".json": "json",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".zip": "zip",
+    ".tar": "tar",
+    ".tar.gz": "tar",
+    ".tgz": "tar",
+}
+BATCH_FORMAT_CONTENT_TYPES = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/zip": "zip",
+    "application/x-zip-compressed": "zip",
+    "application/x-tar": "tar",
+    "application/gzip": "tar",
+    "application/x-gzip": "tar",
+    "application/x-gtar": "tar",
+}
+
+
+class HashingReader:
+    """HashingReader wraps a binary file, computing the SHA-256 hash of all content read through it."""
+
+    def __init__(self, file: BinaryIO) -> None:
+        self.file = file
+        self.hash = sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.file.read(size)
+        self.hash.update(chunk)
+
+        return chunk
+
+    def hexdigest(self, chunk_size: int = 1024 * 64) -> str:
+        """Reads any remaining content, and returns the hash of the whole content."""
+
+        while self.read(chunk_size):
+            pass
+
+        return self.hash.hexdigest()
+
+
+def get_batch_format(filename: str | None, content_type: str | None) -> str | None:
+    """Gets the batch upload format of a file from its extension, or else its content type. Returns None for files of
+    unsupported formats."""
+
+    lower_filename = (filename or "").lower()
+
+    for extension, batch_format in BATCH_FORMAT_EXTENSIONS.items():
+        if lower_filename.endswith(extension):
+            return batch_format
+
+    return BATCH_FORMAT_CONTENT_TYPES.get((content_type or "").split(";")[0].strip().lower())
+
+
+def iter_batch_documents(
+    file: BinaryIO, filename: str, batch_format: str, max_document_size: int
+) -> Iterator[tuple[str, int, BinaryIO | None]]:
+    """Iterates over the JSON documents of a batch upload file in the given format, as (name, size, content) tuples.
+    Documents larger than `max_document_size` are yielded without content, so they are never read. Raises ValueError for
+    files that are not valid archives."""
+
+    if batch_format == "json":
+        file.seek(0, 2)
+        size = file.tell()
+        file.seek(0)
+
+        yield filename, size, file if size <= max_document_size else None
+
+    elif batch_format == "ndjson":
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if line:
+                yield f"{filename}:{line_number}", len(line), BytesIO(line) if len(line) <= max_document_size else None
+
+    elif batch_format == "zip":
+        try:
+            archive = zipfile.ZipFile(file)
+        except zipfile.BadZipFile as exc:
+            raise ValueError(f"Invalid input. {filename} is not a valid zip archive.") from exc
+
+        with archive:
+            for member in archive.infolist():
+                if member.is_dir() or not _is_json_member(member.filename):
+                    continue
+
+                if member.file_size > max_document_size:
+                    yield member.filename, member.file_size, None
+                    continue
+
+                with archive.open(member) as member_file:
+                    yield member.filename, member.file_size, member_file
+
+    elif batch_format == "tar":
+        try:
+            archive = tarfile.open(fileobj=file, mode="r:*")
+        except tarfile.TarError as exc:
+            raise ValueError(f"Invalid input. {filename} is not a valid tar archive.") from exc
+
+        with archive:
+            for member in archive:
+                if not member.isfile() or not _is_json_member(member.name):
+                    continue
+
+                member_file = archive.extractfile(member) if member.size <= max_document_size else None
+                yield member.name, member.size, member_file
+
+    else:
+        raise ValueError(f"Invalid input. Unsupported batch upload format: {batch_format}.")
+
+
+def _is_json_member(member_name: str) -> bool:
+    """Checks whether an archive member holds a JSON document, skipping hidden files and archiver metadata."""
+
+    base_name = member_name.rsplit("/", 1)[-1]
+    return base_name.lower().endswith(".json") and not base_name.startswith(".") and "__MACOSX/" not in member_name
@@ -1,19 +1,42 @@
 from contextlib import asynccontextmanager
+from functools import wraps
 import json
-from typing import Any
+from time import perf_counter, time
+from typing import Any, Callable, Coroutine, Self
 
 from redis.asyncio import Redis, RedisError
 
 from app.config.cache import redis_client
+import app.utilities.metrics as metrics
 
 
+def _timed(function: Callable[..., Coroutine[Any, Any, Any]]) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Records the latency of every call to the cache utility, labelled by its name."""
+
+    histogram = metrics.CACHE_CALL_SECONDS.labels(function.__name__)
+
+    @wraps(function)
+    async def timed_function(*args: Any, **kwargs: Any) -> Any:
+        with histogram.time():
+            return await function(*args, **kwargs)
+
+    return timed_function
+
+
+def serialize_value(value: dict[str, Any] | str) -> str:
+    """Serializes the given value as JSON, unless it is already a string."""
+
+    if isinstance(value, dict):
+        return json.dumps(value)
+
+    return value
+
+
+@_timed
 async def append_to_list(key: str, value: dict[str, Any] | str, client: Redis = redis_client) -> None:
     """Serializes and appends the given value to the list."""
 
-    if isinstance(value, dict):
-        serialized_value = json.dumps(value)
-    else:
-        serialized_value = value
+    serialized_value = serialize_value(value)
 
     try:
         await client.lpush(key, serialized_value)  # type: ignore
@@ -22,6 +45,7 @@ async def append_to_list(key: str, value: dict[str, Any] | str, client: Redis =
         raise
 
 
+@_timed
 async def set_expiry(key: str, expiry_seconds: int, client: Redis = redis_client) -> None:
     """Sets expiry time for the given key."""
 
@@ -32,6 +56,55 @@ async def set_expiry(key: str, expiry_seconds: int, client: Redis = redis_client
         raise
 
 
+@_timed
+async def set_value(
+    key: str, value: bytes | str, expiry_seconds: int | None = None, client: Redis = redis_client
+) -> None:
+    """Caches the given value, optionally expiring it after the given number of seconds."""
+
+    try:
+        await client.set(key, value, ex=expiry_seconds)
+    except RedisError as exc:
+        print(f"error setting cached value: {exc}")
+        raise
+
+
+@_timed
+async def delete_value(key: str, client: Redis = redis_client) -> None:
+    """Deletes cached value given apt key."""
+
+    try:
+        await client.delete(key)
+    except RedisError as exc:
+        print(f"error deleting cached value: {exc}")
+        raise
+
+
+@_timed
+async def delete_values(keys: list[str | bytes], client: Redis = redis_client) -> None:
+    """Deletes the cached values of all the given keys."""
+
+    try:
+        await client.delete(*keys)
+    except RedisError as exc:
+        print(f"error deleting cached values: {exc}")
+        raise
+
+
+@_timed
+async def get_keys(pattern: str, client: Redis = redis_client) -> list[bytes]:
+    """Gets the keys matching the given glob-style pattern, scanning the keyspace in steps instead of blocking it."""
+
+    try:
+        keys = [key async for key in client.scan_iter(match=pattern, count=1000)]
+    except RedisError as exc:
+        print(f"error getting cached keys matching '{pattern}': {exc}")
+        raise
+
+    return keys
+
+
+@_timed
 async def get_value(key: str, client: Redis = redis_client) -> Any:
     """Gets cached value given apt key."""
 
@@ -44,6 +117,105 @@ async def get_value(key: str, client: Redis = redis_client) -> Any:
     return value
 
 
+@_timed
+async def set_hash_values(
+    key: str, values: dict[str, bytes | str], expiry_seconds: int | None = None, client: Redis = redis_client
+) -> None:
+    """Caches the given values as fields of a hash, optionally expiring it after the given number of seconds."""
+
+    try:
+        async with client.pipeline(transaction=True) as pipeline:
+            pipeline.hset(key, mapping=values)  # type: ignore
+
+            if expiry_seconds is not None:
+                pipeline.expire(key, expiry_seconds)
+
+            await pipeline.execute()
+    except RedisError as exc:
+        print(f"error setting cached hash values: {exc}")
+        raise
+
+
+@_timed
+async def get_hash_values(key: str, fields: list[str], client: Redis = redis_client) -> list[Any]:
+    """Gets the cached values of the given hash fields, in the same order, given apt key."""
+
+    try:
+        values = await client.hmget(key, fields)  # type: ignore
+    except RedisError as exc:
+        print(f"error getting cached hash values: {exc}")
+        raise
+
+    return values
+
+
+@_timed
+async def increment_hash_values(
+    key: str,
+    increments: dict[str, int],
+    values: dict[str, bytes | str] | None = None,
+    expiry_seconds: int | None = None,
+    client: Redis = redis_client,
+) -> None:
+    """Increments the given integer fields of a hash, and optionally sets other fields, in a single transaction.
+    Optionally expires the hash after the given number of seconds."""
+
+    try:
+        async with client.pipeline(transaction=True) as pipeline:
+            for field, increment in increments.items():
+                pipeline.hincrby(key, field, increment)  # type: ignore
+
+            if values:
+                pipeline.hset(key, mapping=values)  # type: ignore
+            if expiry_seconds is not None:
+                pipeline.expire(key, expiry_seconds)
+
+            await pipeline.execute()
+    except RedisError as exc:
+        print(f"error incrementing cached hash values: {exc}")
+        raise
+
+
+@_timed
+async def get_all_hash_values(key: str, client: Redis = redis_client) -> dict[bytes, bytes]:
+    """Gets all fields and values of a hash given apt key, empty for a missing hash."""
+
+    try:
+        values = await client.hgetall(key)  # type: ignore
+    except RedisError as exc:
+        print(f"error getting cached hash values: {exc}")
+        raise
+
+    return values
+
+
+@_timed
+async def increment_value(key: str, increment: int, client: Redis = redis_client) -> int:
+    """Increments the cached integer value by the given amount, which may be negative, and returns the result."""
+
+    try:
+        value = await client.incrby(key, increment)
+    except RedisError as exc:
+        print(f"error incrementing cached value: {exc}")
+        raise
+
+    return value
+
+
+@_timed
+async def get_list_length(key: str, client: Redis = redis_client) -> int:
+    """Gets the length of the list given apt key, zero for a missing list."""
+
+    try:
+        length = await client.llen(key)  # type: ignore
+    except RedisError as exc:
+        print(f"error getting cached list length: {exc}")
+        raise
+
+    return length
+
+
+@_timed
 async def get_list_values(key: str, client: Redis = redis_client) -> list:
     """Gets list values given apt key."""
 
@@ -86,3 +258,136 @@ async def subscribe_to_channel(namespace: str, pattern: bool = True, client: Red
         raise
     finally:
         await pubsub.unsubscribe()
+
+
+def parse_stream_id(stream_id: bytes | str) -> tuple[int, int]:
+    """Parses a stream entry ID, in `<milliseconds>-<sequence>` form, into a tuple that orders like the stream."""
+
+    if isinstance(stream_id, bytes):
+        stream_id = stream_id.decode("utf-8")
+
+    milliseconds, _, sequence = stream_id.partition("-")
+    return int(milliseconds), int(sequence or 0)
+
+
+@_timed
+async def get_stream_entries(
+    key: str, after_id: str, count: int, client: Redis = redis_client
+) -> list[tuple[bytes, dict[bytes, bytes]]]:
+    """Gets up to `count` stream entries added after the given entry ID, oldest first."""
+
+    try:
+        entries = await client.xrange(key, min=f"({after_id}", count=count)
+    except RedisError as exc:
+        print(f"error getting entries of cached stream '{key}' after ID '{after_id}': {exc}")
+        raise
+
+    return entries
+
+
+async def read_stream(
+    key: str, last_id: str, count: int, block_milliseconds: int = 0, client: Redis = redis_client
+) -> list[tuple[bytes, dict[bytes, bytes]]]:
+    """Gets up to `count` stream entries added after the given entry ID, blocking until at least one is available."""
+
+    try:
+        response = await client.xread({key: last_id}, count=count, block=block_milliseconds)
+    except RedisError as exc:
+        print(f"error reading cached stream '{key}' after ID '{last_id}': {exc}")
+        raise
+
+    # response holds a [key, entries] pair for each stream read, and is empty when blocking timed out
+    return response[0][1] if response else []
+
+
+class BatchedStreamPublisher:
+    """BatchedStreamPublisher collects values to be added to a stream and adds them in pipelined batches, taking one
+    network round-trip per batch instead of one per value. Each batch also trims entries older than the expiry time,
+    caps the stream at its maximum length and refreshes the key's expiry, within the same pipeline. Keeps counters of
+    published values, flushed batches and flush latency."""
+
+    def __init__(
+        self,
+        key: str,
+        batch_size: int,
+        expiry_seconds: int | None = None,
+        max_length: int | None = None,
+        field: str = "data",
+        client: Redis = redis_client,
+    ) -> None:
+        self.key = key
+        self.batch_size = batch_size
+        self.expiry_seconds = expiry_seconds
+        self.max_length = max_length
+        self.field = field
+        self.client = client
+
+        self.pending_values: list[str] = []
+        self.published_count = 0
+        self.flush_count = 0
+        self.max_batch_size = 0
+        self.total_flush_time = 0.0
+        self.max_flush_time = 0.0
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        # * publish whatever was collected before an error too, it is still valid data
+        await self.flush()
+
+    async def append(self, value: dict[str, Any] | str) -> None:
+        """Serializes and collects the given value, flushing collected values once a full batch is available."""
+
+        self.pending_values.append(serialize_value(value))
+
+        if len(self.pending_values) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Adds all collected values to the stream, applying its expiry and maximum length, in a single pipeline."""
+
+        if not self.pending_values:
+            return
+
+        batch, self.pending_values = self.pending_values, []
+        start_time = perf_counter()
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipeline:
+                for value in batch:
+                    # approximate trimming lets redis drop whole internal nodes, keeping it cheap
+                    pipeline.xadd(self.key, {self.field: value}, maxlen=self.max_length, approximate=True)
+
+                if self.expiry_seconds is not None:
+                    # entry IDs start with their creation time in milliseconds, so older entries sort below this ID
+                    min_id = int((time() - self.expiry_seconds) * 1000)
+                    pipeline.xtrim(self.key, minid=min_id, approximate=True)
+                    pipeline.expire(self.key, self.expiry_seconds)
+
+                await pipeline.execute()
+        except RedisError as exc:
+            print(f"error flushing batch of {len(batch)} values to cached stream '{self.key}': {exc}")
+            raise
+
+        flush_time = perf_counter() - start_time
+        metrics.CACHE_CALL_SECONDS.labels("flush_stream_batch").observe(flush_time)
+
+        self.published_count += len(batch)
+        self.flush_count += 1
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+        self.total_flush_time += flush_time
+        self.max_flush_time = max(self.max_flush_time, flush_time)
+
+    def get_stats(self) -> dict[str, int | float]:
+        """Gets publishing counters: published values, flushed batches, batch sizes and flush latency in seconds."""
+
+        return {
+            "published_count": self.published_count,
+            "flush_count": self.flush_count,
+            "max_batch_size": self.max_batch_size,
+            "mean_batch_size": self.published_count / self.flush_count if self.flush_count else 0,
+            "total_flush_time": self.total_flush_time,
+            "max_flush_time": self.max_flush_time,
+            "mean_flush_time": self.total_flush_time / self.flush_count if self.flush_count else 0,
+        }
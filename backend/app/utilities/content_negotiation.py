@@ -0,0 +1,63 @@
+from typing import Sequence
+
+
+def negotiate_media_type(accept: str | None, media_types: Sequence[str]) -> str | None:
+    """Picks the available media type most preferred by the given `Accept` header, with the first available media type
+    being the default. Each media type takes the quality of the most specific range matching it, so ranges with `q=0`
+    exclude it even when a wildcard accepts it. Returns None when the header accepts none of them."""
+
+    if not accept or not accept.strip():
+        return media_types[0]
+
+    accepted_ranges: list[tuple[str, float]] = []
+
+    for accepted in accept.split(","):
+        media_range, *parameters = (part.strip() for part in accepted.split(";"))
+        quality = 1.0
+
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if media_range:
+            accepted_ranges.append((media_range.lower(), quality))
+
+    # (negated quality, position of the matching range in the header, position of the media type) of acceptable types
+    candidates: list[tuple[float, int, int]] = []
+
+    for type_index, media_type in enumerate(media_types):
+        matches = [
+            (specificity, range_index, quality)
+            for range_index, (media_range, quality) in enumerate(accepted_ranges)
+            if (specificity := _get_match_specificity(media_range, media_type)) is not None
+        ]
+        if not matches:
+            continue
+
+        # * the most specific range decides, the earliest one among equally specific ranges
+        _, range_index, quality = max(matches, key=lambda match: (match[0], -match[1]))
+        if quality > 0:
+            candidates.append((-quality, range_index, type_index))
+
+    if not candidates:
+        return None
+
+    return media_types[min(candidates)[2]]
+
+
+def _get_match_specificity(media_range: str, media_type: str) -> int | None:
+    """Gets how specifically the media range matches the media type: 2 for the type itself, 1 for its `type/*` range
+    and 0 for `*/*`. Returns None when the range doesn't match it."""
+
+    if media_range == media_type:
+        return 2
+    if media_range == f"{media_type.split('/')[0]}/*":
+        return 1
+    if media_range == "*/*":
+        return 0
+
+    return None
@@ -0,0 +1,76 @@
+from time import perf_counter
+from typing import Any
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from sqlalchemy.pool.base import ConnectionPoolEntry
+
+
+class PoolWaitTimer:
+    """PoolWaitTimer is a mixin for connection pools, which times how long checkouts wait for a connection, either idle
+    in the pool or newly connected, and counts the connections checked out."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+
+        self.checked_out = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeout_count = 0
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = perf_counter()
+
+        try:
+            record = super()._do_get()  # type: ignore[misc]
+        except PoolTimeoutError:
+            self.timeout_count += 1
+            raise
+        finally:
+            wait_seconds = perf_counter() - start
+            self.wait_count += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+        self.checked_out += 1
+        return record
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        self.checked_out -= 1
+        super()._do_return_conn(record)  # type: ignore[misc]
+
+
+class InstrumentedQueuePool(PoolWaitTimer, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool keeps a fixed number of connections open, along with overflow connections under load."""
+
+
+class InstrumentedNullPool(PoolWaitTimer, NullPool):
+    """InstrumentedNullPool opens a connection per checkout, leaving connection pooling to an external pooler."""
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """Gets the connection pool statistics of a DB engine: connections checked out and idle, and checkout wait times
+    since the pool was created."""
+
+    pool = engine.pool
+    stats: dict[str, Any] = {"pool": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        # * overflow is negative while the pool holds fewer connections than its size
+        stats.update(
+            size=pool.size(), checked_out=pool.checkedout(), idle=pool.checkedin(), overflow=max(pool.overflow(), 0)
+        )
+    elif isinstance(pool, PoolWaitTimer):
+        stats.update(checked_out=pool.checked_out, idle=0)
+
+    if isinstance(pool, PoolWaitTimer):
+        stats.update(
+            wait_count=pool.wait_count,
+            wait_seconds_avg=pool.wait_seconds_total / pool.wait_count if pool.wait_count else 0.0,
+            wait_seconds_max=pool.wait_seconds_max,
+            timeout_count=pool.timeout_count,
+        )
+
+    return stats
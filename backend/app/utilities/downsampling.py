@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def largest_triangle_three_buckets(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Selects `threshold` points of the (x, y) series, sorted by x, that preserve its visual shape, using the
+    largest-triangle-three-buckets algorithm. Returns the indexes of the selected points, in ascending order."""
+
+    point_count = len(x)
+    if threshold >= point_count or threshold < 3:
+        return np.arange(point_count)
+
+    x = x.astype(np.float64, copy=False)
+    y = y.astype(np.float64, copy=False)
+
+    # first and last points are always kept; the points in between are split into `threshold - 2` buckets
+    bucket_edges = np.linspace(1, point_count - 1, threshold - 1).astype(np.int64)
+
+    selected_indexes = np.empty(threshold, dtype=np.int64)
+    selected_indexes[0] = 0
+    selected_indexes[-1] = point_count - 1
+
+    previous_index = 0
+    for bucket in range(threshold - 2):
+        start, end = bucket_edges[bucket], bucket_edges[bucket + 1]
+
+        # * the third vertex is the average point of the next bucket, or the last point for the final bucket
+        if bucket < threshold - 3:
+            next_start, next_end = end, bucket_edges[bucket + 2]
+            next_x, next_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # keep the bucket's point forming the largest triangle with the previously kept point and the third vertex
+        previous_x, previous_y = x[previous_index], y[previous_index]
+        areas = np.abs(
+            (previous_x - next_x) * (y[start:end] - previous_y) - (previous_x - x[start:end]) * (next_y - previous_y)
+        )
+
+        previous_index = start + int(np.argmax(areas))
+        selected_indexes[bucket + 1] = previous_index
+
+    return selected_indexes
@@ -0,0 +1,80 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+
+class FanoutHub:
+    """FanoutHub reads messages from a single source in a background task and broadcasts each one to all subscribers,
+    through a bounded queue per subscriber. A subscriber that falls behind loses its oldest queued messages instead of
+    slowing down the source or other subscribers."""
+
+    def __init__(
+        self, source: Callable[[], AsyncIterator[Any]], queue_size: int, retry_delay_seconds: float = 1.0
+    ) -> None:
+        self.source = source
+        self.queue_size = queue_size
+        self.retry_delay_seconds = retry_delay_seconds
+
+        self.subscribers: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+        self.received_count = 0
+        self.dropped_count = 0
+
+    async def start(self) -> None:
+        """Starts reading from the source in a background task."""
+
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._consume())
+
+    async def stop(self) -> None:
+        """Stops reading from the source, waiting for the background task to finish."""
+
+        if self.task is None:
+            return
+
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+        self.task = None
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Registers a new subscriber for the duration of the context, yielding the queue it receives messages on."""
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+
+        try:
+            yield queue
+        finally:
+            self.subscribers.discard(queue)
+
+    def publish(self, message: Any) -> None:
+        """Broadcasts the message to all subscribers, dropping a subscriber's oldest message when its queue is full."""
+
+        self.received_count += 1
+
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped_count += 1
+
+            queue.put_nowait(message)
+
+    async def _consume(self) -> None:
+        """Publishes every message from the source, restarting the source after a delay if it fails."""
+
+        while True:
+            try:
+                async for message in self.source():
+                    self.publish(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"error consuming fan-out source, retrying in {self.retry_delay_seconds}s: {exc}")
+
+            await asyncio.sleep(self.retry_delay_seconds)
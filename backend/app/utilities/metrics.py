@@ -0,0 +1,104 @@
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+
+# durations of upload, DB and task work, from milliseconds to minutes, and of single cache round-trips
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+CACHE_CALL_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+# upload sizes, from 1 KB to 1 GB
+SIZE_BUCKETS = tuple(1024 * 4**exponent for exponent in range(11))
+
+UPLOAD_PARSE_SECONDS = Histogram(
+    "sensor_upload_parse_seconds", "Time spent parsing uploaded sensor data.", ["upload"], buckets=DURATION_BUCKETS
+)
+UPLOAD_SIZE_BYTES = Histogram(
+    "sensor_upload_size_bytes", "Size of uploaded sensor data files.", ["upload"], buckets=SIZE_BUCKETS
+)
+SAVE_INITIAL_DATA_SECONDS = Histogram(
+    "sensor_save_initial_data_seconds",
+    "Time spent saving file metadata and general sensor data of uploads.",
+    ["upload"],
+    buckets=DURATION_BUCKETS,
+)
+# * rows saved per second is the rate of saved rows over the rate of the save time sum
+SAVE_HOURLY_DATA_SECONDS = Histogram(
+    "sensor_save_hourly_data_seconds", "Time spent saving hourly data rows.", ["mode"], buckets=DURATION_BUCKETS
+)
+HOURLY_DATA_ROWS_SAVED = Counter("sensor_hourly_data_rows_saved", "Hourly data rows saved.", ["mode"])
+ANOMALY_CHECK_SECONDS = Histogram(
+    "sensor_anomaly_check_seconds",
+    "Time spent checking hourly data for anomalies and publishing them.",
+    buckets=DURATION_BUCKETS,
+)
+ANOMALIES_FOUND = Counter("sensor_anomalies_found", "Anomalous hourly data values found.")
+
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time tasks waited in the broker queue between being published, or becoming due, and starting.",
+    ["task"],
+    buckets=DURATION_BUCKETS,
+)
+CACHE_CALL_SECONDS = Histogram(
+    "cache_call_seconds", "Latency of cache calls, by cache utility.", ["operation"], buckets=CACHE_CALL_BUCKETS
+)
+
+WEBSOCKET_CLIENTS = Gauge(
+    "anomaly_websocket_clients", "WebSocket clients connected for anomaly updates.", multiprocess_mode="livesum"
+)
+WEBSOCKET_SEND_LAG_SECONDS = Histogram(
+    "anomaly_websocket_send_lag_seconds",
+    "Time between anomaly updates being published and being sent to a WebSocket client.",
+    buckets=DURATION_BUCKETS,
+)
+
+APP_STARTUP_SECONDS = Gauge(
+    "app_startup_seconds", "Time spent starting the API process, by startup phase.", ["phase"], multiprocess_mode="max"
+)
+
+
+def is_multiprocess() -> bool:
+    """Checks whether metrics are shared by several processes, through files in `PROMETHEUS_MULTIPROC_DIR`."""
+
+    return "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+
+def get_registry() -> CollectorRegistry:
+    """Gets the registry to export metrics from, aggregating every process' metrics in multiprocess mode."""
+
+    if not is_multiprocess():
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+
+    return registry
+
+
+def export_metrics() -> tuple[bytes, str]:
+    """Exports all metrics in the Prometheus text format. Returns the exported metrics and their content type."""
+
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int) -> None:
+    """Exports all metrics over HTTP on the given port, from a background thread."""
+
+    start_http_server(port, registry=get_registry())
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drops the live gauges of an exited process in multiprocess mode."""
+
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
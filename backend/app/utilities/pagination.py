@@ -0,0 +1,24 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from datetime import datetime
+import json
+
+
+def encode_cursor(upload_start_date: datetime, record_id: int) -> str:
+    """Encodes the sort key of the last record in a page into an opaque, URL-safe cursor token."""
+
+    serialized_key = json.dumps([upload_start_date.isoformat(), record_id], separators=(",", ":"))
+    return urlsafe_b64encode(serialized_key.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decodes a cursor token into the sort key it was encoded from. Raises ValueError for malformed tokens."""
+
+    # restore the padding stripped while encoding
+    padded_cursor = cursor + "=" * (-len(cursor) % 4)
+
+    try:
+        upload_start_date, record_id = json.loads(urlsafe_b64decode(padded_cursor.encode("ascii")))
+        return datetime.fromisoformat(upload_start_date), int(record_id)
+    except (Base64Error, UnicodeError, TypeError, ValueError) as exc:
+        raise ValueError(f"malformed cursor '{cursor}'") from exc
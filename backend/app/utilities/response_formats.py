@@ -0,0 +1,62 @@
+from typing import Any, TYPE_CHECKING
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def serialize_json(sensor_data: Any) -> bytes:
+    """Serializes sensor data into the same JSON response body the API would return for it."""
+
+    return ORJSONResponse(jsonable_encoder({"data": {"sensor_data": sensor_data}})).body
+
+
+def serialize_columnar_json(sensor_data: dict[str, Any]) -> bytes:
+    """Serializes sensor data with columnar hourly data into a JSON response body. Hourly data takes the uploaded
+    file's format: ISO times up to minutes, and values that are null where missing."""
+
+    # * imported on first use, as the router imports this module for its media types on startup
+    import numpy as np
+
+    hourly_data: dict[str, np.ndarray] = sensor_data.pop("hourly")
+    response = jsonable_encoder({"data": {"sensor_data": sensor_data}})
+
+    # * numpy arrays are serialized natively by orjson, which writes NaN values as null
+    times = np.datetime_as_string(hourly_data.pop("time").astype("datetime64[s]"), unit="m")
+    response["data"]["sensor_data"]["hourly"] = {"time": times.tolist(), **hourly_data}
+
+    return ORJSONResponse(response).body
+
+
+def serialize_msgpack(sensor_data: dict[str, Any]) -> bytes:
+    """Serializes sensor data with columnar hourly data into a MessagePack response body. Hourly data is held in typed
+    binary arrays: times as little-endian int64 epoch seconds, and values as little-endian float64, NaN where
+    missing."""
+
+    import msgpack
+
+    hourly_data: dict[str, np.ndarray] = sensor_data.pop("hourly")
+    response = jsonable_encoder({"data": {"sensor_data": sensor_data}})
+
+    response["data"]["sensor_data"]["hourly"] = {
+        "time": hourly_data.pop("time").astype("<i8").tobytes(),
+        **{field: values.astype("<f8").tobytes() for field, values in hourly_data.items()},
+    }
+
+    return msgpack.packb(response)
+
+
+# media types of the sensor data response formats, and their serializers. "columnar" and "msgpack" hold a single time
+# array shared by all hourly values; "json" lists time and value pairs per hourly data field.
+MEDIA_TYPES = {
+    "json": "application/json",
+    "columnar": "application/vnd.sensor-data.columnar+json",
+    "msgpack": "application/msgpack",
+}
+SERIALIZERS = {
+    "json": serialize_json,
+    "columnar": serialize_columnar_json,
+    "msgpack": serialize_msgpack,
+}
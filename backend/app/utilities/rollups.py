@@ -0,0 +1,58 @@
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from app.schemas.sensor import SensorHourlyColumns
+
+
+DAY_SECONDS = 60 * 60 * 24
+
+# rollup resolutions, as (period length, offset of period starts from the epoch) in seconds.
+# the epoch is a Thursday, so weekly periods start 3 days before it, i.e. on Mondays as ISO weeks do.
+ROLLUP_PERIODS: dict[str, tuple[int, int]] = {
+    "day": (DAY_SECONDS, 0),
+    "week": (DAY_SECONDS * 7, -DAY_SECONDS * 3),
+}
+
+
+def compute_rollups(
+    hourly_data: SensorHourlyColumns, resolution: str, fields: Iterable[str]
+) -> Iterator[tuple[str, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Aggregates hourly data of each given field into periods of the given resolution. Yields, per field, the period
+    starts in epoch seconds along with the minimum, maximum, mean, count and null count of each period's values.
+    Minimum, maximum and mean are NaN for periods without any values."""
+
+    period_seconds, period_offset = ROLLUP_PERIODS[resolution]
+
+    times = np.frombuffer(hourly_data.time, dtype=np.int64)
+    if len(times) == 0:
+        return
+
+    periods = (times - period_offset) // period_seconds
+
+    # * group boundaries are found on sorted periods; hourly data is normally sorted already
+    order = None if np.all(periods[1:] >= periods[:-1]) else np.argsort(periods, kind="stable")
+    if order is not None:
+        periods = periods[order]
+
+    group_starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    period_starts = periods[group_starts] * period_seconds + period_offset
+    group_sizes = np.diff(np.r_[group_starts, len(periods)])
+
+    for field in fields:
+        values = np.frombuffer(hourly_data.values[field], dtype=np.float64)
+        if order is not None:
+            values = values[order]
+
+        is_null = np.isnan(values)
+        counts = np.add.reduceat(~is_null, group_starts)
+
+        # fmin/fmax skip NaNs unless a whole period is NaN
+        minimums = np.fmin.reduceat(values, group_starts)
+        maximums = np.fmax.reduceat(values, group_starts)
+
+        sums = np.add.reduceat(np.where(is_null, 0.0, values), group_starts)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(counts > 0, sums / counts, np.nan)
+
+        yield field, period_starts, minimums, maximums, means, counts, group_sizes - counts
@@ -0,0 +1,31 @@
+import asyncio
+from typing import Any, Callable, Coroutine
+
+
+class SingleFlight:
+    """SingleFlight coalesces concurrent calls for the same key: the first caller starts the call, while later callers
+    wait for and share its result, or its exception, instead of repeating the work."""
+
+    def __init__(self) -> None:
+        self.in_flight: dict[str, asyncio.Task] = {}
+
+        self.call_count = 0
+        self.shared_count = 0
+
+    async def do(self, key: str, call: Callable[[], Coroutine[Any, Any, Any]]) -> Any:
+        """Runs the call for the given key, unless a call for it is already in flight, and returns its result."""
+
+        task = self.in_flight.get(key)
+
+        if task is None:
+            # * the call runs in its own task, so a cancelled caller, e.g. a disconnected client, does not cancel it
+            # for the others waiting on it
+            task = asyncio.create_task(call())
+            task.add_done_callback(lambda _: self.in_flight.pop(key, None))
+
+            self.in_flight[key] = task
+            self.call_count += 1
+        else:
+            self.shared_count += 1
+
+        return await asyncio.shield(task)
@@ -0,0 +1,61 @@
+from math import ceil, floor
+
+
+# rows of grid cells span latitudes from -90 upwards, and columns longitudes from -180 eastwards. coordinates on the
+# northern and eastern edges of the grid belong to its last row and column.
+def get_grid_size(cell_degrees: float) -> tuple[int, int]:
+    """Gets the number of rows and columns of a grid of cells of the given size, covering the whole globe."""
+
+    return ceil(180 / cell_degrees), ceil(360 / cell_degrees)
+
+
+def get_grid_cell_expression(latitude_column: str, longitude_column: str, cell_degrees: float) -> str:
+    """Gets the SQL expression of the ID of the grid cell holding the coordinates in the given columns, matching
+    `get_grid_cell`."""
+
+    rows, columns = get_grid_size(cell_degrees)
+
+    row = f"least(floor(({latitude_column} + 90) / {cell_degrees})::integer, {rows - 1})"
+    column = f"least(floor(({longitude_column} + 180) / {cell_degrees})::integer, {columns - 1})"
+
+    return f"{row} * {columns} + {column}"
+
+
+def get_grid_cell(latitude: float, longitude: float, cell_degrees: float) -> int:
+    """Gets the ID of the grid cell holding the given coordinates."""
+
+    rows, columns = get_grid_size(cell_degrees)
+
+    row = min(floor((latitude + 90) / cell_degrees), rows - 1)
+    column = min(floor((longitude + 180) / cell_degrees), columns - 1)
+
+    return row * columns + column
+
+
+def get_grid_cells(
+    min_latitude: float,
+    max_latitude: float,
+    min_longitude: float,
+    max_longitude: float,
+    cell_degrees: float,
+    max_cells: int,
+) -> list[int] | None:
+    """Gets the IDs of every grid cell overlapping the given bounding box, or None when there are more than
+    `max_cells` of them."""
+
+    _, columns = get_grid_size(cell_degrees)
+
+    first_cell = get_grid_cell(min_latitude, min_longitude, cell_degrees)
+    last_cell = get_grid_cell(max_latitude, max_longitude, cell_degrees)
+
+    first_row, first_column = divmod(first_cell, columns)
+    last_row, last_column = divmod(last_cell, columns)
+
+    if (last_row - first_row + 1) * (last_column - first_column + 1) > max_cells:
+        return None
+
+    return [
+        row * columns + column
+        for row in range(first_row, last_row + 1)
+        for column in range(first_column, last_column + 1)
+    ]
@@ -0,0 +1,108 @@
+import asyncio
+from inspect import signature
+from threading import Lock, Thread
+from typing import Any, Callable, Coroutine
+
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+
+class WorkerRuntime:
+    """WorkerRuntime runs async task code of a worker process on a single long-lived event loop in a background thread,
+    along with the DB engine and cache client the tasks use. Both are created on, and only ever used from, that loop, so
+    their connection pools persist across tasks instead of being set up per task or inherited from a parent process.
+    Several worker threads can run tasks on the loop at once, sharing its pools."""
+
+    def __init__(
+        self,
+        db_url: str,
+        redis_url: str,
+        db_engine_options: dict[str, Any],
+        redis_max_connections: int,
+    ) -> None:
+        self.db_url = db_url
+        self.redis_url = redis_url
+        self.db_engine_options = db_engine_options
+        self.redis_max_connections = redis_max_connections
+
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread: Thread | None = None
+        self.lock = Lock()
+
+        self.engine: AsyncEngine | None = None
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.cache_client: Redis | None = None
+
+    def start(self) -> None:
+        """Starts the event loop thread and opens the DB engine and cache client on it, unless already started."""
+
+        with self.lock:
+            if self.loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            thread = Thread(target=loop.run_forever, name="worker-runtime-loop", daemon=True)
+            thread.start()
+
+            self.loop, self.thread = loop, thread
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+
+        db_pool = (
+            f"a DB pool of {self.db_engine_options['pool_size']}+{self.db_engine_options['max_overflow']} connections"
+            if "pool_size" in self.db_engine_options
+            else "no DB pool"
+        )
+        print(f"started worker runtime with {db_pool} and a cache pool of {self.redis_max_connections} connections")
+
+    def stop(self) -> None:
+        """Closes the DB engine and cache client, then stops the event loop thread, unless not started."""
+
+        with self.lock:
+            if self.loop is None or self.thread is None:
+                return
+
+            loop, thread = self.loop, self.thread
+
+            try:
+                asyncio.run_coroutine_threadsafe(self._close(), loop).result()
+            except Exception as exc:
+                print(f"error closing worker runtime connections: {exc}")
+
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+            self.loop = self.thread = None
+
+        print("stopped worker runtime")
+
+    def run(self, coroutine_function: Callable[..., Coroutine[Any, Any, Any]], *args: Any) -> Any:
+        """Runs the coroutine function on the event loop, blocking until it completes, and returns its result. The
+        function is passed the runtime's `session_factory` and `cache_client` as keyword arguments, for those it takes."""
+
+        self.start()
+        assert self.loop is not None
+
+        resources = {"session_factory": self.session_factory, "cache_client": self.cache_client}
+        parameters = signature(coroutine_function).parameters
+        resources = {name: resource for name, resource in resources.items() if name in parameters}
+
+        coroutine = coroutine_function(*args, **resources)
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _open(self) -> None:
+        """Creates the DB engine and cache client, along with their connection pools."""
+
+        self.engine = create_async_engine(self.db_url, echo=False, **self.db_engine_options)
+        self.session_factory = async_sessionmaker(self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.cache_client = Redis.from_url(self.redis_url, max_connections=self.redis_max_connections)
+
+    async def _close(self) -> None:
+        """Closes all connections of the DB engine and cache client."""
+
+        if self.engine is not None:
+            await self.engine.dispose()
+        if self.cache_client is not None:
+            await self.cache_client.aclose()
+
+        self.engine = self.session_factory = self.cache_client = None
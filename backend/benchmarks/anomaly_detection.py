@@ -0,0 +1,92 @@
+"""Benchmarks vectorized anomaly detection against the previous per-value Decimal loop, on synthetic hourly data
+ranging from 48 hours up to 10 years.
+
+Run from the `backend` directory: `python -m benchmarks.anomaly_detection`.
+"""
+
+from decimal import Decimal
+from time import perf_counter
+
+from app.schemas.sensor import HOURLY_VALUE_FIELDS, SensorHourlyColumns
+from app.utilities.anomaly_detection import find_anomalies
+from benchmarks.generator import THRESHOLDS, generate_hourly_values
+
+
+HOUR_COUNTS = {"48 hours": 48, "1 month": 24 * 30, "1 year": 24 * 365, "10 years": 24 * 365 * 10}
+
+
+def generate_hourly_data(
+    hours: int, null_rate: float = 0.05, anomaly_rate: float = 0.01, seed: int = 0
+) -> SensorHourlyColumns:
+    """Generates hourly data columns with values inside each variable's thresholds, apart from the given share of
+    anomalous values lying beyond them."""
+
+    hourly_values = generate_hourly_values(hours, null_rate, anomaly_rate, seed)
+
+    hourly_data = SensorHourlyColumns()
+    for time in hourly_values["time"]:
+        hourly_data.append_time(time)
+
+    for data_field in HOURLY_VALUE_FIELDS:
+        for value in hourly_values[data_field]:
+            hourly_data.append_value(data_field, value)
+
+    return hourly_data
+
+
+def find_anomalies_loop(decimal_values: dict[str, list[Decimal | None]]) -> list[tuple[str, int]]:
+    """Reference implementation: the previous per-value loop comparing Decimals against Decimal thresholds."""
+
+    anomalies: list[tuple[str, int]] = []
+
+    for data_field in HOURLY_VALUE_FIELDS:
+        if data_field == "rain" or data_field not in THRESHOLDS:
+            continue
+
+        min_threshold, max_threshold = (Decimal(threshold) for threshold in THRESHOLDS[data_field])
+
+        for index, value in enumerate(decimal_values[data_field]):
+            if value is None:
+                continue
+
+            if value < min_threshold or value > max_threshold:
+                anomalies.append((data_field, index))
+
+    return anomalies
+
+
+def time_call(function, *args, repeat: int = 3) -> float:
+    """Returns the best wall time, in seconds, out of `repeat` calls."""
+
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function(*args)
+        timings.append(perf_counter() - start)
+
+    return min(timings)
+
+
+def main() -> None:
+    print(f"{'data size':>10} {'anomalies':>10} {'loop (ms)':>10} {'vectorized (ms)':>16} {'speedup':>8}")
+
+    for label, hours in HOUR_COUNTS.items():
+        hourly_data = generate_hourly_data(hours)
+        # * the previous pipeline held validated Decimal lists, so converting them is not part of the loop's timing
+        decimal_values = {data_field: list(hourly_data.iter_values(data_field)) for data_field in HOURLY_VALUE_FIELDS}
+
+        expected = find_anomalies_loop(decimal_values)
+        actual = find_anomalies(hourly_data, THRESHOLDS, skipped_fields=["rain"])
+        assert actual == expected, f"vectorized anomalies differ from the reference loop for {label}"
+
+        loop_time = time_call(find_anomalies_loop, decimal_values)
+        vectorized_time = time_call(find_anomalies, hourly_data, THRESHOLDS, ["rain"])
+
+        print(
+            f"{label:>10} {len(actual):>10} {loop_time * 1000:>10.2f} {vectorized_time * 1000:>16.2f} "
+            f"{loop_time / vectorized_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Generates synthetic sensor data files shaped like open-meteo hourly forecast exports, of any length, with the given
+shares of missing and anomalous values. Files generated with the same parameters and seed are identical.
+
+Run from the `backend` directory: `python -m benchmarks.generator --hours 87600 --output ten_years.json`.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import json
+import random
+from typing import Any
+
+from app.schemas.sensor import HOURLY_VALUE_FIELDS
+
+
+# same thresholds as `config.SENSOR_ANOMALOUS_THRESHOLDS`, duplicated to avoid requiring app env vars
+THRESHOLDS: dict[str, tuple[int, int | float]] = {
+    "temperature_2m": (-10, 50),
+    "relative_humidity_2m": (35, 85),
+    "dew_point_2m": (-15, 20),
+    "apparent_temperature": (-15, 20),
+    "precipitation": (0, 40),
+    "snowfall": (0, 10),
+    "snow_depth": (0, 0.1),
+    "pressure_msl": (950, 1050),
+    "surface_pressure": (980, 1020),
+    "cloud_cover": (0, 85),
+    "wind_speed_100m": (0, 35),
+}
+
+HOURLY_UNITS = {
+    "time": "iso8601",
+    "temperature_2m": "°C",
+    "relative_humidity_2m": "%",
+    "dew_point_2m": "°C",
+    "apparent_temperature": "°C",
+    "precipitation": "mm",
+    "rain": "mm",
+    "snowfall": "cm",
+    "snow_depth": "m",
+    "pressure_msl": "hPa",
+    "surface_pressure": "hPa",
+    "cloud_cover": "%",
+    "wind_speed_100m": "km/h",
+    "wind_direction_100m": "°",
+}
+
+START_TIME = datetime(2014, 1, 1)
+
+
+def generate_hourly_values(
+    hours: int, null_rate: float = 0.05, anomaly_rate: float = 0.01, seed: int = 0
+) -> dict[str, list[Any]]:
+    """Generates hourly times, as open-meteo formats them, and values inside each variable's thresholds, apart from the
+    given share of missing values and of anomalous values lying beyond them."""
+
+    rng = random.Random(seed)
+    hourly: dict[str, list[Any]] = {
+        "time": [(START_TIME + timedelta(hours=hour)).strftime("%Y-%m-%dT%H:%M") for hour in range(hours)]
+    }
+
+    for data_field in HOURLY_VALUE_FIELDS:
+        low, high = THRESHOLDS.get(data_field, (0, 100))
+        values: list[float | None] = []
+
+        for _ in range(hours):
+            roll = rng.random()
+            if roll < null_rate:
+                values.append(None)
+            elif roll < null_rate + anomaly_rate:
+                values.append(high + 1 + round(rng.random() * 10, 1))
+            else:
+                values.append(round(rng.uniform(low, high), 1))
+
+        hourly[data_field] = values
+
+    return hourly
+
+
+def generate_sensor_data(
+    hours: int, null_rate: float = 0.05, anomaly_rate: float = 0.01, seed: int = 0
+) -> dict[str, Any]:
+    """Generates an open-meteo shaped sensor data document, holding the given number of hours of hourly data."""
+
+    return {
+        "latitude": 19.086115,
+        "longitude": 72.85291,
+        "generationtime_ms": 0.30100345611572266,
+        "utc_offset_seconds": 0,
+        "timezone": "GMT",
+        "timezone_abbreviation": "GMT",
+        "elevation": 8.0,
+        "hourly_units": HOURLY_UNITS,
+        "hourly": generate_hourly_values(hours, null_rate, anomaly_rate, seed),
+    }
+
+
+def generate_sensor_data_file(
+    hours: int, null_rate: float = 0.05, anomaly_rate: float = 0.01, seed: int = 0
+) -> bytes:
+    """Generates the content of an open-meteo shaped sensor data file, as compact JSON."""
+
+    sensor_data = generate_sensor_data(hours, null_rate, anomaly_rate, seed)
+    return json.dumps(sensor_data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generates a synthetic open-meteo shaped sensor data file.")
+    parser.add_argument("--hours", type=int, default=24 * 365, help="hours of hourly data, a year by default")
+    parser.add_argument("--null-rate", type=float, default=0.05, help="share of missing values")
+    parser.add_argument("--anomaly-rate", type=float, default=0.01, help="share of values beyond their thresholds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", required=True, help="path of the generated file")
+    args = parser.parse_args()
+
+    content = generate_sensor_data_file(args.hours, args.null_rate, args.anomaly_rate, args.seed)
+
+    with open(args.output, "wb") as output_file:
+        output_file.write(content)
+
+    print(f"generated {args.hours} hours of sensor data in {args.output} ({len(content) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmarks the byte size and serialization time of the sensor data response formats, on synthetic hourly data
+ranging from 48 hours up to 10 years: per-field lists of hourly records as JSON, against columnar JSON and
+MessagePack.
+
+Run from the `backend` directory: `python -m benchmarks.response_formats`.
+"""
+
+from decimal import Decimal
+from typing import Any
+
+import numpy as np
+
+from app.schemas.sensor import HOURLY_VALUE_FIELDS, SensorHourlyColumns
+from app.utilities.response_formats import SERIALIZERS
+from benchmarks.anomaly_detection import HOUR_COUNTS, generate_hourly_data, time_call
+
+
+SENSOR_DATA_FIELDS: dict[str, Any] = {
+    "id": 1,
+    "file_metadata_id": 1,
+    "latitude": Decimal("19.086115"),
+    "longitude": Decimal("72.85291"),
+    "generationtime_ms": Decimal("0.30100345611572266"),
+    "utc_offset_seconds": Decimal("0"),
+    "timezone": "GMT",
+    "timezone_abbreviation": "GMT",
+    "elevation": Decimal("8.0"),
+    "hourly_units": {"time": "iso8601", **{data_field: "unit" for data_field in HOURLY_VALUE_FIELDS}},
+}
+
+
+def build_record_sensor_data(hourly_data: SensorHourlyColumns) -> dict[str, Any]:
+    """Builds sensor data holding a list of hourly records per field, as the narrow layout's records serialize."""
+
+    sensor_data = dict(SENSOR_DATA_FIELDS)
+    times = list(hourly_data.iter_times())
+    record_id = 0
+
+    for data_field in HOURLY_VALUE_FIELDS:
+        records = []
+
+        for time, value in zip(times, hourly_data.iter_values(data_field)):
+            record_id += 1
+            records.append({"id": record_id, "sensor_data_id": 1, "time": time, "value": value})
+
+        sensor_data[f"hourly_{data_field}"] = records
+
+    return sensor_data
+
+
+def build_columnar_sensor_data(hourly_data: SensorHourlyColumns) -> dict[str, Any]:
+    """Builds sensor data holding columnar hourly data: epoch second times shared by every field's values."""
+
+    sensor_data = dict(SENSOR_DATA_FIELDS)
+    sensor_data["hourly"] = {
+        "time": np.frombuffer(hourly_data.time, dtype=np.int64),
+        **{
+            data_field: np.frombuffer(hourly_data.values[data_field], dtype=np.float64)
+            for data_field in HOURLY_VALUE_FIELDS
+        },
+    }
+
+    return sensor_data
+
+
+def main() -> None:
+    print(f"{'data size':>10} {'format':>9} {'size (KB)':>11} {'serialize (ms)':>15} {'size ratio':>11}")
+
+    for label, hours in HOUR_COUNTS.items():
+        hourly_data = generate_hourly_data(hours)
+        record_sensor_data = build_record_sensor_data(hourly_data)
+
+        # * serializers consume the columnar hourly data, so each call gets its own copy of the top-level dict
+        builders = {
+            "json": lambda: record_sensor_data,
+            "columnar": lambda: build_columnar_sensor_data(hourly_data),
+            "msgpack": lambda: build_columnar_sensor_data(hourly_data),
+        }
+
+        record_size = len(SERIALIZERS["json"](builders["json"]()))
+
+        for response_format, build in builders.items():
+            size = len(SERIALIZERS[response_format](build()))
+            serialize_time = time_call(lambda: SERIALIZERS[response_format](build()))
+
+            print(
+                f"{label:>10} {response_format:>9} {size / 1024:>11.1f} {serialize_time * 1000:>15.2f} "
+                f"{record_size / size:>10.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
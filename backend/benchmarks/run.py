@@ -0,0 +1,280 @@
+"""Benchmarks the ingest and read paths against a local Postgres and Redis: parsing uploads, saving initial and hourly
+data, checking hourly data for anomalies and reading sensor data back, on synthetic files from `benchmarks.generator`.
+Results are emitted as JSON, to be diffed between commits. Given the results of an earlier run as a baseline, reports
+benchmarks that got slower beyond a tolerance and exits with an error.
+
+Saved data is rolled back after each run, apart from one completed upload per data size that reads are benchmarked
+on; it is identified by its content hash and reused by later runs. Anomalies found are published to the anomaly stream.
+
+Run from the `backend` directory, with the app's env vars set:
+`python -m benchmarks.run --hours 48 8760 --output results.json [--baseline earlier_results.json]`.
+"""
+
+import argparse
+import asyncio
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from hashlib import sha256
+from io import BytesIO
+import json
+import platform
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any, Callable, Coroutine
+
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+from app.config.cache import redis_client
+from app.config.config import HOURLY_DATA_BULK_LOAD, HOURLY_DATA_LAYOUT, HOURLY_DATA_WRITE_LAYOUTS
+from app.models.base import AsyncSessionLocal, create_tables, engine
+from app.schemas.sensor import HOURLY_VALUE_FIELDS, SensorData
+import app.services.sensor as service
+from benchmarks.generator import generate_sensor_data_file
+
+
+DEFAULT_HOURS = [48, 24 * 30, 24 * 365]
+
+
+def get_upload_file(content: bytes) -> UploadFile:
+    """Wraps sensor data file content in an upload, as the API receives it."""
+
+    return UploadFile(
+        BytesIO(content),
+        size=len(content),
+        filename="benchmark.json",
+        headers=Headers({"content-type": "application/json"}),
+    )
+
+
+async def benchmark_parse_sensor_data(case: dict[str, Any]) -> float:
+    upload_file = get_upload_file(case["content"])
+
+    start_time = perf_counter()
+    await service.parse_sensor_data(upload_file)
+
+    return perf_counter() - start_time
+
+
+async def benchmark_save_initial_data(case: dict[str, Any]) -> float:
+    upload_file = get_upload_file(case["content"])
+
+    async with AsyncSessionLocal() as session:
+        start_time = perf_counter()
+        await service.save_initial_data(upload_file, case["sensor_data"], session)
+        elapsed_time = perf_counter() - start_time
+
+        await session.rollback()
+
+    return elapsed_time
+
+
+async def benchmark_save_hourly_data(case: dict[str, Any]) -> float:
+    upload_file = get_upload_file(case["content"])
+
+    async with AsyncSessionLocal() as session:
+        _, sensor_data_id = await service.save_initial_data(upload_file, case["sensor_data"], session)
+
+        start_time = perf_counter()
+        await service.save_hourly_data(case["sensor_data"], sensor_data_id, session)
+        elapsed_time = perf_counter() - start_time
+
+        await session.rollback()
+
+    return elapsed_time
+
+
+async def benchmark_check_hourly_data(case: dict[str, Any]) -> float:
+    start_time = perf_counter()
+    await service.check_hourly_data(case["sensor_data"], case["file_metadata_id"])
+
+    return perf_counter() - start_time
+
+
+async def benchmark_get_associated_sensor_data(case: dict[str, Any], columnar: bool = False) -> float:
+    # * a new session per run, so no records are served from an earlier run's identity map
+    async with AsyncSessionLocal() as session:
+        start_time = perf_counter()
+        await service.get_associated_sensor_data(case["file_metadata_id"], session, columnar=columnar)
+
+        return perf_counter() - start_time
+
+
+async def benchmark_get_associated_sensor_data_columnar(case: dict[str, Any]) -> float:
+    return await benchmark_get_associated_sensor_data(case, columnar=True)
+
+
+BENCHMARKS: dict[str, Callable[[dict[str, Any]], Coroutine[Any, Any, float]]] = {
+    "parse_sensor_data": benchmark_parse_sensor_data,
+    "save_initial_data": benchmark_save_initial_data,
+    "save_hourly_data": benchmark_save_hourly_data,
+    "check_hourly_data": benchmark_check_hourly_data,
+    "get_associated_sensor_data": benchmark_get_associated_sensor_data,
+    "get_associated_sensor_data_columnar": benchmark_get_associated_sensor_data_columnar,
+}
+
+
+async def get_benchmark_upload(content: bytes, sensor_data: SensorData) -> int:
+    """Gets the file metadata ID of the completed upload holding the given content, saving it first if needed."""
+
+    content_hash = sha256(content).hexdigest()
+
+    async with AsyncSessionLocal() as session:
+        file_metadata_id = await service.get_duplicate_upload_id(content_hash, session)
+        if file_metadata_id is not None:
+            return file_metadata_id
+
+        file_metadata_id, sensor_data_id = await service.save_initial_data(
+            get_upload_file(content), sensor_data, session, content_hash
+        )
+        await service.save_hourly_units(sensor_data, sensor_data_id, session)
+        await service.save_hourly_data(sensor_data, sensor_data_id, session)
+        await service.save_hourly_data_rollups(sensor_data, sensor_data_id, session)
+        await service.mark_upload_completion(file_metadata_id, session)
+
+        await session.commit()
+
+    return file_metadata_id
+
+
+async def run_benchmarks(
+    hour_counts: list[int], null_rate: float, anomaly_rate: float, seed: int, repeat: int, names: list[str]
+) -> list[dict[str, Any]]:
+    """Runs the named benchmarks `repeat` times for every data size. Returns the timings of each benchmark and size."""
+
+    results: list[dict[str, Any]] = []
+
+    for hours in hour_counts:
+        content = generate_sensor_data_file(hours, null_rate, anomaly_rate, seed)
+        sensor_data = await service.parse_sensor_data(get_upload_file(content))
+
+        # * sensor data is saved in the same transaction as its hourly data here, so partitions are created beforehand
+        await service.ensure_upcoming_hourly_data_partitions()
+
+        case = {
+            "content": content,
+            "sensor_data": sensor_data,
+            "file_metadata_id": await get_benchmark_upload(content, sensor_data),
+        }
+        hourly_values = hours * len(HOURLY_VALUE_FIELDS)
+
+        for name in names:
+            timings = [await BENCHMARKS[name](case) for _ in range(repeat)]
+
+            results.append(
+                {
+                    "benchmark": name,
+                    "hours": hours,
+                    "hourly_values": hourly_values,
+                    "min_seconds": min(timings),
+                    "median_seconds": median(timings),
+                    "max_seconds": max(timings),
+                    "hourly_values_per_second": hourly_values / median(timings),
+                }
+            )
+            print(f"{name:>36} {hours:>8} hours {median(timings) * 1000:>12.2f} ms", file=sys.stderr)
+
+    return results
+
+
+def compare_results(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """Compares median timings against the baseline's, for benchmarks run on the same data sizes. Returns a description
+    of every benchmark slower than the baseline by more than the tolerance, as a share of the baseline timing."""
+
+    baseline_timings = {(result["benchmark"], result["hours"]): result["median_seconds"] for result in baseline}
+    regressions: list[str] = []
+
+    for result in results:
+        baseline_timing = baseline_timings.get((result["benchmark"], result["hours"]))
+        if baseline_timing is None:
+            continue
+
+        ratio = result["median_seconds"] / baseline_timing
+        description = (
+            f"{result['benchmark']} on {result['hours']} hours: {baseline_timing * 1000:.2f} ms -> "
+            f"{result['median_seconds'] * 1000:.2f} ms ({ratio:.2f}x)"
+        )
+        print(description, file=sys.stderr)
+
+        if ratio > 1 + tolerance:
+            regressions.append(description)
+
+    return regressions
+
+
+def get_commit() -> str | None:
+    """Gets the hash of the checked out git commit, if any."""
+
+    try:
+        output = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return output.strip()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmarks the ingest and read paths against a local DB and cache.")
+    parser.add_argument("--hours", type=int, nargs="+", default=DEFAULT_HOURS, help="hours of data per benchmark run")
+    parser.add_argument("--null-rate", type=float, default=0.05, help="share of missing values")
+    parser.add_argument("--anomaly-rate", type=float, default=0.01, help="share of values beyond their thresholds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark and data size")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--output", help="path to write the JSON results to, instead of stdout")
+    parser.add_argument("--baseline", help="path of earlier JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    # * the app reports its own progress on stdout, which is kept for the JSON results
+    with redirect_stdout(sys.stderr):
+        await create_tables()
+
+        try:
+            results = await run_benchmarks(
+                args.hours, args.null_rate, args.anomaly_rate, args.seed, args.repeat, args.benchmarks
+            )
+        finally:
+            await engine.dispose()
+            await redis_client.aclose()
+
+    report = {
+        "commit": get_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "parameters": {
+            "hours": args.hours,
+            "null_rate": args.null_rate,
+            "anomaly_rate": args.anomaly_rate,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "settings": {
+            "HOURLY_DATA_BULK_LOAD": HOURLY_DATA_BULK_LOAD,
+            "HOURLY_DATA_LAYOUT": HOURLY_DATA_LAYOUT,
+            "HOURLY_DATA_WRITE_LAYOUTS": HOURLY_DATA_WRITE_LAYOUTS,
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed beyond {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
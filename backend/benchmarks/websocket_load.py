@@ -0,0 +1,265 @@
+"""Load tests anomaly update delivery through the `/sensor/anomalies` WebSocket endpoint of a running app: connects many
+clients at once, uploads a burst of generated files whose anomalies are known in advance, and reports how completely
+and how fast every client received them. Latency runs from the time each update was published, as held in the
+timestamp part of its stream entry ID, to the time a client received it. The Cache's connected client count is sampled
+throughout, to show the connections the app opens per WebSocket client.
+
+Run from the `backend` directory, with the app's env vars set and the app and a worker running:
+`python -m benchmarks.websocket_load --url http://127.0.0.1:8000 --clients 200 --uploads 5 --output report.json`.
+"""
+
+import argparse
+import asyncio
+from base64 import b64encode
+import json
+import os
+import sys
+import time
+from typing import Any
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from uuid import uuid4
+
+import numpy as np
+from redis.asyncio import Redis
+import websockets
+
+from app.config.cache import redis_url
+from app.utilities.anomaly_detection import find_anomalies
+from benchmarks.anomaly_detection import generate_hourly_data
+from benchmarks.generator import THRESHOLDS, generate_sensor_data_file
+
+
+UPLOAD_MAX_ATTEMPTS = 5
+LATENCY_PERCENTILES = (50, 90, 99)
+
+
+class AnomalyClient:
+    """AnomalyClient receives anomaly updates over a WebSocket connection, recording when each one arrived."""
+
+    def __init__(self, ws_url: str) -> None:
+        self.ws_url = ws_url
+        self.connected = asyncio.Event()
+        # received (file metadata ID, event ID, receive time) tuples
+        self.updates: list[tuple[int, str, float]] = []
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Receives updates until stopped."""
+
+        async with websockets.connect(self.ws_url, max_queue=None) as websocket:
+            self.connected.set()
+            receive_task = asyncio.create_task(self._receive(websocket))
+
+            await stop.wait()
+            receive_task.cancel()
+
+    async def _receive(self, websocket: Any) -> None:
+        async for message in websocket:
+            update = json.loads(message)
+            self.updates.append((update["id"], update["event_id"], time.time()))
+
+    def count_received(self, file_metadata_ids: set[int]) -> int:
+        """Counts the distinct updates received for the given uploads."""
+
+        return len(
+            {event_id for file_metadata_id, event_id, _ in self.updates if file_metadata_id in file_metadata_ids}
+        )
+
+
+def count_expected_anomalies(hours: int, null_rate: float, anomaly_rate: float, seed: int) -> int:
+    """Counts the anomalies the app publishes for a generated file, skipping rain like the app does."""
+
+    hourly_data = generate_hourly_data(hours, null_rate, anomaly_rate, seed)
+    return len(find_anomalies(hourly_data, THRESHOLDS, skipped_fields=["rain"]))
+
+
+def upload_file(url: str, content: bytes, filename: str, authorization: str) -> int:
+    """Uploads a sensor data file, forcing it to be processed even if it was uploaded before, and retrying while the
+    app rejects uploads under load. Returns the upload's file metadata ID."""
+
+    boundary = uuid4().hex
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="sensor_data_file"; filename="{filename}"\r\n'
+        f"Content-Type: application/json\r\n\r\n"
+    ).encode("utf-8")
+    body += content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+
+    headers = {"Content-Type": f"multipart/form-data; boundary={boundary}", "Authorization": authorization}
+
+    for attempt in range(1, UPLOAD_MAX_ATTEMPTS + 1):
+        request = Request(f"{url}/sensor/data?force=true", data=body, headers=headers, method="POST")
+
+        try:
+            with urlopen(request) as response:
+                return json.load(response)["data"]["file_metadata_id"]
+        except HTTPError as exc:
+            if exc.code != 429 or attempt == UPLOAD_MAX_ATTEMPTS:
+                raise
+
+            retry_after = int(exc.headers.get("Retry-After", 1))
+            print(f"upload of {filename} rejected under load, retrying in {retry_after}s", file=sys.stderr)
+            time.sleep(retry_after)
+
+    raise RuntimeError(f"upload of {filename} was rejected {UPLOAD_MAX_ATTEMPTS} times")
+
+
+async def sample_connected_clients(cache_client: Redis, samples: list[int], stop: asyncio.Event) -> None:
+    """Samples the number of clients connected to the Cache every half second, until stopped."""
+
+    while not stop.is_set():
+        info = await cache_client.info("clients")
+        samples.append(info["connected_clients"])
+
+        try:
+            await asyncio.wait_for(stop.wait(), 0.5)
+        except asyncio.TimeoutError:
+            pass
+
+
+def get_latency_stats(latencies: list[float]) -> dict[str, float | None]:
+    """Gets percentiles and the maximum of the given latencies, in milliseconds."""
+
+    if not latencies:
+        return {**{f"p{percentile}_ms": None for percentile in LATENCY_PERCENTILES}, "max_ms": None}
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        **{f"p{percentile}_ms": float(np.percentile(latencies_ms, percentile)) for percentile in LATENCY_PERCENTILES},
+        "max_ms": float(latencies_ms.max()),
+    }
+
+
+async def run_load_test(args: argparse.Namespace) -> dict[str, Any]:
+    """Connects the clients, uploads the files and waits for every client to receive every expected update, or for
+    the timeout. Returns the load test report."""
+
+    authorization = "Basic " + b64encode(f"{args.user}:{args.password}".encode("utf-8")).decode("ascii")
+    ws_url = args.url.replace("http", "ws", 1) + "/sensor/anomalies"
+
+    # * every upload gets its own seed, so its content and anomalies differ from the others'
+    seeds = [args.seed + index for index in range(args.uploads)]
+    files = [generate_sensor_data_file(args.hours, args.null_rate, args.anomaly_rate, seed) for seed in seeds]
+    expected_count = sum(
+        count_expected_anomalies(args.hours, args.null_rate, args.anomaly_rate, seed) for seed in seeds
+    )
+
+    cache_client = Redis.from_url(redis_url)
+    connection_samples: list[int] = []
+    stop_sampling = asyncio.Event()
+    sampling_task = asyncio.create_task(sample_connected_clients(cache_client, connection_samples, stop_sampling))
+
+    baseline_connections = (await cache_client.info("clients"))["connected_clients"]
+
+    clients = [AnomalyClient(ws_url) for _ in range(args.clients)]
+    stop_clients = asyncio.Event()
+    client_tasks = [asyncio.create_task(client.run(stop_clients)) for client in clients]
+
+    connect_start = time.perf_counter()
+    await asyncio.wait_for(asyncio.gather(*(client.connected.wait() for client in clients)), args.timeout)
+    connect_time = time.perf_counter() - connect_start
+    connected_connections = (await cache_client.info("clients"))["connected_clients"]
+
+    print(f"connected {args.clients} clients in {connect_time:.2f}s, uploading {args.uploads} files", file=sys.stderr)
+
+    upload_start = time.perf_counter()
+    file_metadata_ids = set(
+        await asyncio.gather(
+            *(
+                asyncio.to_thread(upload_file, args.url, content, f"load_test_{seed}.json", authorization)
+                for seed, content in zip(seeds, files)
+            )
+        )
+    )
+    upload_time = time.perf_counter() - upload_start
+
+    # * wait until every client received every expected update, or the timeout passes
+    deadline = time.perf_counter() + args.timeout
+    while time.perf_counter() < deadline:
+        if all(client.count_received(file_metadata_ids) >= expected_count for client in clients):
+            break
+
+        await asyncio.sleep(0.2)
+
+    delivery_time = time.perf_counter() - upload_start
+
+    stop_clients.set()
+    await asyncio.gather(*client_tasks, return_exceptions=True)
+    stop_sampling.set()
+    await sampling_task
+    await cache_client.aclose()
+
+    latencies: list[float] = []
+    received_counts: list[int] = []
+    duplicate_count = 0
+
+    for client in clients:
+        updates = [update for update in client.updates if update[0] in file_metadata_ids]
+        event_ids = {event_id for _, event_id, _ in updates}
+
+        received_counts.append(len(event_ids))
+        duplicate_count += len(updates) - len(event_ids)
+
+        # * event IDs start with the time the update was published at, in milliseconds
+        latencies += [received_at - int(event_id.split("-")[0]) / 1000 for _, event_id, received_at in updates]
+
+    completeness = [received_count / expected_count if expected_count else 1.0 for received_count in received_counts]
+
+    return {
+        "parameters": {
+            "url": args.url,
+            "clients": args.clients,
+            "uploads": args.uploads,
+            "hours": args.hours,
+            "null_rate": args.null_rate,
+            "anomaly_rate": args.anomaly_rate,
+            "seed": args.seed,
+        },
+        "expected_updates_per_client": expected_count,
+        "connect_seconds": connect_time,
+        "upload_seconds": upload_time,
+        "delivery_seconds": delivery_time,
+        "latency": get_latency_stats(latencies),
+        "delivery": {
+            "complete_clients": sum(received_count >= expected_count for received_count in received_counts),
+            "min_completeness": min(completeness),
+            "mean_completeness": sum(completeness) / len(completeness),
+            "duplicate_updates": duplicate_count,
+        },
+        # the sampling connection is included in every count
+        "cache_connections": {
+            "before_clients": baseline_connections,
+            "after_connecting": connected_connections,
+            "peak": max(connection_samples, default=connected_connections),
+        },
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Load tests anomaly update delivery over WebSockets.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of the running app")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent WebSocket clients")
+    parser.add_argument("--uploads", type=int, default=5, help="files uploaded at once")
+    parser.add_argument("--hours", type=int, default=24 * 30, help="hours of data per uploaded file")
+    parser.add_argument("--null-rate", type=float, default=0.05, help="share of missing values")
+    parser.add_argument("--anomaly-rate", type=float, default=0.01, help="share of values beyond their thresholds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for connections and delivery")
+    parser.add_argument("--user", default=os.getenv("USER_NAME"), help="basic auth user, `USER_NAME` by default")
+    parser.add_argument(
+        "--password", default=os.getenv("USER_PASSWORD"), help="basic auth password, `USER_PASSWORD` by default"
+    )
+    parser.add_argument("--output", help="path to write the JSON report to, instead of stdout")
+    args = parser.parse_args()
+
+    report = await run_load_test(args)
+    output = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,17 @@
+import os
+
+
+# * the app's config requires these env vars at import time; tests never connect to the DB or cache
+for name, value in {
+    "DB_NAME": "test",
+    "DB_HOST": "127.0.0.1",
+    "DB_USER": "test",
+    "DB_PASSWORD": "test",
+    "DB_PORT": "5432",
+    "USER_NAME": "test",
+    "USER_PASSWORD": "test",
+    "REDIS_HOST": "127.0.0.1",
+    "REDIS_PASSWORD": "test",
+    "REDIS_PORT": "6379",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,79 @@
+from hashlib import sha256
+from io import BytesIO
+import tarfile
+import zipfile
+
+import pytest
+
+from app.utilities.batch_uploads import HashingReader, get_batch_format, iter_batch_documents
+
+
+def read_documents(file, filename, batch_format, max_document_size=1024):
+    return [
+        (name, size, None if content is None else content.read())
+        for name, size, content in iter_batch_documents(file, filename, batch_format, max_document_size)
+    ]
+
+
+def test_batch_format_prefers_extension_over_content_type():
+    assert get_batch_format("uploads.TAR.GZ", "application/json") == "tar"
+    assert get_batch_format("uploads.jsonl", None) == "ndjson"
+    assert get_batch_format("uploads", "application/zip; charset=binary") == "zip"
+    assert get_batch_format("uploads.csv", "text/csv") is None
+    assert get_batch_format(None, None) is None
+
+
+def test_hashing_reader_hashes_unread_content_too():
+    reader = HashingReader(BytesIO(b'{"a": 1}'))
+    reader.read(3)
+
+    assert reader.hexdigest() == sha256(b'{"a": 1}').hexdigest()
+
+
+def test_ndjson_documents_are_named_by_line_and_skip_blank_lines():
+    file = BytesIO(b'{"a": 1}\n\n  {"b": 2}  \n' + b'{"c": "' + b"x" * 32 + b'"}\n')
+
+    assert read_documents(file, "uploads.ndjson", "ndjson", max_document_size=16) == [
+        ("uploads.ndjson:1", 8, b'{"a": 1}'),
+        ("uploads.ndjson:3", 8, b'{"b": 2}'),
+        ("uploads.ndjson:4", 41, None),
+    ]
+
+
+def test_json_documents_over_the_size_limit_are_not_read():
+    assert read_documents(BytesIO(b'{"a": 1}'), "upload.json", "json", max_document_size=4) == [
+        ("upload.json", 8, None)
+    ]
+
+
+def test_zip_archives_yield_only_json_members():
+    file = BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        archive.writestr("data/a.json", b'{"a": 1}')
+        archive.writestr("data/notes.txt", b"notes")
+        archive.writestr("data/.hidden.json", b"{}")
+        archive.writestr("__MACOSX/data/a.json", b"{}")
+        archive.writestr("data/large.json", b"x" * 2048)
+
+    assert read_documents(file, "uploads.zip", "zip") == [
+        ("data/a.json", 8, b'{"a": 1}'),
+        ("data/large.json", 2048, None),
+    ]
+
+
+def test_tar_archives_yield_only_json_members():
+    file = BytesIO()
+    with tarfile.open(fileobj=file, mode="w:gz") as archive:
+        for name, content in [("a.json", b'{"a": 1}'), ("b.txt", b"notes")]:
+            member = tarfile.TarInfo(name)
+            member.size = len(content)
+            archive.addfile(member, BytesIO(content))
+    file.seek(0)
+
+    assert read_documents(file, "uploads.tgz", "tar") == [("a.json", 8, b'{"a": 1}')]
+
+
+@pytest.mark.parametrize("batch_format", ["zip", "tar"])
+def test_invalid_archives_are_rejected(batch_format):
+    with pytest.raises(ValueError):
+        read_documents(BytesIO(b"not an archive"), "uploads", batch_format)
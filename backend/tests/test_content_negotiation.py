@@ -0,0 +1,34 @@
+from app.utilities.content_negotiation import negotiate_media_type
+
+
+MEDIA_TYPES = ["application/json", "application/vnd.sensor-data.columnar+json", "application/msgpack"]
+
+
+def test_missing_accept_header_negotiates_default():
+    assert negotiate_media_type(None, MEDIA_TYPES) == "application/json"
+    assert negotiate_media_type(" ", MEDIA_TYPES) == "application/json"
+
+
+def test_most_preferred_media_type_is_negotiated():
+    accept = "application/json;q=0.5, application/msgpack"
+    assert negotiate_media_type(accept, MEDIA_TYPES) == "application/msgpack"
+
+
+def test_zero_quality_excludes_media_type_from_wildcards():
+    assert negotiate_media_type("application/msgpack;q=0, */*", MEDIA_TYPES) == "application/json"
+    assert negotiate_media_type("application/json;q=0, application/*", MEDIA_TYPES) == (
+        "application/vnd.sensor-data.columnar+json"
+    )
+
+
+def test_zero_quality_wildcard_excludes_every_media_type():
+    assert negotiate_media_type("application/msgpack;q=0", MEDIA_TYPES) is None
+    assert negotiate_media_type("*/*;q=0", MEDIA_TYPES) is None
+
+
+def test_specific_range_overrides_wildcard_quality():
+    assert negotiate_media_type("*/*;q=0.1, application/msgpack;q=0.5", MEDIA_TYPES) == "application/msgpack"
+
+
+def test_unacceptable_header_negotiates_nothing():
+    assert negotiate_media_type("text/html", MEDIA_TYPES) is None
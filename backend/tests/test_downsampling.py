@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+import app.services.sensor as service
+from app.utilities.downsampling import largest_triangle_three_buckets
+
+
+def test_short_series_and_small_thresholds_keep_every_point():
+    x = np.arange(5)
+
+    assert largest_triangle_three_buckets(x, x, 5).tolist() == [0, 1, 2, 3, 4]
+    assert largest_triangle_three_buckets(x, x, 2).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_selected_points_keep_ends_and_are_ascending():
+    x = np.arange(1000)
+    y = np.sin(x / 25)
+    selected_indexes = largest_triangle_three_buckets(x, y, 50)
+
+    assert len(selected_indexes) == 50
+    assert selected_indexes[0] == 0 and selected_indexes[-1] == 999
+    assert np.all(np.diff(selected_indexes) > 0)
+
+
+def test_spikes_are_kept():
+    x = np.arange(100)
+    y = np.zeros(100)
+    y[37], y[71] = 10, -10
+
+    selected_indexes = largest_triangle_three_buckets(x, y, 10).tolist()
+
+    assert 37 in selected_indexes and 71 in selected_indexes
+
+
+def test_downsampled_hourly_series_leave_out_null_values():
+    times = [datetime(2024, 1, 1) + timedelta(hours=hour) for hour in range(48)]
+    series = [(time, None if hour % 2 else Decimal(hour)) for hour, time in enumerate(times)]
+
+    downsampled_series = service._downsample_hourly_data_series({"rain": series, "snowfall": series[:5]}, 10)
+
+    assert len(downsampled_series["rain"]) == 10
+    assert all(value is not None for _, value in downsampled_series["rain"])
+    assert downsampled_series["snowfall"] == series[:5]
@@ -0,0 +1,56 @@
+from decimal import Decimal
+import json
+
+import pytest
+
+from app.schemas.sensor import HOURLY_VALUE_FIELDS, SensorData, SensorHourlyColumns
+from benchmarks.generator import generate_sensor_data_file
+
+
+def build_hourly_data(times: list, values: list) -> dict[str, list]:
+    return {"time": times, **{data_field: values for data_field in HOURLY_VALUE_FIELDS}}
+
+
+def test_hourly_columns_round_trip_through_bytes():
+    hourly_data = build_hourly_data(["2024-01-01T00:00", "2024-01-01T01:00", 1704074400], [1.5, None, 3])
+    hourly_columns = SensorHourlyColumns.from_dict(hourly_data)
+
+    unpacked_columns = SensorHourlyColumns.from_bytes(hourly_columns.to_bytes())
+
+    assert unpacked_columns.to_dict() == {
+        "time": ["2024-01-01T00:00:00", "2024-01-01T01:00:00", "2024-01-01T02:00:00"],
+        **{data_field: [1.5, None, 3.0] for data_field in HOURLY_VALUE_FIELDS},
+    }
+    assert list(unpacked_columns.iter_values("rain")) == [Decimal("1.5"), None, Decimal("3.0")]
+
+
+def test_aware_times_are_stored_as_utc():
+    hourly_columns = SensorHourlyColumns.from_dict(build_hourly_data(["2024-01-01T02:00:00+02:00"], [1]))
+    assert hourly_columns.to_dict()["time"] == ["2024-01-01T00:00:00"]
+
+
+def test_hourly_column_ranges_keep_times_and_values_aligned():
+    hourly_columns = SensorHourlyColumns.from_dict(build_hourly_data([0, 3600, 7200], [1, 2, 3]))
+    hourly_range = hourly_columns.get_range(1, 3)
+
+    assert hourly_range.to_dict() == build_hourly_data(["1970-01-01T01:00:00", "1970-01-01T02:00:00"], [2.0, 3.0])
+
+
+@pytest.mark.parametrize(
+    "hourly_data",
+    [
+        {"time": [0]},
+        build_hourly_data([0, 3600], [1]),
+        build_hourly_data([True], [1]),
+        build_hourly_data([0], [[1]]),
+    ],
+)
+def test_invalid_hourly_data_is_rejected(hourly_data):
+    with pytest.raises(ValueError):
+        SensorHourlyColumns.from_dict(hourly_data)
+
+
+def test_sensor_data_round_trips_through_bytes():
+    sensor_data = SensorData(**json.loads(generate_sensor_data_file(48, anomaly_rate=0.1)))
+
+    assert SensorData.from_bytes(sensor_data.to_bytes()).model_dump() == sensor_data.model_dump()
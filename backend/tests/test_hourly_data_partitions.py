@@ -0,0 +1,96 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from fnmatch import fnmatch
+
+import app.services.sensor as service
+from app.config.config import SENSOR_DATA_RESPONSE_KEY
+
+
+class FakeSession:
+    """FakeSession stands in for a DB session whose transactions do nothing."""
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+
+@asynccontextmanager
+async def fake_session_factory():
+    yield FakeSession()
+
+
+class FakeRedis:
+    """FakeRedis holds cached keys in memory, for the cache commands response invalidation uses."""
+
+    def __init__(self, keys: list[str]) -> None:
+        self.keys = set(keys)
+
+    async def scan_iter(self, match: str, count: int):
+        for key in sorted(self.keys):
+            if fnmatch(key, match):
+                yield key.encode("utf-8")
+
+    async def delete(self, *keys: bytes) -> None:
+        self.keys -= {key.decode("utf-8") for key in keys}
+
+
+def test_dropping_expired_partitions_invalidates_their_cached_responses(monkeypatch):
+    partitions = [
+        ("hourly_temperature", "hourly_temperature_0", 0, 1000),
+        ("hourly_rain", "hourly_rain_0", 0, 1000),
+        ("hourly_temperature", "hourly_temperature_1000", 1000, 2000),
+        ("hourly_rain", "hourly_rain_1000", 1000, 2000),
+    ]
+    upload_start_dates = {0: datetime.utcnow() - timedelta(days=30), 1000: datetime.utcnow() + timedelta(days=1)}
+    dropped: list[list[str]] = []
+
+    async def get_hourly_data_partitions(session):
+        return partitions
+
+    async def lock_hourly_data_partitions(lock_timeout, session):
+        pass
+
+    async def get_latest_upload_start_date(range_start, range_end, session):
+        return upload_start_dates[range_start]
+
+    async def drop_hourly_data_partitions(partition_names, session):
+        dropped.append(partition_names)
+
+    async def delete_sensor_data_range(range_start, range_end, session):
+        return [1, 2]
+
+    monkeypatch.setattr(service.repository, "get_hourly_data_partitions", get_hourly_data_partitions)
+    monkeypatch.setattr(service.repository, "lock_hourly_data_partitions", lock_hourly_data_partitions)
+    monkeypatch.setattr(service.repository, "get_latest_upload_start_date", get_latest_upload_start_date)
+    monkeypatch.setattr(service.repository, "drop_hourly_data_partitions", drop_hourly_data_partitions)
+    monkeypatch.setattr(service.repository, "delete_sensor_data_range", delete_sensor_data_range)
+
+    cache_client = FakeRedis(
+        [
+            f"{SENSOR_DATA_RESPONSE_KEY}:1",
+            f"{SENSOR_DATA_RESPONSE_KEY}:1:msgpack",
+            f"{SENSOR_DATA_RESPONSE_KEY}:2:0123456789abcdef",
+            f"{SENSOR_DATA_RESPONSE_KEY}:12",
+            f"{SENSOR_DATA_RESPONSE_KEY}:3:columnar",
+        ]
+    )
+
+    asyncio.run(service.drop_expired_hourly_data_partitions(5000, fake_session_factory, cache_client))
+
+    # only the range whose uploads all expired is dropped, and only its uploads' responses are invalidated
+    assert dropped == [["hourly_temperature_0", "hourly_rain_0"]]
+    assert cache_client.keys == {f"{SENSOR_DATA_RESPONSE_KEY}:12", f"{SENSOR_DATA_RESPONSE_KEY}:3:columnar"}
+
+
+def test_partitions_of_ranges_still_getting_sensor_data_are_kept(monkeypatch):
+    async def get_hourly_data_partitions(session):
+        return [("hourly_rain", "hourly_rain_0", 0, 1000), ("hourly_rain", "hourly_rain_legacy", None, 1000)]
+
+    async def fail(*args):
+        raise AssertionError("no partition may be dropped")
+
+    monkeypatch.setattr(service.repository, "get_hourly_data_partitions", get_hourly_data_partitions)
+    monkeypatch.setattr(service.repository, "lock_hourly_data_partitions", fail)
+
+    asyncio.run(service.drop_expired_hourly_data_partitions(998, fake_session_factory, FakeRedis([])))
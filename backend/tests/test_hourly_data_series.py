@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+import app.models.sensor as models
+import app.services.sensor as service
+from app.utilities.response_formats import serialize_json
+
+
+TIMES = [datetime(2024, 1, 1) + timedelta(hours=hour) for hour in range(3)]
+
+
+def build_sensor_data_record() -> models.SensorData:
+    sensor_data_record = models.SensorData(
+        id=7,
+        file_metadata_id=3,
+        latitude=Decimal("19.08"),
+        longitude=Decimal("72.85"),
+        generationtime_ms=Decimal("0.3"),
+        utc_offset_seconds=Decimal(0),
+        timezone="GMT",
+        timezone_abbreviation="GMT",
+        elevation=Decimal(10),
+        grid_cell=1,
+    )
+    sensor_data_record.hourly_units = models.SensorHourlyUnits(
+        id=1, sensor_data_id=7, **{field: "unit" for field in ["time", *models.HOURLY_DATA_MODELS]}
+    )
+
+    return sensor_data_record
+
+
+@pytest.fixture
+def fake_layouts(monkeypatch):
+    """Replaces the DB reads of both hourly data layouts with the same hourly values."""
+
+    def get_value(field, hour):
+        return None if hour == 1 else Decimal(len(field) + hour)
+
+    async def get_sensor_data_with_units(file_metadata_id, session):
+        return build_sensor_data_record()
+
+    async def get_hourly_data_series(sensor_data_id, fields, session, start=None, end=None):
+        return {field: [(time, get_value(field, hour)) for hour, time in enumerate(TIMES)] for field in fields}
+
+    async def get_sensor_data_with_hourly_readings(file_metadata_id, session, fields=None, start=None, end=None):
+        hourly_readings = [
+            SimpleNamespace(time=time, **{field: get_value(field, hour) for field in fields})
+            for hour, time in enumerate(TIMES)
+        ]
+        return build_sensor_data_record(), hourly_readings
+
+    monkeypatch.setattr(service.repository, "get_sensor_data_with_units", get_sensor_data_with_units)
+    monkeypatch.setattr(service.repository, "get_hourly_data_series", get_hourly_data_series)
+    monkeypatch.setattr(
+        service.repository, "get_sensor_data_with_hourly_readings", get_sensor_data_with_hourly_readings
+    )
+
+
+def get_sensor_data_response(monkeypatch, layout: str, **filters) -> dict:
+    monkeypatch.setattr(service, "HOURLY_DATA_LAYOUT", layout)
+    sensor_data = asyncio.run(service.get_associated_sensor_data(3, None, **filters))
+    return orjson.loads(serialize_json(sensor_data))
+
+
+@pytest.mark.parametrize("filters", [{}, {"metric_names": ["temperature_2m", "rain"]}])
+def test_hourly_data_series_has_the_same_shape_in_both_layouts(monkeypatch, fake_layouts, filters):
+    narrow_response = get_sensor_data_response(monkeypatch, "narrow", **filters)
+    wide_response = get_sensor_data_response(monkeypatch, "wide", **filters)
+
+    assert narrow_response == wide_response
+
+    sensor_data = narrow_response["data"]["sensor_data"]
+    for field in filters.get("metric_names", models.HOURLY_DATA_MODELS):
+        series = sensor_data[models.HOURLY_DATA_RELATIONSHIPS[field]]
+
+        assert [set(point) for point in series] == [{"time", "value"}] * len(TIMES)
+        assert series[1]["value"] is None
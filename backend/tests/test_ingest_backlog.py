@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+from fnmatch import fnmatch
+
+import app.services.sensor as service
+from app.config.config import INGEST_BACKLOG_MAX_AGE, INGEST_BACKLOG_ROWS_KEY, INGEST_JOB_KEY
+
+
+class FakeRedis:
+    """FakeRedis holds values and hashes in memory, for the cache commands the ingest backlog uses."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.expiries: dict[str, int | None] = {}
+        self.hashes: dict[str, dict[str, bytes]] = {}
+
+    async def scan_iter(self, match: str, count: int):
+        for key in list(self.hashes):
+            if fnmatch(key, match):
+                yield key.encode("utf-8")
+
+    async def hmget(self, key: bytes | str, fields: list[str]) -> list[bytes | None]:
+        key = key.decode("utf-8") if isinstance(key, bytes) else key
+        return [self.hashes.get(key, {}).get(field) for field in fields]
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.values[key] = value.encode("utf-8")
+        self.expiries[key] = ex
+
+
+def add_job(cache_client: FakeRedis, job_id: str, rows_total: int, rows_inserted: int, age_seconds: int = 0, **fields):
+    created_at = datetime.utcnow() - timedelta(seconds=age_seconds)
+    cache_client.hashes[f"{INGEST_JOB_KEY}:{job_id}"] = {
+        "created_at": created_at.isoformat().encode("utf-8"),
+        "rows_total": str(rows_total).encode("utf-8"),
+        "rows_inserted": str(rows_inserted).encode("utf-8"),
+        **{field: value.encode("utf-8") for field, value in fields.items()},
+    }
+
+
+def test_reconciled_backlog_counts_unsaved_rows_of_live_jobs():
+    cache_client = FakeRedis()
+    cache_client.values[INGEST_BACKLOG_ROWS_KEY] = b"1000000"
+
+    add_job(cache_client, "processing", 500, 200)
+    add_job(cache_client, "queued", 100, 0)
+    add_job(cache_client, "done", 300, 300)
+    add_job(cache_client, "failed", 400, 100, error="OSError: broker unavailable")
+    add_job(cache_client, "stale", 800, 0, age_seconds=INGEST_BACKLOG_MAX_AGE + 60)
+    # progress of an expired job, without its other fields
+    cache_client.hashes[f"{INGEST_JOB_KEY}:expired"] = {"rows_inserted": b"50"}
+
+    asyncio.run(service.reconcile_ingest_backlog(cache_client))
+
+    assert cache_client.values[INGEST_BACKLOG_ROWS_KEY] == b"400"
+    assert cache_client.expiries[INGEST_BACKLOG_ROWS_KEY] == INGEST_BACKLOG_MAX_AGE
@@ -0,0 +1,92 @@
+import asyncio
+from contextlib import asynccontextmanager
+from io import BytesIO
+
+import pytest
+from redis.asyncio import RedisError
+
+import app.services.sensor as service
+from benchmarks.generator import generate_sensor_data_file
+
+
+class FakeSession:
+    """FakeSession stands in for a DB session whose transactions do nothing."""
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+
+@asynccontextmanager
+async def fake_session_factory():
+    yield FakeSession()
+
+
+@pytest.fixture
+def chunk_calls(monkeypatch):
+    """Replaces the DB and cache steps of chunk processing, recording the calls made to them."""
+
+    calls = {"saved": [], "published": [], "recorded": []}
+    sensor_data = service._build_sensor_data(BytesIO(generate_sensor_data_file(48, anomaly_rate=0.1)))
+    claimed_chunks: set[tuple[int, int]] = set()
+
+    async def save_ingest_chunk(sensor_data_id, chunk_index, row_count, session):
+        if (sensor_data_id, chunk_index) in claimed_chunks:
+            return False
+
+        claimed_chunks.add((sensor_data_id, chunk_index))
+        return True
+
+    async def noop(*args, **kwargs):
+        pass
+
+    async def load_staged_sensor_data(staging_key, cache_client):
+        return sensor_data
+
+    async def save_hourly_data(chunk_data, sensor_data_id, session):
+        calls["saved"].append(len(chunk_data.hourly))
+
+    async def publish_anomalous_data(anomalous_data, file_metadata_id, cache_client):
+        calls["published"].append(len(anomalous_data))
+
+    async def record_ingest_chunk(job_id, row_count, anomaly_count=0, error=None, cache_client=None):
+        calls["recorded"].append((job_id, row_count, anomaly_count))
+
+    monkeypatch.setattr(service, "ensure_hourly_data_partitions", noop)
+    monkeypatch.setattr(service, "update_ingest_job", noop)
+    monkeypatch.setattr(service.repository, "save_ingest_chunk", save_ingest_chunk)
+    monkeypatch.setattr(service, "load_staged_sensor_data", load_staged_sensor_data)
+    monkeypatch.setattr(service, "save_hourly_data", save_hourly_data)
+    monkeypatch.setattr(service, "publish_anomalous_data", publish_anomalous_data)
+    monkeypatch.setattr(service, "record_ingest_chunk", record_ingest_chunk)
+    return calls
+
+
+def process_chunk(chunk_index: int = 0, start: int = 0, end: int = 24) -> None:
+    asyncio.run(
+        service.process_sensor_data_chunk(
+            "staged:1", 1, 11, chunk_index, start, end, "job", session_factory=fake_session_factory, cache_client=None
+        )
+    )
+
+
+def test_retried_chunk_is_skipped_once_saved(chunk_calls):
+    process_chunk()
+    process_chunk()
+
+    # the retry neither saves the chunk again nor publishes or records its anomalies twice
+    assert chunk_calls["saved"] == [24]
+    assert len(chunk_calls["published"]) == 1
+    assert chunk_calls["recorded"] == [("job", 24, chunk_calls["published"][0])]
+
+
+def test_publish_failure_still_records_saved_chunk(monkeypatch, chunk_calls):
+    async def publish_anomalous_data(anomalous_data, file_metadata_id, cache_client):
+        raise RedisError("cache unavailable")
+
+    monkeypatch.setattr(service, "publish_anomalous_data", publish_anomalous_data)
+
+    process_chunk()
+
+    assert chunk_calls["saved"] == [24]
+    assert chunk_calls["recorded"][0][:2] == ("job", 24)
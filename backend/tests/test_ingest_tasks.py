@@ -0,0 +1,66 @@
+import pytest
+
+import app.services.sensor as service
+import app.tasks.sensor as tasks
+
+
+STAGED_UPLOADS = [("staged:1", 1, 11, 100), ("staged:2", 2, 12, 200), ("staged:3", 3, 13, 300)]
+
+
+@pytest.fixture
+def recorded_runs(monkeypatch):
+    """Records the coroutine functions run on the worker's event loop, instead of running them."""
+
+    runs = []
+    monkeypatch.setattr(tasks.worker_runtime, "run", lambda function, *args: runs.append((function, args)))
+    return runs
+
+
+def test_failed_batch_dispatch_removes_undispatched_rows_from_backlog(monkeypatch, recorded_runs):
+    dispatched = []
+
+    def dispatch_sensor_data_chunks(staging_key, file_metadata_id, sensor_data_id, hour_count, job_id):
+        if file_metadata_id == 2:
+            raise OSError("broker unavailable")
+        dispatched.append(file_metadata_id)
+
+    monkeypatch.setattr(tasks, "_dispatch_sensor_data_chunks", dispatch_sensor_data_chunks)
+
+    with pytest.raises(tasks.IngestDispatchError) as exc_info:
+        tasks.process_sensor_data_batch(STAGED_UPLOADS, job_id="job")
+
+    tasks.process_sensor_data_batch.on_failure(exc_info.value, "job", (STAGED_UPLOADS,), {"job_id": "job"}, None)
+
+    # the first upload's chunks were enqueued and leave the backlog themselves, the other two never will
+    assert dispatched == [1]
+    assert recorded_runs == [
+        (service.record_ingest_chunk, ("job", 500, 0, "IngestDispatchError: OSError: broker unavailable"))
+    ]
+
+
+def test_failed_dispatch_removes_upload_rows_from_backlog(monkeypatch, recorded_runs):
+    def dispatch_sensor_data_chunks(*args):
+        raise OSError("broker unavailable")
+
+    monkeypatch.setattr(tasks, "_dispatch_sensor_data_chunks", dispatch_sensor_data_chunks)
+
+    with pytest.raises(tasks.IngestDispatchError) as exc_info:
+        tasks.process_sensor_data("staged:1", 1, 11, 100, job_id="job")
+
+    tasks.process_sensor_data.on_failure(exc_info.value, "job", ("staged:1", 1, 11, 100), {"job_id": "job"}, None)
+
+    assert recorded_runs[0][1][:2] == ("job", 100)
+
+
+def test_failed_chunk_removes_its_rows_from_backlog(recorded_runs):
+    kwargs = {"staging_key": "staged:1", "chunk_index": 1, "start": 24, "end": 48, "job_id": "job"}
+    tasks.process_sensor_data_chunk.on_failure(OSError("DB unavailable"), "task", (), kwargs, None)
+
+    assert recorded_runs == [(service.record_ingest_chunk, ("job", 24, 0, "OSError: DB unavailable"))]
+
+
+def test_failed_completion_leaves_backlog_to_its_chunks(recorded_runs):
+    kwargs = {"staging_key": "staged:1", "file_metadata_id": 1, "chunk_count": 2, "job_id": "job"}
+    tasks.complete_sensor_data_upload.on_failure(OSError("DB unavailable"), "task", (), kwargs, None)
+
+    assert recorded_runs == [(service.record_ingest_chunk, ("job", 0, 0, "OSError: DB unavailable"))]
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from app.utilities.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips_its_sort_key():
+    sort_key = (datetime(2024, 5, 17, 8, 30, 15, 123456), 4201)
+    cursor = encode_cursor(*sort_key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == sort_key
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "W10", encode_cursor(datetime(2024, 1, 1), 1)[:-2], "WzEsMl0"])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
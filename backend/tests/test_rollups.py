@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from math import isnan
+
+from app.schemas.sensor import EPOCH, HOURLY_VALUE_FIELDS, SensorHourlyColumns
+from app.utilities.rollups import compute_rollups
+
+
+def build_hourly_columns(start: datetime, values: list[float | None]) -> SensorHourlyColumns:
+    times = [(start + timedelta(hours=hour)).isoformat() for hour in range(len(values))]
+    return SensorHourlyColumns.from_dict(
+        {"time": times, **{data_field: values for data_field in HOURLY_VALUE_FIELDS}}
+    )
+
+
+def get_rollups(hourly_data: SensorHourlyColumns, resolution: str) -> list[tuple]:
+    [(_, period_starts, *aggregates)] = compute_rollups(hourly_data, resolution, ["rain"])
+    period_datetimes = [EPOCH + timedelta(seconds=int(seconds)) for seconds in period_starts]
+
+    return list(zip(period_datetimes, *(aggregate.tolist() for aggregate in aggregates)))
+
+
+def test_daily_rollups_aggregate_values_and_count_nulls():
+    values = [float(hour) for hour in range(24)] + [None] * 23 + [5.0]
+    rollups = get_rollups(build_hourly_columns(datetime(2024, 1, 1), values), "day")
+
+    assert rollups == [
+        (datetime(2024, 1, 1), 0.0, 23.0, 11.5, 24, 0),
+        (datetime(2024, 1, 2), 5.0, 5.0, 5.0, 1, 23),
+    ]
+
+
+def test_periods_without_values_have_nan_aggregates():
+    [(period_start, minimum, maximum, mean, count, null_count)] = get_rollups(
+        build_hourly_columns(datetime(2024, 1, 1), [None] * 3), "day"
+    )
+
+    assert period_start == datetime(2024, 1, 1)
+    assert isnan(minimum) and isnan(maximum) and isnan(mean)
+    assert (count, null_count) == (0, 3)
+
+
+def test_weekly_periods_start_on_mondays():
+    # 2024-01-07 is a Sunday and 2024-01-08 a Monday
+    rollups = get_rollups(build_hourly_columns(datetime(2024, 1, 7, 22), [1.0, 2.0, 3.0, 4.0]), "week")
+
+    assert [rollup[0] for rollup in rollups] == [datetime(2024, 1, 1), datetime(2024, 1, 8)]
+    assert [rollup[4] for rollup in rollups] == [2, 2]
+
+
+def test_unsorted_hourly_data_is_grouped_by_period():
+    hourly_data = build_hourly_columns(datetime(2024, 1, 1), [1.0, 2.0, 3.0])
+    hourly_data.time.reverse()
+    hourly_data.time[0] += 24 * 60 * 60
+
+    rollups = get_rollups(hourly_data, "day")
+
+    assert [(rollup[0], rollup[4]) for rollup in rollups] == [(datetime(2024, 1, 1), 2), (datetime(2024, 1, 2), 1)]
+
+
+def test_empty_hourly_data_has_no_rollups():
+    assert list(compute_rollups(SensorHourlyColumns(), "day", ["rain"])) == []
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from redis.asyncio import RedisError
+
+import app.services.sensor as service
+
+
+class FakeResponses:
+    """FakeResponses stands in for the response cache, counting the responses loaded from the DB on cache misses."""
+
+    def __init__(self) -> None:
+        self.cached: dict[str, dict[str, bytes]] = {}
+        self.loads: list[int] = []
+
+    async def get_hash_values(self, key, fields):
+        cached_response = self.cached.get(key, {})
+        return [cached_response.get(field) for field in fields]
+
+    async def load_sensor_data_response(self, file_metadata_id, start, end, metric_names, points, response_format):
+        self.loads.append(file_metadata_id)
+        await asyncio.sleep(0.01)
+
+        return b"loaded", '"loaded"'
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    responses = FakeResponses()
+    monkeypatch.setattr(service.cache_utils, "get_hash_values", responses.get_hash_values)
+    monkeypatch.setattr(service, "load_sensor_data_response", responses.load_sensor_data_response)
+
+    return responses
+
+
+def test_cached_responses_are_served_with_their_etag(responses):
+    responses.cached[service.get_sensor_data_response_key(1)] = {"etag": b'"cached"', "body": b"cached"}
+
+    assert asyncio.run(service.get_sensor_data_response(1)) == (b"cached", '"cached"')
+    assert asyncio.run(service.get_sensor_data_response(1, if_none_match='W/"cached"')) == (None, '"cached"')
+    assert asyncio.run(service.get_sensor_data_response(1, if_none_match='"stale", *')) == (None, '"cached"')
+    assert responses.loads == []
+
+
+def test_concurrent_cache_misses_share_a_single_load(responses):
+    async def get_responses():
+        return await asyncio.gather(
+            service.get_sensor_data_response(2),
+            service.get_sensor_data_response(2),
+            service.get_sensor_data_response(2, if_none_match='"loaded"'),
+        )
+
+    assert asyncio.run(get_responses()) == [(b"loaded", '"loaded"'), (b"loaded", '"loaded"'), (None, '"loaded"')]
+    assert responses.loads == [2]
+
+
+def test_cache_errors_fall_back_to_loading(monkeypatch, responses):
+    async def get_hash_values(key, fields):
+        raise RedisError("connection refused")
+
+    monkeypatch.setattr(service.cache_utils, "get_hash_values", get_hash_values)
+
+    assert asyncio.run(service.get_sensor_data_response(3)) == (b"loaded", '"loaded"')
+    assert responses.loads == [3]
+
+
+def test_response_keys_differ_by_format_and_filters():
+    start = datetime(2024, 1, 1)
+    keys = {
+        service.get_sensor_data_response_key(1),
+        service.get_sensor_data_response_key(1, response_format="msgpack"),
+        service.get_sensor_data_response_key(1, start),
+        service.get_sensor_data_response_key(1, None, start),
+        service.get_sensor_data_response_key(1, metric_names=["rain", "snowfall"]),
+        service.get_sensor_data_response_key(1, metric_names=["snowfall", "rain"]),
+        service.get_sensor_data_response_key(1, points=10),
+    }
+
+    assert len(keys) == 7
+    assert all(key.split(":")[1] == "1" for key in keys)
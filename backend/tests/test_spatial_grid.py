@@ -0,0 +1,28 @@
+from app.utilities.spatial_grid import get_grid_cell, get_grid_cells, get_grid_size
+
+
+def test_grid_covers_the_globe_with_partial_last_cells():
+    assert get_grid_size(1) == (180, 360)
+    assert get_grid_size(7) == (26, 52)
+
+
+def test_grid_cells_count_rows_from_the_south_west_corner():
+    assert get_grid_cell(-90, -180, 10) == 0
+    assert get_grid_cell(-90, -170, 10) == 1
+    assert get_grid_cell(-80, -180, 10) == 36
+    assert get_grid_cell(0.5, 0.5, 1) == 90 * 360 + 180
+
+
+def test_northern_and_eastern_edges_belong_to_the_last_cells():
+    assert get_grid_cell(90, 180, 10) == 18 * 36 - 1
+    assert get_grid_cell(90, -180, 10) == 17 * 36
+
+
+def test_bounding_box_cells_cover_every_overlapping_cell():
+    assert get_grid_cells(-90, -75, -180, -155, 10, 100) == [0, 1, 2, 36, 37, 38]
+    assert get_grid_cells(5, 5, 5, 5, 10, 1) == [get_grid_cell(5, 5, 10)]
+
+
+def test_bounding_boxes_over_too_many_cells_get_none():
+    assert get_grid_cells(-90, 90, -180, 180, 10, 18 * 36 - 1) is None
+    assert len(get_grid_cells(-90, 90, -180, 180, 10, 18 * 36)) == 18 * 36
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter, ValidationError
+import pytest
+
+from app.schemas.sensor import NaiveUTCDatetime, to_naive_utc
+
+
+def test_aware_datetimes_are_converted_to_naive_utc():
+    value = datetime(2024, 1, 1, 2, tzinfo=timezone(timedelta(hours=2)))
+    assert to_naive_utc(value) == datetime(2024, 1, 1)
+
+
+def test_naive_datetimes_are_kept_as_utc():
+    assert to_naive_utc(datetime(2024, 1, 1, 2)) == datetime(2024, 1, 1, 2)
+
+
+def test_aware_and_naive_query_values_are_comparable():
+    adapter = TypeAdapter(NaiveUTCDatetime)
+    start = adapter.validate_python("2024-01-02T00:00:00+05:00")
+    end = adapter.validate_python("2024-01-01T20:00:00")
+
+    assert start < end
+
+
+def test_datetimes_out_of_range_in_utc_are_invalid():
+    with pytest.raises(ValidationError):
+        TypeAdapter(NaiveUTCDatetime).validate_python("0001-01-01T00:00:00+01:00")
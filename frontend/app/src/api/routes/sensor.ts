@@ -1,4 +1,4 @@
-import { useMutation, useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery, useMutation } from "@tanstack/react-query";
 import { ApiResponse, AUTH_HEADER, BACKEND_URL } from "../../config";
 import { SensorDataResponse, SensorFileMetadataResponse } from "../../schemas/sensor";
 
@@ -10,9 +10,11 @@ type getSensorDataProps = {
 };
 
 export const useGetSensorFilesMetadata = () =>
-  useQuery({
+  useInfiniteQuery({
     queryKey: ["sensorFilesMetadata"],
-    queryFn: getSensorFilesMetadata,
+    queryFn: ({ pageParam }) => getSensorFilesMetadata(pageParam),
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.data.next_cursor,
   });
 
 export const useGetSensorData = () =>
@@ -21,8 +23,11 @@ export const useGetSensorData = () =>
     mutationFn: ({ fileMetadataId }: getSensorDataProps) => getSensorData(fileMetadataId),
   });
 
-async function getSensorFilesMetadata(): Promise<ApiResponse<SensorFileMetadataResponse>> {
+async function getSensorFilesMetadata(cursor: string | null): Promise<ApiResponse<SensorFileMetadataResponse>> {
   const url = new URL(BASE_URL + "/metadata");
+  if (cursor) {
+    url.searchParams.set("cursor", cursor);
+  }
 
   const response = await fetch(url, {
     headers: { Authorization: AUTH_HEADER },
@@ -10,7 +10,8 @@ export const FileMetadataTable = () => {
   const [selectedRow, setSelectedRow] = useState<DataTableValue | null>(null);
   const [showChartData, setShowChartData] = useState(false);
 
-  const { data, refetch, isFetching, isFetched } = useGetSensorFilesMetadata();
+  const { data, refetch, fetchNextPage, hasNextPage, isFetching, isFetchingNextPage, isFetched } =
+    useGetSensorFilesMetadata();
   const getSensorDataMutation = useGetSensorData();
 
   if (isFetching) {
@@ -21,6 +22,8 @@ export const FileMetadataTable = () => {
     console.log("got file metadata", data);
   }
 
+  const fileMetadataRecords = data?.pages.flatMap((page) => page.data.file_metadata_records) ?? [];
+
   const hideChartDataModal = () => setShowChartData(false);
 
   const header = (
@@ -67,7 +70,7 @@ export const FileMetadataTable = () => {
       />
 
       <DataTable
-        value={data?.data.file_metadata_records ?? []}
+        value={fileMetadataRecords}
         header={header}
         tableStyle={{ minWidth: "50rem" }}
         scrollable
@@ -118,6 +121,21 @@ export const FileMetadataTable = () => {
         />
         <Column body={actionButtons} header="Actions" />
       </DataTable>
+
+      {hasNextPage && (
+        <div className="file-table-footer">
+          <Button
+            icon="pi pi-angle-down"
+            label="Load More"
+            rounded
+            raised
+            size="small"
+            onClick={() => fetchNextPage()}
+            disabled={isFetching}
+            loading={isFetchingNextPage}
+          />
+        </div>
+      )}
     </div>
   );
 };
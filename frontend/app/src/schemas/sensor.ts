@@ -59,6 +59,7 @@ export interface SensorData {
 
 export interface SensorFileMetadataResponse {
   file_metadata_records: Array<SensorFileMetadata>;
+  next_cursor: string | null;
 }
 
 export interface SensorDataResponse {